@@ -0,0 +1,231 @@
+"""
+Edge collector process.
+
+Polls the R-SCMs at one site with the same Redfish client as the central poller, buffers
+samples in a local SQLite file (store-and-forward) and pushes gzip-compressed batches
+to the central server's /api/ingest/batch endpoint. If the WAN link is down, samples stay
+in the buffer and are sent once the link comes back.
+
+    COLLECTOR_CENTRAL_URL=https://central:8000 INGEST_API_KEY=... COLLECTOR_SITE=Quincy python run.py --collector
+"""
+import asyncio
+import gzip
+import json
+import signal
+import sqlite3
+import socket
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+import httpx
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.config import settings
+from app.services.redfish_client import RedfishClient, redfish_sessions
+from app.services.monitoring_service import monitoring_service
+from app.services.loop_monitor import loop_monitor
+from app.logging_config import get_logger
+
+log = get_logger("collector")
+
+
+class SampleBuffer:
+    """Append-only local SQLite buffer for samples that have not been delivered yet"""
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS samples (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS assignment (id INTEGER PRIMARY KEY CHECK (id = 1), payload TEXT NOT NULL)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _run(self, fn):
+        conn = sqlite3.connect(self.path)
+        try:
+            result = fn(conn)
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+
+    async def append(self, samples: List[dict]):
+        rows = [(json.dumps(sample, default=str),) for sample in samples]
+        await asyncio.to_thread(self._run, lambda conn: conn.executemany("INSERT INTO samples (payload) VALUES (?)", rows))
+
+    async def peek(self, limit: int) -> List[Tuple[int, str]]:
+        return await asyncio.to_thread(
+            self._run,
+            lambda conn: conn.execute("SELECT id, payload FROM samples ORDER BY id LIMIT ?", (limit,)).fetchall()
+        )
+
+    async def delete_through(self, last_id: int):
+        await asyncio.to_thread(self._run, lambda conn: conn.execute("DELETE FROM samples WHERE id <= ?", (last_id,)))
+
+    async def count(self) -> int:
+        return await asyncio.to_thread(self._run, lambda conn: conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0])
+
+    async def save_assignment(self, assignment: dict):
+        payload = json.dumps(assignment)
+        await asyncio.to_thread(
+            self._run,
+            lambda conn: conn.execute("INSERT OR REPLACE INTO assignment (id, payload) VALUES (1, ?)", (payload,))
+        )
+
+    async def load_assignment(self) -> Optional[dict]:
+        row = await asyncio.to_thread(self._run, lambda conn: conn.execute("SELECT payload FROM assignment WHERE id = 1").fetchone())
+        return json.loads(row[0]) if row else None
+
+
+class Collector:
+    def __init__(self):
+        self.collector_id = settings.collector_id or socket.gethostname()
+        self.central_url = settings.collector_central_url.rstrip("/")
+        self.buffer = SampleBuffer(settings.collector_buffer_path)
+        self.client = httpx.AsyncClient(
+            timeout=30.0,
+            verify=settings.collector_verify_ssl,
+            headers={"Authorization": f"Bearer {settings.ingest_api_key}"}
+        )
+        self.assignment: Optional[dict] = None
+        self._forward_lock = asyncio.Lock()
+
+    async def refresh_assignment(self):
+        """Fetch the heat exchangers to poll, falling back to the last known list when offline"""
+        params = {"city": settings.collector_site} if settings.collector_site else {}
+        try:
+            response = await self.client.get(f"{self.central_url}/api/ingest/heat-exchangers", params=params)
+            response.raise_for_status()
+            self.assignment = response.json()
+            await self.buffer.save_assignment(self.assignment)
+        except Exception as e:
+            log.warning("Could not refresh assignment from central server: %s", e)
+            if self.assignment is None:
+                self.assignment = await self.buffer.load_assignment()
+
+    async def poll_once(self):
+        """Poll every assigned heat exchanger and buffer the samples"""
+        if self.assignment is None:
+            await self.refresh_assignment()
+        if not self.assignment or not self.assignment.get("monitoring_enabled", True):
+            return
+        
+        heat_exchangers = self.assignment.get("heat_exchangers", [])
+        semaphore = asyncio.Semaphore(30)
+        
+        async def poll(he: dict) -> Optional[dict]:
+            async with semaphore:
+                try:
+                    client = RedfishClient(he["rscm_ip"], settings.redfish_username, settings.redfish_password)
+                    sample = await monitoring_service.collect_sample(client)
+                except Exception as e:
+                    log.error("Error polling heat exchanger %s: %s", he["id"], e)
+                    return None
+                if not sample["manager_info"]:
+                    log.warning("No manager info retrieved for heat exchanger %s", he["id"])
+                    return None
+                return {
+                    "heat_exchanger_id": he["id"],
+                    # Lets the server recognise the sample if a batch has to be resent
+                    "sample_id": uuid.uuid4().hex,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    **sample
+                }
+        
+        results = await asyncio.gather(*(poll(he) for he in heat_exchangers))
+        samples = [sample for sample in results if sample]
+        if samples:
+            await self.buffer.append(samples)
+        log.info("Collected %d/%d samples", len(samples), len(heat_exchangers))
+        
+        # Push right away instead of waiting for the next forward tick
+        asyncio.create_task(self.forward())
+
+    async def forward(self):
+        """Send buffered samples to the central server in compressed batches"""
+        async with self._forward_lock:
+            batch_size = settings.collector_batch_size
+            while True:
+                rows = await self.buffer.peek(batch_size)
+                if not rows:
+                    return
+                
+                body = '{"collector_id":%s,"samples":[%s]}' % (
+                    json.dumps(self.collector_id),
+                    ",".join(payload for _, payload in rows)
+                )
+                try:
+                    response = await self.client.post(
+                        f"{self.central_url}/api/ingest/batch",
+                        content=gzip.compress(body.encode("utf-8")),
+                        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+                    )
+                    if response.status_code == 413:
+                        if len(rows) > 1:
+                            batch_size = max(1, len(rows) // 2)
+                            log.warning("Batch of %d samples too large for the central server, retrying with %d", len(rows), batch_size)
+                            continue
+                        # A single sample over the server's limit will never be accepted
+                        log.error("Dropping buffered sample %s: too large for the central server", rows[0][0])
+                        await self.buffer.delete_through(rows[0][0])
+                        continue
+                    response.raise_for_status()
+                except Exception as e:
+                    pending = await self.buffer.count()
+                    log.warning("Central server unreachable, keeping %d buffered samples: %s", pending, e)
+                    return
+                
+                await self.buffer.delete_through(rows[-1][0])
+                log.info("Forwarded %d samples to central server", len(rows))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def run_collector():
+    """Run the collector until SIGINT/SIGTERM"""
+    if not settings.collector_central_url or not settings.ingest_api_key:
+        raise SystemExit("COLLECTOR_CENTRAL_URL and INGEST_API_KEY must be set for collector mode")
+    
+    loop_monitor.start()
+    collector = Collector()
+    await collector.refresh_assignment()
+    interval = (collector.assignment or {}).get("polling_interval_seconds") or settings.polling_interval_seconds
+    
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(collector.poll_once, 'interval', seconds=interval, id='collect_samples')
+    scheduler.add_job(collector.forward, 'interval', seconds=settings.collector_forward_interval_seconds, id='forward_samples')
+    scheduler.add_job(collector.refresh_assignment, 'interval', seconds=300, id='refresh_assignment')
+    scheduler.start()
+    print(f"[OK] Collector {collector.collector_id} started (interval: {interval}s, buffer: {settings.collector_buffer_path})")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+    
+    try:
+        await stop.wait()
+    finally:
+        print("[STOP] Stopping collector")
+        scheduler.shutdown()
+        await collector.close()
+        await redfish_sessions.close()
+        await loop_monitor.stop()
+
+
+def main():
+    try:
+        asyncio.run(run_collector())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
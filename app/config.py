@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -10,14 +10,51 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     debug: bool = True
+    log_level: str = "INFO"  # DEBUG, INFO, WARNING, ERROR
+    log_levels: Dict[str, str] = {}  # Per subsystem, e.g. {"redfish": "DEBUG", "auth": "WARNING"}
+    log_format: str = "text"  # text or json
+    log_debug_sample_rate: float = 1.0  # Share of DEBUG records written when DEBUG is enabled
+    server_timing: bool = True  # Add a Server-Timing header (app and DB time, query count) to API responses
+    slow_query_log: bool = False  # Log slow SQL statements and capture their query plans
+    slow_query_threshold_ms: int = 100
+    slow_query_max_statements: int = 200  # Distinct statements kept for /api/diagnostics/slow-queries
+    slow_query_log_parameters: bool = False  # Show parameter values (never for system_settings/users), not just types
+    loop_lag_interval_ms: int = 100  # How often the event loop lag is sampled
+    loop_block_threshold_ms: int = 100  # Loop stalls longer than this count as blocking calls
+    loop_block_capture: bool = False  # Capture stacks of blocking calls also when DEBUG is off
     
     # Redfish
     redfish_username: str = "admin"
     redfish_password: str = "password"
     redfish_verify_ssl: bool = False
+    redfish_scheme: str = "https"
+    redfish_port: int = 8080  # Used when a heat exchanger's R-SCM address has no explicit port
+    redfish_session_auth: bool = True  # Reuse a SessionService token instead of Basic auth per request
+    redfish_max_concurrent_requests: int = 4  # In-flight requests per R-SCM
+    redfish_min_request_interval_ms: int = 0  # Minimum spacing between request starts per R-SCM
+    # Per-model overrides, keyed by the manager's Model, e.g. {"RM-1": {"max_concurrent": 2, "min_interval_ms": 50}}
+    redfish_model_limits: Dict[str, Dict[str, float]] = {}
+    redfish_capability_ttl_seconds: int = 3600  # Re-probe endpoints a device reported as missing
+    redfish_conditional_get: bool = True  # Send If-None-Match and reuse cached bodies on 304
     
     # Monitoring
     polling_interval_seconds: int = 30
+    embedded_poller: bool = True  # Set False when polling runs in a standalone process (run.py --poller)
+    poller_lease_seconds: int = 30  # Poller leader lease; another process takes over after it expires
+    poller_sharding: bool = False  # Split heat exchangers across all running pollers instead of electing one
+    poller_node_id: str = ""  # Stable shard member id, unique per poller process (defaults to hostname:pid:random)
+    poller_metrics_port: int = 0  # Standalone poller serves /metrics on this port (0 = off)
+    redfish_event_push: bool = False  # Subscribe to R-SCM EventService and refresh devices on events
+    redfish_event_destination_url: str = ""  # Base URL of this server as reachable from the R-SCMs
+    redfish_event_context: str = ""  # Shared secret echoed back in every event
+    redfish_event_reconcile_seconds: int = 300  # Polling interval for devices with an event subscription
+    
+    # WebSocket fan-out
+    websocket_send_queue_size: int = 100  # Per-client buffered messages
+    websocket_slow_client_policy: str = "drop_oldest"  # "drop_oldest" or "disconnect"
+    websocket_replay_buffer_size: int = 1000  # Recent events kept for resume after reconnect
+    websocket_backplane: str = "memory"  # "memory" (single worker) or "unix" (multiple workers on one host)
+    websocket_backplane_path: str = "/tmp/cooling-monitor-ws.sock"
     
     # Email settings - now managed in database, these are fallbacks only
     smtp_enabled: bool = False
@@ -30,6 +67,21 @@ class Settings(BaseSettings):
     smtp_use_tls: bool = True
     pump_flow_critical_threshold: float = 10.0
     
+    # Teams webhook throttling (incoming webhooks allow only a few posts per second)
+    teams_rate_limit_per_second: float = 1.0
+    teams_rate_limit_burst: int = 4
+    teams_coalesce_window_seconds: float = 2.0
+    
+    # Edge collectors (run.py --collector) and the central /api/ingest endpoints
+    ingest_api_key: str = ""  # Shared secret; ingest endpoints are disabled while empty
+    collector_id: str = ""  # Defaults to the hostname
+    collector_central_url: str = ""  # e.g. https://cooling-monitor.example.com
+    collector_site: str = ""  # Only poll heat exchangers in this city (all if empty)
+    collector_buffer_path: str = "./collector_buffer.db"
+    collector_batch_size: int = 500
+    collector_forward_interval_seconds: int = 15
+    collector_verify_ssl: bool = True
+    
     # Security
     secret_key: str = "your-secret-key-here-change-in-production-min-32-chars"
     
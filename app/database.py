@@ -22,6 +22,13 @@ async def init_db():
         engine, class_=AsyncSession, expire_on_commit=False
     )
     
+    # Per-request DB time and query counts for the HTTP API
+    from app.services.request_timing import instrument_engine
+    instrument_engine(engine)
+    if settings.slow_query_log:
+        from app.services.slow_query_log import slow_query_log
+        slow_query_log.instrument(engine)
+    
     # Import models to create tables
     from app.models.heat_exchanger import HeatExchanger
     from app.models.monitoring_data import MonitoringData
@@ -29,6 +36,8 @@ async def init_db():
     from app.models.user import User
     from app.models.alert import Alert
     from app.models.program import Program
+    from app.models.poller_lease import PollerLease
+    from app.models.ingest import IngestedSample
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,129 @@
+"""Structured, non-blocking logging
+
+Application code logs through ``get_logger(subsystem)``, which returns the logger
+``cooling.<subsystem>`` (redfish, poller, auth, websocket, ...). Records are handed to a
+queue and written to stderr by a background thread, so the event loop never waits on
+terminal or pipe I/O. Levels are set globally with ``LOG_LEVEL`` and per subsystem with
+``LOG_LEVELS`` (e.g. ``{"redfish": "DEBUG"}``). DEBUG is off by default and can be sampled
+with ``LOG_DEBUG_SAMPLE_RATE`` when it is on at fleet scale.
+
+Extra fields passed with ``extra={...}`` are kept as structured data: appended as
+key=value pairs in the text format, or as JSON keys with ``LOG_FORMAT=json``.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+from app.services.metrics import metrics
+
+ROOT_LOGGER = "cooling"
+QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+log_records_dropped = metrics.counter(
+    "cooling_log_records_dropped_total", "Log records dropped because the log writer fell behind"
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = _fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        entry.update(_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1.0 or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the writer thread falls behind, records are dropped and counted"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+def setup_logging():
+    """Configure the ``cooling`` loggers once per process (called on first ``get_logger``)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    # stderr keeps stdout free for the output of tools that import the app (benchmarks, reports)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    handler.addFilter(DebugSampler(settings.log_debug_sample_rate))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [handler]
+    root.setLevel(settings.log_level.upper())
+    # Uvicorn and the root logger are configured separately
+    root.propagate = False
+    for subsystem, level in settings.log_levels.items():
+        logging.getLogger(f"{ROOT_LOGGER}.{subsystem}").setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
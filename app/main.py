@@ -3,15 +3,22 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from contextlib import asynccontextmanager
+from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from app.config import settings
 from app.database import init_db, close_db
-from app.routers import heat_exchangers, monitoring, settings as settings_router, auth, alerts, users, version, programs
+from app.routers import heat_exchangers, monitoring, settings as settings_router, auth, alerts, users, version, programs, ingest, redfish_events, metrics as metrics_router, diagnostics
 from app.routers.auth import get_current_user, require_admin
 from app.models.user import User
 from app.services.websocket_manager import manager
-from app.services.monitoring_service import monitoring_service
+from app.services.monitoring_service import monitoring_service, poller_coordinator
+from app.services.teams_service import teams_service
+from app.services.redfish_client import redfish_sessions
+from app.services.redfish_events import redfish_event_receiver
+from app.services.fleet_state import fleet_state
+from app.services.request_timing import RequestTimingMiddleware
+from app.services.loop_monitor import loop_monitor
 
 
 # Scheduler for background tasks
@@ -35,27 +42,58 @@ def reschedule_polling_job(interval_seconds: int):
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
+    loop_monitor.start()
     await init_db()
+    await manager.start()
     
     # Give database a moment to fully initialize
     import asyncio
     await asyncio.sleep(0.5)
     
-    # Start monitoring scheduler
-    scheduler.add_job(
-        monitoring_service.poll_all_heat_exchangers,
-        'interval',
-        seconds=settings.polling_interval_seconds,
-        id='poll_heat_exchangers'
-    )
+    if settings.embedded_poller:
+        # Only the process holding the poller lease polls (or, when sharding, each poller
+        # polls its share); lease/heartbeat renewal also lets others take over on failure
+        await poller_coordinator.renew()
+        scheduler.add_job(
+            poller_coordinator.renew,
+            'interval',
+            seconds=poller_coordinator.renew_interval_seconds,
+            id='renew_poller_lease'
+        )
+        
+        # Start monitoring scheduler
+        interval = settings.polling_interval_seconds
+        scheduler.add_job(
+            monitoring_service.poll_assigned_heat_exchangers,
+            'interval',
+            seconds=interval,
+            id='poll_heat_exchangers'
+        )
+        print(f"[OK] Monitoring service started (interval: {interval}s)")
+        
+        if settings.redfish_event_push:
+            scheduler.add_job(
+                redfish_event_receiver.reconcile_subscriptions,
+                'interval',
+                seconds=settings.redfish_event_reconcile_seconds,
+                id='reconcile_event_subscriptions',
+                next_run_time=datetime.now()
+            )
+    else:
+        print("[OK] Embedded poller disabled, expecting a standalone poller (python run.py --poller)")
     scheduler.start()
-    print(f"[OK] Monitoring service started (interval: {settings.polling_interval_seconds}s)")
     
     yield
     
     # Shutdown
     scheduler.shutdown()
+    await redfish_event_receiver.close()
+    await poller_coordinator.release()
+    await teams_service.close()
+    await redfish_sessions.close()
+    await manager.stop()
     await close_db()
+    await loop_monitor.stop()
 
 
 app = FastAPI(
@@ -65,6 +103,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Time every request by route, with DB time and query count (Server-Timing + /api/metrics)
+app.add_middleware(RequestTimingMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -80,6 +121,10 @@ app.include_router(settings_router.router)
 app.include_router(alerts.router)
 app.include_router(version.router)
 app.include_router(programs.router)
+app.include_router(ingest.router)
+app.include_router(redfish_events.router)
+app.include_router(metrics_router.router)
+app.include_router(diagnostics.router)
 
 
 # Health check
@@ -92,15 +137,43 @@ async def health_check():
     }
 
 
+async def send_fleet_snapshot(websocket: WebSocket):
+    """Send the full fleet state so the client can apply subsequent deltas"""
+    from app.database import async_session_maker
+    async with async_session_maker() as db:
+        snapshot = await fleet_state.snapshot(db)
+    manager.send(websocket, snapshot)
+
+
 # WebSocket endpoint
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    topics: str = "",
+    resume_from: int | None = None,
+    epoch: str | None = None
+):
+    # Initial topics may be passed as ?topics=alerts,fleet,he:1 to avoid a subscribe round-trip.
+    # Reconnecting clients pass ?resume_from=<last seq>&epoch=<epoch> to receive only missed events.
+    # With WEBSOCKET_BACKPLANE=unix the hub numbers events for all workers, so this works on any
+    # worker; after a hub failover (new epoch) clients get a resync instead.
+    resumed = await manager.connect(websocket, [t for t in topics.split(",") if t], resume_from, epoch)
     try:
+        if not resumed:
+            if resume_from is not None:
+                # Gap is outside the replay buffer, the client must reload its state
+                manager.send(websocket, {"type": "resync"})
+            if "fleet" in manager.active_connections[websocket].topics:
+                await send_fleet_snapshot(websocket)
         while True:
-            # Keep connection alive
+            # Subscribe/unsubscribe requests (anything else just keeps the connection alive)
             data = await websocket.receive_text()
+            added = await manager.handle_client_message(websocket, data)
+            if "fleet" in added:
+                await send_fleet_snapshot(websocket)
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 
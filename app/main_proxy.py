@@ -10,12 +10,20 @@ async def lifespan(app: FastAPI):
     """Initialize database and services when app starts"""
     # Import here to ensure proper initialization order
     from app.database import init_db, close_db
-    from app.services.monitoring_service import MonitoringService
+    from app.services.monitoring_service import MonitoringService, poller_coordinator
+    from app.services.teams_service import teams_service
+    from app.services.redfish_client import redfish_sessions
+    from app.services.redfish_events import redfish_event_receiver
+    from app.services.websocket_manager import manager
+    from app.services.loop_monitor import loop_monitor
     from app.config import settings
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
     
+    loop_monitor.start()
+    
     # Initialize database
     await init_db()
+    await manager.start()
     print("[OK] Database initialized (proxy mode)")
     
     # Initialize monitoring service
@@ -26,21 +34,51 @@ async def lifespan(app: FastAPI):
     import asyncio
     await asyncio.sleep(0.5)
     
-    # Start monitoring scheduler
-    scheduler.add_job(
-        monitoring_service.poll_all_heat_exchangers,
-        'interval',
-        seconds=settings.polling_interval_seconds,
-        id='poll_heat_exchangers'
-    )
+    if settings.embedded_poller:
+        # Only the process holding the poller lease polls (or, when sharding, each poller
+        # polls its share); lease/heartbeat renewal also lets others take over on failure
+        await poller_coordinator.renew()
+        scheduler.add_job(
+            poller_coordinator.renew,
+            'interval',
+            seconds=poller_coordinator.renew_interval_seconds,
+            id='renew_poller_lease'
+        )
+        
+        # Start monitoring scheduler
+        interval = settings.polling_interval_seconds
+        scheduler.add_job(
+            monitoring_service.poll_assigned_heat_exchangers,
+            'interval',
+            seconds=interval,
+            id='poll_heat_exchangers'
+        )
+        print(f"[OK] Monitoring service started (interval: {interval}s)")
+        
+        if settings.redfish_event_push:
+            from datetime import datetime
+            scheduler.add_job(
+                redfish_event_receiver.reconcile_subscriptions,
+                'interval',
+                seconds=settings.redfish_event_reconcile_seconds,
+                id='reconcile_event_subscriptions',
+                next_run_time=datetime.now()
+            )
+    else:
+        print("[OK] Embedded poller disabled, expecting a standalone poller (python run.py --poller)")
     scheduler.start()
-    print(f"[OK] Monitoring service started (interval: {settings.polling_interval_seconds}s)")
     
     yield
     
     # Shutdown
     scheduler.shutdown()
+    await redfish_event_receiver.close()
+    await poller_coordinator.release()
+    await teams_service.close()
+    await redfish_sessions.close()
+    await manager.stop()
     await close_db()
+    await loop_monitor.stop()
 
 # Create parent app with lifespan
 app = FastAPI(
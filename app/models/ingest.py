@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.database import Base
+
+
+class IngestedSample(Base):
+    """Sample id already processed by the ingest API, so a resent batch is not applied twice"""
+    __tablename__ = "ingested_samples"
+    
+    sample_id = Column(String, primary_key=True)  # Generated by the collector per sample
+    heat_exchanger_id = Column(Integer, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# Pydantic schemas for the edge collector bulk ingest API
+class IngestSample(BaseModel):
+    """One poll of one heat exchanger, as collected at the edge"""
+    heat_exchanger_id: int
+    timestamp: datetime
+    # Unique per sample; collectors that don't send one are deduplicated by timestamp
+    sample_id: Optional[str] = Field(default=None, max_length=64)
+    manager_info: Optional[dict] = None
+    cdu_status: Optional[dict] = None
+    fan_status: Optional[list] = None
+    pump_status: Optional[list] = None
+
+
+class IngestBatch(BaseModel):
+    """Batch of buffered samples pushed by a collector"""
+    collector_id: str
+    samples: List[IngestSample] = Field(default_factory=list)
+
+
+class IngestBatchResponse(BaseModel):
+    accepted: int
+    history_rows: int
+    devices_updated: int
+    unknown_heat_exchangers: List[int] = Field(default_factory=list)
+
+
+class CollectorHeatExchanger(BaseModel):
+    """Heat exchanger a collector should poll"""
+    id: int
+    name: str
+    rscm_ip: str
+
+
+class CollectorAssignment(BaseModel):
+    monitoring_enabled: bool
+    polling_interval_seconds: int
+    heat_exchangers: List[CollectorHeatExchanger]
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class PollerLease(Base):
+    """Time-limited lease used to elect which process runs the poller"""
+    __tablename__ = "poller_leases"
+    
+    name = Column(String, primary_key=True)  # e.g. "poller"
+    holder = Column(String, nullable=False)  # hostname:pid:random of the owning process
+    renewed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
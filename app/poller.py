@@ -0,0 +1,138 @@
+"""
+Standalone poller process.
+
+Runs only the monitoring scheduler (no web server) and writes results to the database.
+Events are published through the WebSocket backplane, so run it with
+WEBSOCKET_BACKPLANE=unix and start the web tier with EMBEDDED_POLLER=false:
+
+    python run.py --poller
+"""
+import asyncio
+import signal
+from datetime import datetime
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import init_db, close_db
+from app.models.settings import SystemSettings
+from app.services.monitoring_service import monitoring_service, poller_coordinator
+from app.services.teams_service import teams_service
+from app.services.redfish_client import redfish_sessions
+from app.services.redfish_events import redfish_event_receiver
+from app.services.websocket_manager import manager
+from app.services.metrics import start_metrics_server
+from app.services.loop_monitor import loop_monitor
+
+
+# How often to pick up polling interval changes made on the Settings page
+INTERVAL_SYNC_SECONDS = 30
+
+
+async def get_polling_interval() -> int:
+    """Polling interval from the database, falling back to the config default"""
+    from app.database import async_session_maker as session_maker
+    async with session_maker() as db:
+        result = await db.execute(select(SystemSettings).limit(1))
+        system_settings = result.scalars().first()
+    if system_settings and system_settings.polling_interval_seconds:
+        return system_settings.polling_interval_seconds
+    return settings.polling_interval_seconds
+
+
+async def run_poller():
+    """Run the poller until SIGINT/SIGTERM"""
+    loop_monitor.start()
+    await init_db()
+    await manager.start()
+    
+    if settings.websocket_backplane == "memory":
+        print("[WARNING] WEBSOCKET_BACKPLANE=memory: live updates from this poller will not reach web clients")
+    
+    scheduler = AsyncIOScheduler()
+    
+    await poller_coordinator.renew()
+    scheduler.add_job(
+        poller_coordinator.renew,
+        'interval',
+        seconds=poller_coordinator.renew_interval_seconds,
+        id='renew_poller_lease'
+    )
+    
+    interval = await get_polling_interval()
+    scheduler.add_job(
+        monitoring_service.poll_assigned_heat_exchangers,
+        'interval',
+        seconds=interval,
+        id='poll_heat_exchangers'
+    )
+    
+    async def sync_polling_interval():
+        nonlocal interval
+        try:
+            new_interval = await get_polling_interval()
+        except Exception as e:
+            print(f"[WARNING] Failed to read polling interval: {e}")
+            return
+        if new_interval != interval:
+            interval = new_interval
+            scheduler.reschedule_job('poll_heat_exchangers', trigger='interval', seconds=interval)
+            print(f"[RESCHEDULE] Rescheduled polling job to {interval}s interval")
+    
+    scheduler.add_job(
+        sync_polling_interval,
+        'interval',
+        seconds=INTERVAL_SYNC_SECONDS,
+        id='sync_polling_interval'
+    )
+    
+    if settings.redfish_event_push:
+        scheduler.add_job(
+            redfish_event_receiver.reconcile_subscriptions,
+            'interval',
+            seconds=settings.redfish_event_reconcile_seconds,
+            id='reconcile_event_subscriptions',
+            next_run_time=datetime.now()
+        )
+    scheduler.start()
+    print(f"[OK] Standalone poller started (interval: {interval}s)")
+    
+    metrics_server = None
+    if settings.poller_metrics_port:
+        metrics_server = await start_metrics_server("0.0.0.0", settings.poller_metrics_port)
+        print(f"[OK] Metrics at http://0.0.0.0:{settings.poller_metrics_port}/metrics")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+    
+    try:
+        await stop.wait()
+    finally:
+        print("[STOP] Stopping standalone poller")
+        scheduler.shutdown()
+        if metrics_server is not None:
+            metrics_server.close()
+        await redfish_event_receiver.close()
+        await poller_coordinator.release()
+        await teams_service.close()
+        await redfish_sessions.close()
+        await manager.stop()
+        await close_db()
+        await loop_monitor.stop()
+
+
+def main():
+    try:
+        asyncio.run(run_poller())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,10 @@ import secrets
 from app.database import get_session
 from app.models.user import User, LoginRequest, UserResponse, RegisterRequest
 from app.config import settings
+from app.logging_config import get_logger
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
+log = get_logger("auth")
 
 # Use secret key from settings for JWT tokens
 SECRET_KEY = settings.secret_key
@@ -37,21 +39,17 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_sess
         )
     
     try:
-        print(f"[DEBUG AUTH] Attempting to decode token with SECRET_KEY length: {len(SECRET_KEY)}")
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"[DEBUG AUTH] Token decoded successfully, payload: {payload}")
         user_id_str: str = payload.get("sub")
-        print(f"[DEBUG AUTH] Extracted user_id string: {user_id_str}")
         if user_id_str is None:
-            print("[DEBUG AUTH] user_id is None")
+            log.debug("Token has no subject")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
         user_id = int(user_id_str)
-        print(f"[DEBUG AUTH] Converted to user_id int: {user_id}")
     except JWTError as e:
-        print(f"[DEBUG AUTH] JWTError during token decode: {type(e).__name__}: {e}")
+        log.debug("Token rejected: %s: %s", type(e).__name__, e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
@@ -61,13 +59,12 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_sess
     user = result.scalar_one_or_none()
     
     if user is None:
-        print(f"[DEBUG AUTH] User with id {user_id} not found in database")
+        log.debug("User %s from token not found", user_id)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
-    print(f"[DEBUG AUTH] User authenticated successfully: {user.username}")
     return user
 
 
@@ -129,10 +126,8 @@ async def login(
         )
     
     # Create access token
-    print(f"[DEBUG AUTH] Creating token for user_id: {user.id}, username: {user.username}")
-    print(f"[DEBUG AUTH] Using SECRET_KEY length: {len(SECRET_KEY)}")
     access_token = create_access_token(data={"sub": str(user.id)})
-    print(f"[DEBUG AUTH] Token created: {access_token[:50]}...")
+    log.info("User %s logged in", user.username)
     
     # Set cookie
     response.set_cookie(
@@ -143,8 +138,7 @@ async def login(
         path="/",
         samesite="lax"
     )
-    print("[DEBUG AUTH] Cookie set successfully")
-    
+
     return {
         "message": "Login successful",
         "user": UserResponse.model_validate(user)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.user import User
+from app.routers.auth import require_admin
+from app.services.slow_query_log import slow_query_log
+from app.services.loop_monitor import loop_monitor
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    sort: str = Query("total", pattern="^(total|max|mean|count)$"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_admin)
+):
+    """Slow statements with their query plans, ranked by total time (admin only)"""
+    return slow_query_log.report(sort=sort, limit=limit)
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries(current_user: User = Depends(require_admin)):
+    """Clear the recorded statements, e.g. after adding an index (admin only)"""
+    slow_query_log.reset()
+    return {"message": "Slow query log cleared"}
+
+
+@router.get("/blocking-calls")
+async def get_blocking_calls(
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(require_admin)
+):
+    """Event loop lag and the call stacks that blocked the loop, worst first (admin only)"""
+    return loop_monitor.report(limit=limit)
+
+
+@router.delete("/blocking-calls")
+async def reset_blocking_calls(current_user: User = Depends(require_admin)):
+    """Clear the recorded stacks, e.g. after moving a call off the loop (admin only)"""
+    loop_monitor.reset()
+    return {"message": "Blocking call log cleared"}
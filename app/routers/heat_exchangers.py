@@ -16,8 +16,13 @@ from app.models.heat_exchanger import (
 )
 from app.models.user import User
 from app.routers.auth import require_admin, get_current_user
-from app.services.redfish_client import RedfishClient, get_redfish_credentials
+from app.services.redfish_client import RedfishClient, get_redfish_credentials, capabilities, redfish_base_url, redfish_sessions
 from app.services.monitoring_service import MonitoringService
+from app.services.fleet_state import fleet_state
+from app.services.metrics import poll_device_last_seconds
+from app.logging_config import get_logger
+
+log = get_logger("api")
 
 router = APIRouter(prefix="/api/heat-exchangers", tags=["heat-exchangers"])
 
@@ -50,6 +55,16 @@ async def get_heat_exchanger(heat_exchanger_id: int, db: AsyncSession = Depends(
     return HeatExchangerResponse.from_orm_model(heat_exchanger)
 
 
+@router.get("/{heat_exchanger_id}/capabilities")
+async def get_heat_exchanger_capabilities(heat_exchanger_id: int, db: AsyncSession = Depends(get_session)):
+    """Redfish endpoints this poller has found present or missing on the heat exchanger's R-SCM"""
+    heat_exchanger = await db.get(HeatExchanger, heat_exchanger_id)
+    if not heat_exchanger:
+        raise HTTPException(status_code=404, detail="Heat exchanger not found")
+    
+    return capabilities.profile(redfish_base_url(heat_exchanger.rscm_ip))
+
+
 @router.post("/", response_model=HeatExchangerResponse, status_code=status.HTTP_201_CREATED)
 async def create_heat_exchanger(
     heat_exchanger: HeatExchangerCreate,
@@ -104,12 +119,14 @@ async def create_heat_exchanger(
         db.add(db_heat_exchanger)
         await db.commit()
         await db.refresh(db_heat_exchanger)
+        await db.refresh(db_heat_exchanger, attribute_names=["program"])
+        await fleet_state.publish(db_heat_exchanger)
         
         # Trigger immediate background polling for this heat exchanger
         asyncio.create_task(
             MonitoringService().poll_heat_exchanger(db_heat_exchanger.id, db_heat_exchanger.rscm_ip)
         )
-        print(f"✓ Heat exchanger {db_heat_exchanger.id} created. Initial polling started in background.")
+        log.info("Heat exchanger %s created. Initial polling started in background.", db_heat_exchanger.id)
         
     except IntegrityError:
         await db.rollback()
@@ -154,6 +171,8 @@ async def update_heat_exchanger(
     if update.type is not None:
         db_heat_exchanger.type = update.type
     if update.rscm_ip is not None:
+        if update.rscm_ip != db_heat_exchanger.rscm_ip:
+            await redfish_sessions.discard(redfish_base_url(db_heat_exchanger.rscm_ip))
         db_heat_exchanger.rscm_ip = update.rscm_ip
     if update.location is not None:
         db_heat_exchanger.city = update.location.city
@@ -172,6 +191,7 @@ async def update_heat_exchanger(
     try:
         await db.commit()
         await db.refresh(db_heat_exchanger)
+        await db.refresh(db_heat_exchanger, attribute_names=["program"])
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -179,6 +199,7 @@ async def update_heat_exchanger(
             detail="Heat exchanger with this name or IP already exists"
         )
     
+    await fleet_state.publish(db_heat_exchanger)
     return HeatExchangerResponse.from_orm_model(db_heat_exchanger)
 
 
@@ -197,7 +218,11 @@ async def delete_heat_exchanger(
     if not db_heat_exchanger:
         raise HTTPException(status_code=404, detail="Heat exchanger not found")
     
+    rscm_ip = db_heat_exchanger.rscm_ip
     await db.delete(db_heat_exchanger)
     await db.commit()
+    await redfish_sessions.discard(redfish_base_url(rscm_ip))
+    await fleet_state.publish_removed(heat_exchanger_id)
+    poll_device_last_seconds.remove(heat_exchanger_id=heat_exchanger_id)
     
     return {"message": "Heat exchanger deleted successfully"}
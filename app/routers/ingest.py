@@ -0,0 +1,232 @@
+from fastapi import APIRouter, HTTPException, Request, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pydantic import ValidationError
+import secrets
+import zlib
+
+from app.config import settings
+from app.database import get_session
+from app.models.heat_exchanger import HeatExchanger
+from app.models.monitoring_data import MonitoringData
+from app.models.settings import SystemSettings
+from app.models.ingest import IngestedSample, IngestBatch, IngestBatchResponse, CollectorAssignment, CollectorHeatExchanger
+from app.services.monitoring_service import monitoring_service
+from app.logging_config import get_logger
+
+log = get_logger("ingest")
+
+router = APIRouter(prefix="/api/ingest", tags=["ingest"])
+
+# Upper bounds on a request body as received and on a batch after decompression,
+# to protect the server from oversized payloads and gzip bombs
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+# How long processed sample ids are kept for recognising resent batches
+SAMPLE_ID_RETENTION = timedelta(days=7)
+
+
+async def require_ingest_key(request: Request):
+    """Dependency to authenticate edge collectors with the shared ingest API key"""
+    if not settings.ingest_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ingest API is disabled (INGEST_API_KEY not set)"
+        )
+    
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, settings.ingest_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ingest API key"
+        )
+
+
+@router.get("/heat-exchangers", response_model=CollectorAssignment, dependencies=[Depends(require_ingest_key)])
+async def get_collector_assignment(city: str | None = None, db: AsyncSession = Depends(get_session)):
+    """Heat exchangers a collector should poll (optionally only those in one city/site)"""
+    query = select(HeatExchanger).where(HeatExchanger.is_active == True)
+    if city:
+        query = query.where(HeatExchanger.city == city)
+    result = await db.execute(query.order_by(HeatExchanger.id))
+    heat_exchangers = result.scalars().all()
+    
+    settings_result = await db.execute(select(SystemSettings).limit(1))
+    system_settings = settings_result.scalars().first()
+    
+    return CollectorAssignment(
+        monitoring_enabled=system_settings.monitoring_enabled if system_settings else True,
+        polling_interval_seconds=(system_settings.polling_interval_seconds if system_settings else None) or settings.polling_interval_seconds,
+        heat_exchangers=[
+            CollectorHeatExchanger(id=he.id, name=he.name, rscm_ip=he.rscm_ip)
+            for he in heat_exchangers
+        ]
+    )
+
+
+async def read_body(request: Request, limit: int) -> bytes:
+    """Request body, rejected with 413 as soon as it is longer than ``limit``"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail="Batch too large")
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise HTTPException(status_code=413, detail="Batch too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post("/batch", response_model=IngestBatchResponse, dependencies=[Depends(require_ingest_key)])
+async def ingest_batch(request: Request, db: AsyncSession = Depends(get_session)):
+    """Bulk ingest samples buffered by an edge collector (body may be gzip-compressed)
+
+    Older samples are bulk-inserted as history, and the alarms they carry are raised so an
+    alarm that cleared during a WAN outage still leaves an Alert. The newest sample per heat
+    exchanger goes through the normal poll path so device state, alarms, notifications and
+    live updates match centrally polled devices. Sample ids already processed are skipped
+    (samples without an id: those already stored as history), so a collector can safely
+    resend a batch whose response it did not get.
+    """
+    body = await read_body(request, MAX_BODY_BYTES)
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        try:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = decompressor.decompress(body, MAX_BATCH_BYTES)
+            if decompressor.unconsumed_tail:
+                raise HTTPException(status_code=413, detail="Batch too large")
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+    
+    try:
+        batch = IngestBatch.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    
+    # Group by heat exchanger, oldest first
+    by_device = defaultdict(list)
+    for sample in batch.samples:
+        by_device[sample.heat_exchanger_id].append(sample)
+    
+    result = await db.execute(
+        select(HeatExchanger.id).where(HeatExchanger.id.in_(list(by_device.keys())))
+    )
+    known_ids = set(result.scalars().all())
+    unknown_ids = sorted(set(by_device) - known_ids)
+    
+    # Samples processed by an earlier delivery of this batch
+    sample_ids = [sample.sample_id for sample in batch.samples if sample.sample_id and sample.heat_exchanger_id in known_ids]
+    seen_ids = set()
+    if sample_ids:
+        result = await db.execute(select(IngestedSample.sample_id).where(IngestedSample.sample_id.in_(sample_ids)))
+        seen_ids = set(result.scalars().all())
+    
+    # Older collectors send no sample id: (heat exchanger, timestamp) pairs already stored
+    stored = set()
+    unidentified = [sample for sample in batch.samples if not sample.sample_id]
+    if known_ids and unidentified:
+        timestamps = [sample.timestamp for sample in unidentified]
+        result = await db.execute(
+            select(MonitoringData.heat_exchanger_id, MonitoringData.timestamp).where(
+                MonitoringData.heat_exchanger_id.in_(list(known_ids)),
+                MonitoringData.timestamp >= min(timestamps),
+                MonitoringData.timestamp <= max(timestamps)
+            )
+        )
+        stored = {tuple(row) for row in result.all()}
+    
+    result = await db.execute(select(SystemSettings).limit(1))
+    system_settings = result.scalars().first()
+    pump_threshold = (system_settings.pump_flow_critical_threshold if system_settings else None) or 10.0
+    
+    history_rows = []
+    latest_samples = []
+    new_ids = {}
+    for heat_exchanger_id in known_ids:
+        samples = sorted(by_device[heat_exchanger_id], key=lambda s: s.timestamp)
+        samples = [
+            s for s in samples
+            if (s.sample_id not in seen_ids if s.sample_id else (heat_exchanger_id, s.timestamp) not in stored)
+        ]
+        if not samples:
+            continue
+        new_ids.update({s.sample_id: heat_exchanger_id for s in samples if s.sample_id})
+        latest_samples.append(samples[-1])
+        buffered = [s for s in samples[:-1] if s.cdu_status]
+        if not buffered:
+            continue
+        
+        heat_exchanger = await db.get(HeatExchanger, heat_exchanger_id)
+        low_flow_pumps = {}
+        for sample in buffered:
+            status_state = (sample.manager_info or {}).get("status_state")
+            history_rows.append(monitoring_service.build_monitoring_record(
+                heat_exchanger_id,
+                sample.timestamp,
+                status_state,
+                sample.cdu_status,
+                sample.fan_status,
+                sample.pump_status
+            ))
+            # Leak, fan, pump and sensor alarms (one open Alert per alarm, as when polled)
+            await monitoring_service._process_alarms(db, heat_exchanger_id, heat_exchanger, sample.cdu_status)
+            for pump in sample.pump_status or []:
+                flow_rate = pump.get("flow_liquid")
+                if flow_rate is not None and flow_rate < pump_threshold:
+                    low_flow_pumps.setdefault(pump.get("id"), (pump, flow_rate, sample.timestamp))
+        
+        # Low flow that is still present in the newest sample is raised by save_sample;
+        # only report pumps whose low flow cleared during the outage, once each
+        still_low = {
+            pump.get("id") for pump in samples[-1].pump_status or []
+            if pump.get("flow_liquid") is not None and pump.get("flow_liquid") < pump_threshold
+        }
+        for pump_id, (pump, flow_rate, timestamp) in low_flow_pumps.items():
+            if pump_id not in still_low:
+                await monitoring_service._raise_low_flow_alarm(
+                    db, heat_exchanger_id, heat_exchanger, pump, flow_rate, pump_threshold, timestamp=timestamp
+                )
+    
+    # History, the alerts it raised and the processed sample ids are committed together,
+    # before the newest samples are applied; a resent batch then skips all of them instead
+    # of inserting history and sending notifications twice
+    if history_rows:
+        await db.execute(insert(MonitoringData), history_rows)
+    if new_ids:
+        await db.execute(insert(IngestedSample), [
+            {"sample_id": sample_id, "heat_exchanger_id": heat_exchanger_id, "received_at": datetime.utcnow()}
+            for sample_id, heat_exchanger_id in new_ids.items()
+        ])
+    await db.execute(delete(IngestedSample).where(IngestedSample.received_at < datetime.utcnow() - SAMPLE_ID_RETENTION))
+    await db.commit()
+    
+    devices_updated = 0
+    for sample in latest_samples:
+        if not sample.manager_info:
+            continue
+        await monitoring_service.save_sample(
+            sample.heat_exchanger_id,
+            sample.manager_info,
+            sample.cdu_status,
+            sample.fan_status,
+            sample.pump_status,
+            timestamp=sample.timestamp
+        )
+        devices_updated += 1
+    
+    log.info(
+        "Ingested %d samples from collector %s (%d history rows, %d devices updated)",
+        len(batch.samples), batch.collector_id, len(history_rows), devices_updated
+    )
+    
+    return IngestBatchResponse(
+        accepted=len(batch.samples),
+        history_rows=len(history_rows),
+        devices_updated=devices_updated,
+        unknown_heat_exchangers=unknown_ids
+    )
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.config import settings
+from app.services.redfish_events import redfish_event_receiver
+
+router = APIRouter(prefix="/api/redfish-events", tags=["redfish-events"])
+
+
+@router.post("/{heat_exchanger_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def receive_redfish_event(heat_exchanger_id: int, request: Request):
+    """Destination for R-SCM EventService subscriptions (push mode)"""
+    if not settings.redfish_event_push:
+        raise HTTPException(status_code=404, detail="Redfish event push is disabled")
+    
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Expected a Redfish Event object")
+    
+    if not redfish_event_receiver.verify_context(payload.get("Context")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown event context")
+    
+    await redfish_event_receiver.handle_event(heat_exchanger_id, payload)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
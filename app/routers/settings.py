@@ -15,6 +15,9 @@ from app.models.settings import (
 from app.routers.auth import require_admin
 from app.models.user import User
 from app.utils.encryption import encrypt_value, decrypt_value
+from app.logging_config import get_logger
+
+log = get_logger("settings")
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -53,7 +56,6 @@ async def update_redfish_credentials(
     current_user: User = Depends(require_admin)
 ):
     """Update Redfish API credentials (admin only)"""
-    print(f"DEBUG: Updating Redfish credentials - username: {credentials.username}, password: {'*' * len(credentials.password)}")
     settings = await get_or_create_settings(db)
     
     settings.redfish_username = credentials.username
@@ -61,7 +63,7 @@ async def update_redfish_credentials(
     
     await db.commit()
     
-    print(f"DEBUG: Credentials saved - username: {settings.redfish_username}, password: {'*' * len(settings.redfish_password)}")
+    log.info("Redfish credentials updated by %s", current_user.username)
     
     return {
         "message": "Redfish credentials updated successfully",
@@ -167,7 +169,7 @@ async def update_monitoring_setting(
     await db.refresh(settings)
     
     status = "enabled" if settings.monitoring_enabled else "disabled"
-    print(f"📊 Monitoring {status} by {current_user.username}")
+    log.info("Monitoring %s by %s", status, current_user.username)
     
     return {
         "message": f"Monitoring settings updated successfully",
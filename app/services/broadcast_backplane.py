@@ -0,0 +1,253 @@
+"""Broadcast backplanes used to fan WebSocket events out across worker processes
+
+``InProcessBackplane`` (default) delivers straight to the local ConnectionManager.
+``UnixSocketBackplane`` lets several uvicorn workers on one host share events:
+one worker (elected with an exclusive file lock) runs a small hub on a Unix domain
+socket that relays every published line to all workers, including itself. If the
+hub worker dies its lock is released and another worker takes over.
+
+The hub stamps every line with its epoch and a sequence number before fanning it out,
+so all workers number events identically and a client can resume on any worker.
+A new hub starts a new epoch.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.logging_config import get_logger
+
+log = get_logger("websocket")
+
+
+# deliver(message, topics, stamp): stamp is the hub's (epoch, sequence), or None when
+# the event was not relayed and the receiver numbers it itself
+Deliver = Callable[[Dict, Optional[List[str]], Optional[Tuple[str, int]]], None]
+
+# Max size of one relayed event (monitoring updates carry the raw Redfish payload)
+MAX_LINE_BYTES = 4 * 1024 * 1024
+# Unsent bytes the hub buffers for one worker before dropping it as too slow (it reconnects)
+MAX_PEER_BUFFER_BYTES = 4 * MAX_LINE_BYTES
+# Events a worker queues for the hub before dropping new ones (the hub is stalled)
+MAX_PENDING_EVENTS = 1000
+
+
+class InProcessBackplane:
+    """Single-process backplane: publishing delivers immediately"""
+
+    def __init__(self):
+        self.deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def publish(self, message: Dict, topics: Optional[List[str]]):
+        self.deliver(message, topics, None)
+
+    async def stop(self):
+        pass
+
+
+class UnixSocketBackplane:
+    """Cross-process backplane over a Unix domain socket (newline-delimited JSON)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.deliver: Optional[Deliver] = None
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: List[asyncio.StreamWriter] = []
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        # publish() only queues; the writer task sends, so a stalled hub never blocks broadcast()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self._stopping = False
+        # Hub only: numbering of relayed events
+        self._epoch = ""
+        self._sequence = 0
+
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+        self._stopping = False
+        self._outbox = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        reader = await self._connect()
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+        self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def publish(self, message: Dict, topics: Optional[List[str]]):
+        line = json.dumps({"message": message, "topics": topics}, default=str, separators=(",", ":"))
+        if len(line) >= MAX_LINE_BYTES:
+            log.warning("Event of %d bytes is too large for the backplane, delivering locally", len(line))
+            self.deliver(message, topics, None)
+            return
+        if self._writer is None:
+            # Hub unreachable: still serve this worker's own clients
+            self.deliver(message, topics, None)
+            return
+        try:
+            self._outbox.put_nowait((message, topics, line.encode("utf-8") + b"\n"))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                log.warning("WebSocket backplane hub not keeping up, %d events dropped", self.dropped)
+
+    async def stop(self):
+        self._stopping = True
+        for task in (self._reader_task, self._writer_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reader_task = None
+        self._writer_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._server is not None:
+            for peer in self._peers:
+                peer.close()
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _try_become_hub(self) -> bool:
+        """Take the hub lock if no other live worker holds it"""
+        import fcntl  # Unix only, imported here so the default backplane works everywhere
+
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _start_hub(self):
+        # Any socket file left behind belongs to a dead hub since we hold the lock
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._epoch = uuid.uuid4().hex[:12]
+        self._sequence = 0
+        self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path, limit=MAX_LINE_BYTES)
+        log.info("WebSocket backplane hub listening on %s (pid %d)", self.path, os.getpid())
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Hub side: relay each line from a worker to every connected worker"""
+        self._peers.append(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.startswith(b"{"):
+                    continue
+                # Splice the stamp into the envelope instead of re-encoding the whole event
+                self._sequence += 1
+                line = b'{"epoch":"%s","seq":%d,' % (self._epoch.encode("ascii"), self._sequence) + line[1:]
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > MAX_PEER_BUFFER_BYTES:
+                        # Not reading: drop it rather than buffer without limit or stall the others
+                        log.warning("Dropping slow WebSocket backplane worker")
+                        self._drop_peer(peer)
+                        continue
+                    try:
+                        peer.write(line)
+                    except Exception:
+                        self._drop_peer(peer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            # Line over the stream limit
+            log.warning("Dropping WebSocket backplane worker: %s", e)
+        finally:
+            if writer in self._peers:
+                self._peers.remove(writer)
+            writer.close()
+
+    def _drop_peer(self, peer: asyncio.StreamWriter):
+        if peer in self._peers:
+            self._peers.remove(peer)
+        peer.close()
+
+    async def _connect(self):
+        """Connect to the hub, becoming the hub first if nobody else is"""
+        if self._server is None and self._try_become_hub():
+            await self._start_hub()
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE_BYTES)
+        except OSError as e:
+            log.warning("WebSocket backplane hub not reachable: %s", e)
+            return None
+        self._writer = writer
+        return reader
+
+    async def _write_loop(self):
+        """Send queued events to the hub, delivering locally while it is unreachable"""
+        while True:
+            message, topics, line = await self._outbox.get()
+            writer = self._writer
+            if writer is None:
+                self.deliver(message, topics, None)
+                continue
+            try:
+                writer.write(line)
+                await writer.drain()
+            except (ConnectionError, OSError) as e:
+                log.warning("Backplane publish failed, delivering locally: %s", e)
+                if self._writer is writer:
+                    self._writer = None
+                self.deliver(message, topics, None)
+
+    async def _read_loop(self, reader: Optional[asyncio.StreamReader]):
+        """Deliver relayed events to this worker's clients, reconnecting if the hub goes away"""
+        while not self._stopping:
+            if reader is None:
+                reader = await self._connect()
+                if reader is None:
+                    await asyncio.sleep(1.0)
+                    continue
+            try:
+                line = await reader.readline()
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                # ValueError: a line over the stream limit; the stream cannot be resynchronized
+                log.warning("WebSocket backplane read failed, reconnecting: %s", e)
+                line = b""
+            if not line:
+                if not self._stopping:
+                    log.warning("WebSocket backplane hub disconnected, reconnecting")
+                if self._writer is not None:
+                    self._writer.close()
+                self._writer = None
+                reader = None
+                continue
+            try:
+                envelope = json.loads(line)
+                stamp = (envelope["epoch"], envelope["seq"]) if "seq" in envelope else None
+                self.deliver(envelope["message"], envelope.get("topics"), stamp)
+            except Exception as e:
+                log.error("Error handling backplane message: %s", e)
+
+
+def create_backplane():
+    """Build the backplane selected by WEBSOCKET_BACKPLANE"""
+    if settings.websocket_backplane == "unix":
+        return UnixSocketBackplane(settings.websocket_backplane_path)
+    return InProcessBackplane()
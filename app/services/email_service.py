@@ -8,6 +8,9 @@ import json
 
 from app.models.settings import SystemSettings
 from app.utils.encryption import decrypt_value
+from app.logging_config import get_logger
+
+log = get_logger("notifications")
 
 
 class EmailService:
@@ -24,7 +27,7 @@ class EmailService:
         settings = result.scalars().first()
         
         if not settings or not settings.smtp_enabled:
-            print(f"⚠️ URGENT ALARM: {heat_exchanger_name} - Pump {pump_id} flow rate critically low: {flow_rate} L/min (Email disabled)")
+            log.warning("URGENT ALARM: %s - Pump %s flow rate critically low: %s L/min (Email disabled)", heat_exchanger_name, pump_id, flow_rate)
             return
         
         # Parse recipient emails
@@ -34,7 +37,7 @@ class EmailService:
             to_emails = []
         
         if not to_emails:
-            print(f"⚠️ URGENT ALARM: {heat_exchanger_name} - Pump {pump_id} flow rate critically low: {flow_rate} L/min (No recipients configured)")
+            log.warning("URGENT ALARM: %s - Pump %s flow rate critically low: %s L/min (No recipients configured)", heat_exchanger_name, pump_id, flow_rate)
             return
         
         try:
@@ -73,9 +76,9 @@ Please investigate immediately to prevent equipment damage.
                     server.login(settings.smtp_username, smtp_password)
                 server.send_message(message)
             
-            print(f"✅ Urgent alarm email sent for {heat_exchanger_name} - Pump {pump_id}")
+            log.info("Urgent alarm email sent for %s - Pump %s", heat_exchanger_name, pump_id)
         except Exception as e:
-            print(f"❌ Failed to send urgent alarm email: {e}")
+            log.error("Failed to send urgent alarm email: %s", e)
 
 
 email_service = EmailService()
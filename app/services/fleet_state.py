@@ -0,0 +1,106 @@
+"""Live fleet state pushed to dashboards over WebSocket
+
+The poller publishes per-device deltas (only the fields that changed since the
+last publish) to the ``fleet`` topic, and new dashboard connections receive a
+full snapshot, so browsers no longer need to poll the REST API.
+"""
+from typing import Any, Dict, Optional
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+
+from app.models.heat_exchanger import HeatExchanger, HeatExchangerResponse
+from app.models.monitoring_data import MonitoringData, MonitoringDataResponse
+from app.services.websocket_manager import manager, heat_exchanger_topic
+
+
+def build_device_state(heat_exchanger: HeatExchanger, latest: Optional[MonitoringData]) -> Dict[str, Any]:
+    """Flatten a heat exchanger and its latest reading into the dashboard's device state
+
+    ``heat_exchanger.program`` must already be loaded.
+    """
+    state = HeatExchangerResponse.from_orm_model(heat_exchanger).model_dump(mode="json")
+    # raw_data is only used by the detail page charts, keep the dashboard payload compact
+    state["latest"] = (
+        MonitoringDataResponse.model_validate(latest).model_dump(mode="json", exclude={"raw_data"})
+        if latest is not None else None
+    )
+    return state
+
+
+class FleetState:
+    """Last published state per heat exchanger, used to compute deltas"""
+
+    def __init__(self):
+        self.devices: Dict[int, Dict[str, Any]] = {}
+
+    def diff(self, heat_exchanger_id: int, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Record the new state and return only the fields that changed"""
+        previous = self.devices.get(heat_exchanger_id, {})
+        changes = {key: value for key, value in state.items() if previous.get(key, object()) != value}
+        # An update without a new reading keeps the previous one
+        if "latest" not in state and "latest" in previous:
+            state = {**state, "latest": previous["latest"]}
+        self.devices[heat_exchanger_id] = state
+        return changes
+
+    async def publish(self, heat_exchanger: HeatExchanger, latest: Optional[MonitoringData] = None):
+        """Push the changed fields of one device to fleet subscribers
+
+        Without ``latest`` (device edited, or a poll with no new reading) the delta leaves
+        the reading out, so dashboards keep the one they have. Only ``publish_removed``
+        clears it.
+        """
+        state = build_device_state(heat_exchanger, latest)
+        if latest is None:
+            del state["latest"]
+        changes = self.diff(heat_exchanger.id, state)
+        if not changes:
+            return
+        await manager.broadcast({
+            "type": "fleet_delta",
+            "heat_exchanger_id": heat_exchanger.id,
+            "changes": changes
+        }, topics=["fleet", heat_exchanger_topic(heat_exchanger.id)])
+
+    async def publish_removed(self, heat_exchanger_id: int):
+        """Tell fleet subscribers a device was deleted"""
+        self.devices.pop(heat_exchanger_id, None)
+        await manager.broadcast({
+            "type": "fleet_remove",
+            "heat_exchanger_id": heat_exchanger_id
+        }, topics=["fleet", heat_exchanger_topic(heat_exchanger_id)])
+
+    async def snapshot(self, db) -> Dict[str, Any]:
+        """Full state of every heat exchanger, sent to clients when they connect"""
+        result = await db.execute(
+            select(HeatExchanger)
+            .options(selectinload(HeatExchanger.program))
+            .order_by(HeatExchanger.created_at.desc())
+        )
+        heat_exchangers = result.scalars().all()
+
+        # Latest reading per heat exchanger (same query as /api/monitoring/latest)
+        subquery = (
+            select(
+                MonitoringData.heat_exchanger_id,
+                func.max(MonitoringData.timestamp).label("max_timestamp")
+            )
+            .group_by(MonitoringData.heat_exchanger_id)
+            .subquery()
+        )
+        latest_result = await db.execute(
+            select(MonitoringData).join(
+                subquery,
+                (MonitoringData.heat_exchanger_id == subquery.c.heat_exchanger_id) &
+                (MonitoringData.timestamp == subquery.c.max_timestamp)
+            )
+        )
+        latest = {data.heat_exchanger_id: data for data in latest_result.scalars().all()}
+
+        return {
+            "type": "fleet_snapshot",
+            "devices": [build_device_state(he, latest.get(he.id)) for he in heat_exchangers]
+        }
+
+
+fleet_state = FleetState()
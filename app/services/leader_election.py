@@ -0,0 +1,120 @@
+"""DB-backed leader election so only one process polls the R-SCMs
+
+Every process running the scheduler tries to acquire or renew the ``poller`` lease
+every few seconds. The holder keeps renewing it; if it dies, the lease expires after
+``poller_lease_seconds`` and another process takes over on its next attempt.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.poller_lease import PollerLease
+from app.logging_config import get_logger
+
+log = get_logger("coordination")
+
+
+class LeaderElection:
+    def __init__(self, name: str = "poller"):
+        self.name = name
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_expires_at: datetime | None = None
+
+    @property
+    def ttl_seconds(self) -> int:
+        return settings.poller_lease_seconds
+
+    @property
+    def renew_interval_seconds(self) -> float:
+        return max(1.0, self.ttl_seconds / 3)
+
+    @property
+    def is_leader(self) -> bool:
+        """True while we hold an unexpired lease"""
+        return self.lease_expires_at is not None and datetime.utcnow() < self.lease_expires_at
+
+    @property
+    def is_active(self) -> bool:
+        return self.is_leader
+
+    def owns(self, heat_exchanger_id: int) -> bool:
+        """The leader polls every heat exchanger"""
+        return self.is_leader
+
+    async def renew(self) -> bool:
+        """Acquire the lease if it is free or expired, or extend it if we already hold it"""
+        from app.database import async_session_maker as session_maker
+        if session_maker is None:
+            return False
+        
+        was_leader = self.is_leader
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        acquired = False
+        
+        try:
+            async with session_maker() as db:
+                result = await db.execute(
+                    update(PollerLease)
+                    .where(
+                        PollerLease.name == self.name,
+                        or_(PollerLease.holder == self.holder_id, PollerLease.expires_at < now)
+                    )
+                    .values(holder=self.holder_id, renewed_at=now, expires_at=expires_at)
+                )
+                acquired = result.rowcount > 0
+                
+                if not acquired and await db.get(PollerLease, self.name) is None:
+                    # First process ever: create the lease row
+                    db.add(PollerLease(
+                        name=self.name,
+                        holder=self.holder_id,
+                        renewed_at=now,
+                        expires_at=expires_at
+                    ))
+                    acquired = True
+                
+                await db.commit()
+        except IntegrityError:
+            # Another process created the row first
+            acquired = False
+        except Exception as e:
+            log.warning("Failed to renew %s lease: %s", self.name, e)
+            acquired = False
+        
+        self.lease_expires_at = expires_at if acquired else None
+        
+        if acquired and not was_leader:
+            log.info("Acquired %s lease (%s)", self.name, self.holder_id)
+        elif was_leader and not acquired:
+            log.warning("Lost %s lease (%s)", self.name, self.holder_id)
+        
+        return acquired
+
+    async def release(self):
+        """Give up the lease on shutdown so another process can take over immediately"""
+        from app.database import async_session_maker as session_maker
+        if session_maker is None or self.lease_expires_at is None:
+            return
+        
+        try:
+            async with session_maker() as db:
+                await db.execute(
+                    update(PollerLease)
+                    .where(PollerLease.name == self.name, PollerLease.holder == self.holder_id)
+                    .values(expires_at=datetime.utcnow())
+                )
+                await db.commit()
+            log.info("Released %s lease", self.name)
+        except Exception as e:
+            log.warning("Failed to release %s lease: %s", self.name, e)
+        finally:
+            self.lease_expires_at = None
+
+
+# Global poller election instance
+leader_election = LeaderElection()
@@ -0,0 +1,216 @@
+"""Event-loop lag monitor and blocking-call detector
+
+A background task sleeps for ``LOOP_LAG_INTERVAL_MS`` and measures how much later than
+requested it wakes up. That delay is the time every other coroutine had to wait for the
+loop, and it goes into ``cooling_event_loop_lag_seconds`` together with recent percentiles.
+
+In debug mode (or with ``LOOP_BLOCK_CAPTURE=true``) a watchdog thread also checks the
+monitor's heartbeat. When the loop has not come back for ``LOOP_BLOCK_THRESHOLD_MS``, the
+watchdog captures the loop thread's stack, which points at the call that is blocking it
+(bcrypt, smtplib, subprocess, ...). Stacks are grouped at ``GET /api/diagnostics/blocking-calls``.
+"""
+import asyncio
+import selectors
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.logging_config import get_logger
+from app.services.metrics import metrics
+
+log = get_logger("loop")
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LAG_QUANTILES = (0.5, 0.95, 0.99, 1.0)
+# Percentiles are taken over the last minute of samples
+LAG_WINDOW_SECONDS = 60
+MAX_STACK_FRAMES = 20
+MAX_BLOCKING_STACKS = 100
+
+event_loop_lag_seconds = metrics.histogram(
+    "cooling_event_loop_lag_seconds", "Delay between when the event loop should and did run a timer",
+    buckets=LAG_BUCKETS
+)
+event_loop_lag_recent_seconds = metrics.gauge(
+    "cooling_event_loop_lag_recent_seconds", "Event loop lag percentiles over the last minute", ["quantile"]
+)
+event_loop_blocked = metrics.counter(
+    "cooling_event_loop_blocked_total", "Times the event loop was blocked for longer than LOOP_BLOCK_THRESHOLD_MS"
+)
+
+
+class BlockingStack:
+    """One call stack seen blocking the loop, with how often and how long"""
+
+    def __init__(self, stack: List[str]):
+        self.stack = stack
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.first_seen = datetime.utcnow()
+        self.last_seen = self.first_seen
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "location": self.stack[-1] if self.stack else "",
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "stack": self.stack,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat()
+        }
+
+
+class LoopMonitor:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._samples: Deque[float] = deque()
+        # Monotonic time the monitor task last ran; read by the watchdog thread
+        self._heartbeat = 0.0
+        self._interval = 0.1
+        # Stack captured for the stall in progress, completed when the loop wakes up again
+        self._stall: Optional[Tuple[float, Tuple]] = None
+        self._lock = threading.Lock()
+        self.stacks: Dict[Tuple, BlockingStack] = {}
+
+    @property
+    def capturing(self) -> bool:
+        return self._watchdog is not None
+
+    def start(self):
+        """Start measuring the running loop (call from inside it)"""
+        if self._task is not None:
+            return
+        self._interval = settings.loop_lag_interval_ms / 1000
+        self._samples = deque(maxlen=max(1, int(LAG_WINDOW_SECONDS / self._interval)))
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        if settings.debug or settings.loop_block_capture:
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        ticks = 0
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self._record(lag)
+
+            ticks += 1
+            if ticks % 10 == 0:
+                self._update_percentiles()
+
+    def _record(self, lag: float):
+        event_loop_lag_seconds.observe(lag)
+        self._samples.append(lag)
+        if lag * 1000 >= settings.loop_block_threshold_ms:
+            event_loop_blocked.inc()
+        with self._lock:
+            stall, self._stall = self._stall, None
+            entry = self.stacks.get(stall[1]) if stall is not None else None
+            if entry is not None and lag * 1000 < settings.loop_block_threshold_ms:
+                # The watchdog thread itself was late (GIL contention), not the loop
+                entry.count -= 1
+                if entry.count <= 0:
+                    del self.stacks[stall[1]]
+                stall = None
+            elif entry is not None:
+                entry.total_seconds += lag
+                entry.max_seconds = max(entry.max_seconds, lag)
+        if stall is not None:
+            log.warning(
+                "Event loop blocked for %.0f ms at %s", lag * 1000, stall[1][-1] if stall[1] else "?",
+                extra={"lag_ms": round(lag * 1000, 1)}
+            )
+
+    def _update_percentiles(self):
+        ordered = sorted(self._samples)
+        for quantile in LAG_QUANTILES:
+            index = min(len(ordered) - 1, int(quantile * len(ordered)))
+            event_loop_lag_recent_seconds.set(ordered[index], quantile=str(quantile))
+
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack while the loop is stuck"""
+        threshold = settings.loop_block_threshold_ms / 1000
+        # Check a few times per threshold so short stalls are still caught mid-call
+        check_every = max(0.005, threshold / 4)
+        while not self._stopping.wait(check_every):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self._interval
+            if overdue < threshold:
+                continue
+            with self._lock:
+                if self._stall is not None and self._stall[0] == heartbeat:
+                    # Already captured this stall
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None or frame.f_code.co_filename == selectors.__file__:
+                # Waiting for I/O means the loop is idle, not blocked
+                continue
+            stack = tuple(
+                f"{summary.filename}:{summary.lineno} in {summary.name}"
+                for summary in traceback.extract_stack(frame)[-MAX_STACK_FRAMES:]
+            )
+            with self._lock:
+                self._stall = (heartbeat, stack)
+                entry = self.stacks.get(stack)
+                if entry is None:
+                    if len(self.stacks) >= MAX_BLOCKING_STACKS:
+                        cheapest = min(self.stacks.values(), key=lambda s: s.total_seconds)
+                        del self.stacks[tuple(cheapest.stack)]
+                    entry = self.stacks[stack] = BlockingStack(list(stack))
+                entry.count += 1
+                entry.last_seen = datetime.utcnow()
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        """Lag percentiles and the stacks that blocked the loop, worst first"""
+        with self._lock:
+            ranked = sorted(self.stacks.values(), key=lambda s: s.total_seconds, reverse=True)
+        ordered = sorted(self._samples)
+        percentiles = {
+            ("max_ms" if quantile == 1.0 else f"p{int(quantile * 100)}_ms"): round(ordered[min(len(ordered) - 1, int(quantile * len(ordered)))] * 1000, 1)
+            for quantile in LAG_QUANTILES
+        } if ordered else {}
+        return {
+            "running": self._task is not None,
+            "capturing_stacks": self.capturing,
+            "threshold_ms": settings.loop_block_threshold_ms,
+            "lag": percentiles,
+            "blocking_calls": [s.to_dict() for s in ranked[:limit]]
+        }
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+
+
+# Global loop monitor instance (one per process)
+loop_monitor = LoopMonitor()
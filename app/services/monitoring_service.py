@@ -1,18 +1,43 @@
 from datetime import datetime
-from typing import List
+from typing import Callable, List, Optional
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 import json
 import asyncio
+import time
 
 from app.database import async_session_maker
-from app.services.redfish_client import RedfishClient, get_redfish_credentials
+from app.services.redfish_client import RedfishClient, get_redfish_credentials, redfish_base_url, redfish_sessions
 from app.models.heat_exchanger import HeatExchanger
-from app.models.monitoring_data import MonitoringData
+from app.models.monitoring_data import MonitoringData, MonitoringDataResponse
 from app.models.settings import SystemSettings
 from app.models.alert import Alert
-from app.services.websocket_manager import manager
+from app.services.websocket_manager import manager, heat_exchanger_topic
 from app.services.email_service import email_service
 from app.services.teams_service import teams_service
+from app.services.fleet_state import fleet_state
+from app.services.leader_election import leader_election
+from app.services.shard_coordinator import shard_coordinator
+from app.services.metrics import (
+    alarm_processing_seconds,
+    db_commit_seconds,
+    notification_seconds,
+    poll_cycle_seconds,
+    poll_device_last_seconds,
+    poll_device_seconds,
+    poll_results,
+    poll_stage_seconds
+)
+from app.config import settings as app_settings
+from app.logging_config import get_logger
+
+log = get_logger("poller")
+alarm_log = get_logger("alarms")
+
+
+# Decides which heat exchangers this process polls: all of them while holding the
+# poller lease, or its consistent-hash share when sharding across several pollers
+poller_coordinator = shard_coordinator if app_settings.poller_sharding else leader_election
 
 
 class MonitoringService:
@@ -21,6 +46,7 @@ class MonitoringService:
     
     async def poll_heat_exchanger(self, heat_exchanger_id: int, rscm_ip: str):
         """Poll a single heat exchanger and save data"""
+        start = time.perf_counter()
         try:
             # Check if monitoring is enabled
             from app.database import async_session_maker as session_maker
@@ -29,190 +55,330 @@ class MonitoringService:
                 settings = result.scalars().first()
                 
                 if not settings or not settings.monitoring_enabled:
+                    poll_results.inc(result="skipped")
                     return  # Skip polling if monitoring is disabled
             
             # Get credentials and create Redfish client
             username, password = await get_redfish_credentials()
-            print(f"DEBUG: Using credentials - username: {username}, password: {'*' * len(password) if password else 'None'}")
-            
             client = RedfishClient(rscm_ip, username, password)
-            print(f"DEBUG: Connecting to {client.base_url}/redfish/v1/Managers/RackManager")
+            log.debug("Polling heat exchanger %s at %s", heat_exchanger_id, client.base_url)
             
-            # Get manager information only
-            manager_info = await client.get_manager_info()
+            with poll_stage_seconds.time(stage="collect"):
+                sample = await self.collect_sample(client)
             
-            # Get CDU controller status
-            cdu_status = await client.get_cdu_status()
+            if not sample["manager_info"]:
+                log.warning("No manager info retrieved for heat exchanger %s", heat_exchanger_id)
+                poll_results.inc(result="no_data")
+                return
             
-            # Get fan status
-            fan_status = await client.get_fan_status()
+            with poll_stage_seconds.time(stage="save"):
+                await self.save_sample(heat_exchanger_id, **sample)
             
-            # Get pump status
-            pump_status = await client.get_pump_status()
+            log.debug("Polled heat exchanger %s", heat_exchanger_id)
+            poll_results.inc(result="unchanged" if sample["unchanged"] else "ok")
             
-            if not manager_info:
-                print(f"⚠ No manager info retrieved for heat exchanger {heat_exchanger_id}")
-                return
+        except Exception as e:
+            log.error("Error polling heat exchanger %s: %s", heat_exchanger_id, e)
+            poll_results.inc(result="error")
+        finally:
+            elapsed = time.perf_counter() - start
+            poll_device_seconds.observe(elapsed)
+            poll_device_last_seconds.set(round(elapsed, 6), heat_exchanger_id=heat_exchanger_id)
+    
+    async def collect_sample(self, client: RedfishClient) -> dict:
+        """Fetch everything we store for one heat exchanger from its R-SCM"""
+        # Get manager information only
+        manager_info = await client.get_manager_info()
+        
+        # Get CDU controller status
+        cdu_status = await client.get_cdu_status()
+        
+        # Get fan status
+        fan_status = await client.get_fan_status()
+        
+        # Get pump status
+        pump_status = await client.get_pump_status()
+        
+        return {
+            "manager_info": manager_info,
+            "cdu_status": cdu_status,
+            "fan_status": fan_status,
+            "pump_status": pump_status,
+            # Every resource answered 304 Not Modified
+            "unchanged": client.unchanged
+        }
+    
+    @staticmethod
+    def build_monitoring_record(
+        heat_exchanger_id: int,
+        timestamp: datetime,
+        status_state: Optional[str],
+        cdu_status: dict,
+        fan_status: Optional[list],
+        pump_status: Optional[list]
+    ) -> dict:
+        """Column values for a MonitoringData row built from one sample"""
+        # Extract ambient readings from CDU controller status
+        controller_status = cdu_status.get("controller_status", {})
+        ambient_temp = controller_status.get("AmbientTemperature")
+        ambient_humidity = controller_status.get("AmbientHumidity")
+        
+        # Combine all data for historical storage
+        combined_data = {
+            "cdu_status": cdu_status,
+            "fan_status": fan_status,
+            "pump_status": pump_status
+        }
+        
+        return {
+            "heat_exchanger_id": heat_exchanger_id,
+            "timestamp": timestamp,
+            "temperature": ambient_temp if ambient_temp is not None else 0.0,
+            "fan_speed": 0,  # Not available from current endpoints
+            "power_consumption": 0.0,  # Not tracked per user request
+            "humidity": ambient_humidity if ambient_humidity is not None else None,
+            "status": status_state or "normal",
+            "ambient_temperature": ambient_temp,
+            "ambient_humidity": ambient_humidity,
+            "raw_data": json.dumps(combined_data)
+        }
+    
+    async def save_sample(
+        self,
+        heat_exchanger_id: int,
+        manager_info: dict,
+        cdu_status: Optional[dict],
+        fan_status: Optional[list],
+        pump_status: Optional[list],
+        timestamp: Optional[datetime] = None,
+        unchanged: bool = False
+    ):
+        """Update the heat exchanger from a sample, store its reading and raise alarms
+
+        ``unchanged`` means the device reported exactly the same resources as last poll:
+        the reading is recorded and alarms are checked again (an alert resolved while the
+        device is still in alarm is raised again), but the device fields are not rewritten.
+        """
+        timestamp = timestamp or datetime.utcnow()
+        
+        # Update heat exchanger with manager info
+        from app.database import async_session_maker as session_maker
+        async with session_maker() as db:
+            # Get system settings for alarm threshold
+            settings_result = await db.execute(select(SystemSettings).limit(1))
+            system_settings = settings_result.scalars().first()
+            pump_threshold = system_settings.pump_flow_critical_threshold if system_settings else 10.0
             
-            # Update heat exchanger with manager info
-            from app.database import async_session_maker as session_maker
-            async with session_maker() as db:
-                # Get system settings for alarm threshold
-                settings_result = await db.execute(select(SystemSettings).limit(1))
-                system_settings = settings_result.scalars().first()
-                pump_threshold = system_settings.pump_flow_critical_threshold if system_settings else 10.0
+            result = await db.execute(
+                select(HeatExchanger)
+                .options(selectinload(HeatExchanger.program))
+                .where(HeatExchanger.id == heat_exchanger_id)
+            )
+            heat_exchanger = result.scalars().first()
+            monitoring_data = None
+            if heat_exchanger and unchanged:
+                # Same bodies as last poll, but alerts resolved since then must come back
+                # while the device is still in alarm
+                if cdu_status:
+                    with alarm_processing_seconds.time(check="cdu"):
+                        await self._process_alarms(db, heat_exchanger_id, heat_exchanger, cdu_status)
+                    monitoring_data = MonitoringData(**self.build_monitoring_record(
+                        heat_exchanger_id,
+                        timestamp,
+                        heat_exchanger.status_state,
+                        cdu_status,
+                        fan_status,
+                        pump_status
+                    ))
+                    db.add(monitoring_data)
+                if pump_status:
+                    await self._check_low_flow(db, heat_exchanger_id, heat_exchanger, pump_status, pump_threshold)
+                with db_commit_seconds.time(operation="sample_unchanged"):
+                    await db.commit()
+                if monitoring_data is not None:
+                    await fleet_state.publish(heat_exchanger, monitoring_data)
+                    await manager.broadcast({
+                        "type": "monitoring_update",
+                        "heat_exchanger_id": heat_exchanger_id,
+                        "data": MonitoringDataResponse.model_validate(monitoring_data).model_dump(mode="json")
+                    }, topics=[heat_exchanger_topic(heat_exchanger_id)])
+            elif heat_exchanger:
+                heat_exchanger.manager_type = manager_info.get("manager_type")
+                heat_exchanger.model = manager_info.get("model")
+                heat_exchanger.firmware_version = manager_info.get("firmware_version")
+                heat_exchanger.status_state = manager_info.get("status_state")
+                heat_exchanger.status_health = manager_info.get("status_health")
+                heat_exchanger.hostname = manager_info.get("hostname")
+                heat_exchanger.unique_id = manager_info.get("unique_id")
+                heat_exchanger.time_since_boot = manager_info.get("time_since_boot")
                 
-                result = await db.execute(
-                    select(HeatExchanger).where(HeatExchanger.id == heat_exchanger_id)
-                )
-                heat_exchanger = result.scalars().first()
-                if heat_exchanger:
-                    heat_exchanger.manager_type = manager_info.get("manager_type")
-                    heat_exchanger.model = manager_info.get("model")
-                    heat_exchanger.firmware_version = manager_info.get("firmware_version")
-                    heat_exchanger.status_state = manager_info.get("status_state")
-                    heat_exchanger.status_health = manager_info.get("status_health")
-                    heat_exchanger.hostname = manager_info.get("hostname")
-                    heat_exchanger.unique_id = manager_info.get("unique_id")
-                    heat_exchanger.time_since_boot = manager_info.get("time_since_boot")
+                # Update CDU status if available
+                if cdu_status:
+                    heat_exchanger.cdu_chassis_status = json.dumps(cdu_status.get("chassis_status", {}))
+                    heat_exchanger.cdu_controller_status = json.dumps(cdu_status.get("controller_status", {}))
+                    heat_exchanger.cdu_alarms = json.dumps({
+                        "fan_alarms": cdu_status.get("fan_alarms"),
+                        "pump_alarms": cdu_status.get("pump_alarms"),
+                        "sensor_alarms": cdu_status.get("sensor_alarms"),
+                        "leak_alarms": cdu_status.get("leak_alarms")
+                    })
                     
-                    # Update CDU status if available
-                    if cdu_status:
-                        heat_exchanger.cdu_chassis_status = json.dumps(cdu_status.get("chassis_status", {}))
-                        heat_exchanger.cdu_controller_status = json.dumps(cdu_status.get("controller_status", {}))
-                        heat_exchanger.cdu_alarms = json.dumps({
-                            "fan_alarms": cdu_status.get("fan_alarms"),
-                            "pump_alarms": cdu_status.get("pump_alarms"),
-                            "sensor_alarms": cdu_status.get("sensor_alarms"),
-                            "leak_alarms": cdu_status.get("leak_alarms")
-                        })
-                        
-                        # Process all alarm types and create Alert records
+                    # Process all alarm types and create Alert records
+                    with alarm_processing_seconds.time(check="cdu"):
                         await self._process_alarms(db, heat_exchanger_id, heat_exchanger, cdu_status)
-                        
-                        # Extract ambient readings from CDU controller status
-                        controller_status = cdu_status.get("controller_status", {})
-                        ambient_temp = controller_status.get("AmbientTemperature")
-                        ambient_humidity = controller_status.get("AmbientHumidity")
-                        
-                        # Combine all data for historical storage
-                        combined_data = {
-                            "cdu_status": cdu_status,
-                            "fan_status": fan_status,
-                            "pump_status": pump_status
-                        }
-                        
-                        # Create monitoring data record with ambient values
-                        monitoring_data = MonitoringData(
-                            heat_exchanger_id=heat_exchanger_id,
-                            timestamp=datetime.utcnow(),
-                            temperature=ambient_temp if ambient_temp is not None else 0.0,
-                            fan_speed=0,  # Not available from current endpoints
-                            power_consumption=0.0,  # Not tracked per user request
-                            humidity=ambient_humidity if ambient_humidity is not None else None,
-                            status=heat_exchanger.status_state or "normal",
-                            ambient_temperature=ambient_temp,
-                            ambient_humidity=ambient_humidity,
-                            raw_data=json.dumps(combined_data)
-                        )
-                        db.add(monitoring_data)
                     
-                    # Update fan status if available
-                    if fan_status:
-                        heat_exchanger.fan_status = json.dumps(fan_status)
+                    # Create monitoring data record with ambient values
+                    monitoring_data = MonitoringData(**self.build_monitoring_record(
+                        heat_exchanger_id,
+                        timestamp,
+                        heat_exchanger.status_state,
+                        cdu_status,
+                        fan_status,
+                        pump_status
+                    ))
+                    db.add(monitoring_data)
+                
+                # Update fan status if available
+                if fan_status:
+                    heat_exchanger.fan_status = json.dumps(fan_status)
+                
+                # Update pump status if available
+                if pump_status:
+                    heat_exchanger.pump_status = json.dumps(pump_status)
                     
-                    # Update pump status if available
-                    if pump_status:
-                        heat_exchanger.pump_status = json.dumps(pump_status)
-                        
-                        # Check for critical low flow rates
-                        urgent_alarms = []
-                        for pump in pump_status:
-                            flow_rate = pump.get("flow_liquid")
-                            if flow_rate is not None and flow_rate < pump_threshold:
-                                alarm_data = {
-                                    "type": "CRITICAL_LOW_FLOW",
-                                    "pump_id": pump.get("id"),
-                                    "pump_name": pump.get("name"),
-                                    "flow_rate": flow_rate,
-                                    "threshold": pump_threshold,
-                                    "timestamp": datetime.utcnow().isoformat()
-                                }
-                                urgent_alarms.append(alarm_data)
-                                
-                                # Create Alert record in database
-                                try:
-                                    alert = Alert(
-                                        heat_exchanger_id=heat_exchanger_id,
-                                        type="CRITICAL_LOW_FLOW",
-                                        severity="critical",
-                                        title=f"Critical Low Flow - {pump.get('name', pump.get('id'))}",
-                                        description=f"Pump flow rate ({flow_rate} L/min) dropped below critical threshold ({pump_threshold} L/min)",
-                                        pump_id=pump.get("id"),
-                                        pump_name=pump.get("name"),
-                                        flow_rate=flow_rate,
-                                        threshold=pump_threshold,
-                                        acknowledged=False,
-                                        resolved=False
-                                    )
-                                    db.add(alert)
-                                    await db.flush()  # Get alert ID
-                                    alert_id = alert.id
-                                    print(f"✓ Created Alert ID {alert_id} for {pump.get('name')}")
-                                except Exception as e:
-                                    print(f"❌ Failed to create alert: {e}")
-                                    alert_id = None
-                                
-                                # Send email alert (pass db session) - don't let this fail the alert creation
-                                try:
-                                    await email_service.send_urgent_alarm_email(
-                                        db,
-                                        heat_exchanger.name,
-                                        pump.get("name", pump.get("id")),
-                                        flow_rate
-                                    )
-                                except Exception as e:
-                                    print(f"❌ Failed to send email alert: {e}")
-                                
-                                # Send Teams notification (pass db session) - don't let this fail the alert creation
-                                try:
-                                    await teams_service.send_urgent_alarm_teams(
-                                        db,
-                                        heat_exchanger.name,
-                                        pump.get("name", pump.get("id")),
-                                        flow_rate
-                                    )
-                                except Exception as e:
-                                    print(f"❌ Failed to send Teams alert: {e}")
-                                
-                                # Broadcast via WebSocket
-                                if alert_id:
-                                    await manager.broadcast(json.dumps({
-                                        "type": "new_alert",
-                                        "alert_id": alert_id,
-                                        "heat_exchanger_id": heat_exchanger_id,
-                                        "heat_exchanger_name": heat_exchanger.name,
-                                        "severity": "critical",
-                                        "title": f"Critical Low Flow - {pump.get('name', pump.get('id'))}",
-                                        "pump_name": pump.get("name"),
-                                        "flow_rate": flow_rate,
-                                        "threshold": pump_threshold
-                                    }))
-                                
-                                print(f"🚨 URGENT ALARM: {heat_exchanger.name} - {pump.get('name')} flow rate critically low: {flow_rate} L/min")
-                        
-                        # Store urgent alarms in heat_exchanger for backwards compatibility
-                        if urgent_alarms:
-                            heat_exchanger.urgent_alarms = json.dumps(urgent_alarms)
-                        else:
-                            heat_exchanger.urgent_alarms = None
+                    # Check for critical low flow rates (includes notification dispatch)
+                    urgent_alarms = await self._check_low_flow(
+                        db, heat_exchanger_id, heat_exchanger, pump_status, pump_threshold
+                    )
                     
+                    # Store urgent alarms in heat_exchanger for backwards compatibility
+                    if urgent_alarms:
+                        heat_exchanger.urgent_alarms = json.dumps(urgent_alarms)
+                    else:
+                        heat_exchanger.urgent_alarms = None
+                
+                with db_commit_seconds.time(operation="sample"):
                     await db.commit()
-            
-            print(f"✓ Polled heat exchanger {heat_exchanger_id}: Manager info updated")
-            
+                
+                # Push what changed to live dashboards
+                await fleet_state.publish(heat_exchanger, monitoring_data)
+                if monitoring_data is not None:
+                    await manager.broadcast({
+                        "type": "monitoring_update",
+                        "heat_exchanger_id": heat_exchanger_id,
+                        "data": MonitoringDataResponse.model_validate(monitoring_data).model_dump(mode="json")
+                    }, topics=[heat_exchanger_topic(heat_exchanger_id)])
+    
+    async def _check_low_flow(
+        self,
+        db,
+        heat_exchanger_id: int,
+        heat_exchanger,
+        pump_status: list,
+        pump_threshold: float
+    ) -> list:
+        """Raise a low-flow alarm for every pump below the threshold; returns the alarms"""
+        low_flow_start = time.perf_counter()
+        urgent_alarms = []
+        for pump in pump_status:
+            flow_rate = pump.get("flow_liquid")
+            if flow_rate is not None and flow_rate < pump_threshold:
+                urgent_alarms.append(await self._raise_low_flow_alarm(
+                    db, heat_exchanger_id, heat_exchanger, pump, flow_rate, pump_threshold
+                ))
+        alarm_processing_seconds.observe(time.perf_counter() - low_flow_start, check="low_flow")
+        return urgent_alarms
+    
+    async def _raise_low_flow_alarm(
+        self,
+        db,
+        heat_exchanger_id: int,
+        heat_exchanger,
+        pump: dict,
+        flow_rate: float,
+        pump_threshold: float,
+        timestamp: Optional[datetime] = None
+    ) -> dict:
+        """Create a critical low-flow Alert, notify email/Teams and live clients; returns the alarm"""
+        alarm_data = {
+            "type": "CRITICAL_LOW_FLOW",
+            "pump_id": pump.get("id"),
+            "pump_name": pump.get("name"),
+            "flow_rate": flow_rate,
+            "threshold": pump_threshold,
+            "timestamp": (timestamp or datetime.utcnow()).isoformat()
+        }
+        # Create Alert record in database
+        try:
+            alert = Alert(
+                heat_exchanger_id=heat_exchanger_id,
+                type="CRITICAL_LOW_FLOW",
+                severity="critical",
+                title=f"Critical Low Flow - {pump.get('name', pump.get('id'))}",
+                description=f"Pump flow rate ({flow_rate} L/min) dropped below critical threshold ({pump_threshold} L/min)",
+                pump_id=pump.get("id"),
+                pump_name=pump.get("name"),
+                flow_rate=flow_rate,
+                threshold=pump_threshold,
+                acknowledged=False,
+                resolved=False
+            )
+            db.add(alert)
+            await db.flush()  # Get alert ID
+            alert_id = alert.id
+            alarm_log.info("Created alert %s for %s", alert_id, pump.get('name'))
+        except Exception as e:
+            alarm_log.error("Failed to create alert: %s", e)
+            alert_id = None
+        
+        # Send email alert (pass db session) - don't let this fail the alert creation
+        sent = time.perf_counter()
+        try:
+            await email_service.send_urgent_alarm_email(
+                db,
+                heat_exchanger.name,
+                pump.get("name", pump.get("id")),
+                flow_rate
+            )
+            notification_seconds.observe(time.perf_counter() - sent, channel="email", result="ok")
         except Exception as e:
-            print(f"Error polling heat exchanger {heat_exchanger_id}: {e}")
+            notification_seconds.observe(time.perf_counter() - sent, channel="email", result="error")
+            alarm_log.error("Failed to send email alert: %s", e)
+        
+        # Send Teams notification (pass db session) - don't let this fail the alert creation
+        sent = time.perf_counter()
+        try:
+            await teams_service.send_urgent_alarm_teams(
+                db,
+                heat_exchanger.name,
+                pump.get("name", pump.get("id")),
+                flow_rate
+            )
+            notification_seconds.observe(time.perf_counter() - sent, channel="teams", result="ok")
+        except Exception as e:
+            notification_seconds.observe(time.perf_counter() - sent, channel="teams", result="error")
+            alarm_log.error("Failed to send Teams alert: %s", e)
+        
+        # Broadcast via WebSocket
+        if alert_id:
+            await manager.broadcast({
+                "type": "new_alert",
+                "alert_id": alert_id,
+                "heat_exchanger_id": heat_exchanger_id,
+                "heat_exchanger_name": heat_exchanger.name,
+                "severity": "critical",
+                "title": f"Critical Low Flow - {pump.get('name', pump.get('id'))}",
+                "pump_name": pump.get("name"),
+                "flow_rate": flow_rate,
+                "threshold": pump_threshold
+            }, topics=["alerts", heat_exchanger_topic(heat_exchanger_id)])
+        
+        alarm_log.critical(
+            "URGENT ALARM: %s - %s flow rate critically low: %s L/min",
+            heat_exchanger.name, pump.get('name'), flow_rate,
+            extra={"heat_exchanger_id": heat_exchanger_id}
+        )
+        return alarm_data
     
     async def _process_alarms(self, db, heat_exchanger_id: int, heat_exchanger, cdu_status: dict):
         """Process all alarm types and create Alert records"""
@@ -243,9 +409,9 @@ class MonitoringService:
                         )
                         db.add(alert)
                         await db.flush()
-                        print(f"⚠️ Created leak alarm alert: {alarm}")
+                        alarm_log.warning("Created leak alarm alert for heat exchanger %s: %s", heat_exchanger_id, alarm)
                     except Exception as e:
-                        print(f"❌ Failed to create leak alarm alert: {e}")
+                        alarm_log.error("Failed to create leak alarm alert: %s", e)
         
         # Check for fan alarms
         fan_alarms = cdu_status.get("fan_alarms", {})
@@ -274,9 +440,9 @@ class MonitoringService:
                             )
                             db.add(alert)
                             await db.flush()
-                            print(f"⚠️ Created fan alarm alert: {alarm_name}")
+                            alarm_log.warning("Created fan alarm alert for heat exchanger %s: %s", heat_exchanger_id, alarm_name)
                         except Exception as e:
-                            print(f"❌ Failed to create fan alarm alert: {e}")
+                            alarm_log.error("Failed to create fan alarm alert: %s", e)
         
         # Check for pump alarms
         pump_alarms = cdu_status.get("pump_alarms", {})
@@ -305,9 +471,9 @@ class MonitoringService:
                             )
                             db.add(alert)
                             await db.flush()
-                            print(f"⚠️ Created pump alarm alert: {alarm_name}")
+                            alarm_log.warning("Created pump alarm alert for heat exchanger %s: %s", heat_exchanger_id, alarm_name)
                         except Exception as e:
-                            print(f"❌ Failed to create pump alarm alert: {e}")
+                            alarm_log.error("Failed to create pump alarm alert: %s", e)
         
         # Check for sensor alarms
         sensor_alarms = cdu_status.get("sensor_alarms", {})
@@ -335,17 +501,30 @@ class MonitoringService:
                         )
                         db.add(alert)
                         await db.flush()
-                        print(f"⚠️ Created sensor alarm alert: {alarm}")
+                        alarm_log.warning("Created sensor alarm alert for heat exchanger %s: %s", heat_exchanger_id, alarm)
                     except Exception as e:
-                        print(f"❌ Failed to create sensor alarm alert: {e}")
+                        alarm_log.error("Failed to create sensor alarm alert: %s", e)
     
-    async def poll_all_heat_exchangers(self):
-        """Poll all active heat exchangers concurrently"""
+    async def poll_assigned_heat_exchangers(self):
+        """Run a polling cycle for the heat exchangers assigned to this process"""
+        if not poller_coordinator.is_active:
+            return
+        owns = poller_coordinator.owns
+        if app_settings.redfish_event_push:
+            # Devices that push events are only reconciled on the slow interval
+            from app.services.redfish_events import redfish_event_receiver
+            owns = lambda heat_exchanger_id: (
+                poller_coordinator.owns(heat_exchanger_id) and redfish_event_receiver.due_for_poll(heat_exchanger_id)
+            )
+        await self.poll_all_heat_exchangers(owns=owns)
+    
+    async def poll_all_heat_exchangers(self, owns: Optional[Callable[[int], bool]] = None):
+        """Poll all active heat exchangers concurrently (only those ``owns`` accepts, if given)"""
         try:
             # Check if async_session_maker is initialized
             from app.database import async_session_maker as session_maker
             if session_maker is None:
-                print("Database not initialized yet, skipping poll")
+                log.warning("Database not initialized yet, skipping poll")
                 return
                 
             async with session_maker() as db:
@@ -353,14 +532,20 @@ class MonitoringService:
                     select(HeatExchanger).where(HeatExchanger.is_active == True)
                 )
                 heat_exchangers = result.scalars().all()
+                # Drop connections and sessions kept for devices deleted or deactivated since
+                # (possibly by another process)
+                await redfish_sessions.retain({redfish_base_url(he.rscm_ip) for he in heat_exchangers})
+                if owns is not None:
+                    heat_exchangers = [he for he in heat_exchangers if owns(he.id)]
                 
                 if not heat_exchangers:
-                    print("No active heat exchangers to poll")
+                    log.debug("No active heat exchangers to poll")
                     return
                 
                 # Poll up to 30 heat exchangers concurrently
+                cycle_start = time.perf_counter()
                 max_concurrent = 30
-                print(f"Polling {len(heat_exchangers)} heat exchangers (max {max_concurrent} concurrent)")
+                log.info("Polling %d heat exchangers (max %d concurrent)", len(heat_exchangers), max_concurrent)
                 
                 # Create polling tasks for all heat exchangers
                 tasks = [
@@ -377,12 +562,17 @@ class MonitoringService:
                     for idx, result in enumerate(batch_results):
                         if isinstance(result, Exception):
                             he_id = heat_exchangers[i + idx].id
-                            print(f"Error polling heat exchanger {he_id}: {result}")
+                            log.error("Error polling heat exchanger %s: %s", he_id, result)
                     
-                print(f"✓ Completed polling cycle for {len(heat_exchangers)} heat exchangers")
+                cycle_seconds = time.perf_counter() - cycle_start
+                poll_cycle_seconds.observe(cycle_seconds)
+                log.info(
+                    "Completed polling cycle for %d heat exchangers", len(heat_exchangers),
+                    extra={"duration_s": round(cycle_seconds, 2)}
+                )
                 
         except Exception as e:
-            print(f"Error polling all heat exchangers: {e}")
+            log.error("Error polling all heat exchangers: %s", e)
 
 
 # Global monitoring service instance
@@ -1,7 +1,38 @@
+import asyncio
+import time
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set, Tuple
 from sqlalchemy import select
 from app.config import settings
+from app.logging_config import get_logger
+from app.services.metrics import (
+    endpoint_label,
+    redfish_errors,
+    redfish_limiter_wait_seconds,
+    redfish_request_seconds,
+    redfish_retries
+)
+
+
+log = get_logger("redfish")
+
+SESSIONS_ENDPOINT = "/redfish/v1/SessionService/Sessions"
+EVENT_SUBSCRIPTIONS_ENDPOINT = "/redfish/v1/EventService/Subscriptions"
+
+
+def failure_reason(error: Exception) -> str:
+    """Short reason label for a failed Redfish request"""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.ConnectError):
+        return "connect"
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    if isinstance(error, ValueError):
+        return "invalid_json"
+    return "other"
 
 
 async def get_redfish_credentials():
@@ -11,7 +42,7 @@ async def get_redfish_credentials():
     
     # Check if database is initialized
     if session_maker is None:
-        print("DEBUG: Database not initialized, using config defaults")
+        log.debug("Database not initialized, using config credentials")
         return settings.redfish_username, settings.redfish_password
     
     async with session_maker() as db:
@@ -19,45 +50,463 @@ async def get_redfish_credentials():
         system_settings = result.scalars().first()
         
         if system_settings:
-            print(f"DEBUG: Loaded credentials from database - username: {system_settings.redfish_username}")
+            log.debug("Loaded Redfish credentials from database", extra={"username": system_settings.redfish_username})
             return system_settings.redfish_username, system_settings.redfish_password
         else:
             # Return defaults from config if not in database
-            print("DEBUG: No settings in database, using config defaults")
+            log.debug("No settings in database, using config credentials")
             return settings.redfish_username, settings.redfish_password
 
 
+class RedfishSessionPool:
+    """Redfish sessions and HTTP connections shared by every RedfishClient
+
+    Instead of sending Basic auth (a credential check on the R-SCM) with every GET,
+    one session is created per device and user through SessionService and its
+    X-Auth-Token is reused until the device rejects it. Devices that cannot create
+    sessions fall back to Basic auth for a while before trying again.
+    """
+
+    # How long to use Basic auth after a device failed to create a session
+    FALLBACK_SECONDS = 300
+
+    def __init__(self):
+        # One small connection pool per device: httpcore scans every pooled connection on
+        # each request, so a single pool shared by a large fleet spends most of a cycle there
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # Built once and shared by every client (loading CA certificates is not cheap)
+        self._ssl_context = None
+        # (base_url, username) -> (token, session URL)
+        self._sessions: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._basic_until: Dict[Tuple[str, str], float] = {}
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        """HTTP client for one R-SCM, so its connections are kept alive between requests"""
+        client = self._clients.get(base_url)
+        if client is None:
+            if self._ssl_context is None:
+                self._ssl_context = httpx.create_ssl_context(verify=settings.redfish_verify_ssl)
+            # Concurrency per device is already bounded by host_limits
+            client = httpx.AsyncClient(
+                verify=self._ssl_context,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=8)
+            )
+            self._clients[base_url] = client
+        return client
+
+    async def get_token(self, base_url: str, username: str, password: str) -> Optional[str]:
+        """Session token for a device, creating the session if needed. None means use Basic auth."""
+        if not settings.redfish_session_auth:
+            return None
+        key = (base_url, username)
+        if key in self._sessions:
+            return self._sessions[key][0]
+        if self._basic_until.get(key, 0) > time.monotonic():
+            return None
+
+        # Concurrent requests to the same device wait for a single login
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in self._sessions:
+                return self._sessions[key][0]
+            try:
+                response = await self.get_client(base_url).post(
+                    f"{base_url}{SESSIONS_ENDPOINT}",
+                    json={"UserName": username, "Password": password},
+                    timeout=10.0
+                )
+                response.raise_for_status()
+                token = response.headers.get("X-Auth-Token")
+                if not token:
+                    raise ValueError("no X-Auth-Token in response")
+            except Exception as e:
+                log.warning("Redfish session login failed for %s, using Basic auth: %s", base_url, e)
+                self._basic_until[key] = time.monotonic() + self.FALLBACK_SECONDS
+                return None
+
+            location = response.headers.get("Location")
+            if location and not location.startswith("http"):
+                location = f"{base_url}{location}"
+            self._sessions[key] = (token, location)
+            return token
+
+    def invalidate(self, base_url: str, username: str, token: str):
+        """Forget a session the device rejected (expired or deleted on the R-SCM)"""
+        key = (base_url, username)
+        if key in self._sessions and self._sessions[key][0] == token:
+            del self._sessions[key]
+
+    async def discard(self, base_url: str):
+        """Forget everything kept for a device (deleted or its address changed): sessions,
+        connections, request limits, capabilities and cached responses"""
+        await self._release({base_url})
+        for registry in (host_limits, capabilities, response_cache):
+            registry.forget(base_url)
+
+    async def retain(self, base_urls: Set[str]):
+        """Forget the devices no longer in ``base_urls`` (deleted, deactivated or moved)"""
+        stale = {url for url in self._clients if url not in base_urls}
+        stale |= {url for url, _ in self._sessions if url not in base_urls}
+        if stale:
+            await self._release(stale)
+        for registry in (host_limits, capabilities, response_cache):
+            for url in registry.hosts() - base_urls:
+                registry.forget(url)
+
+    async def close(self):
+        """Log out of every open session and close the connection pools (call on shutdown)"""
+        await self._release(set(self._clients) | {url for url, _ in self._sessions})
+
+    async def _release(self, base_urls: Set[str]):
+        sessions = {key: self._sessions.pop(key) for key in list(self._sessions) if key[0] in base_urls}
+        for key in [key for key in self._basic_until if key[0] in base_urls]:
+            del self._basic_until[key]
+        for key in [key for key in self._locks if key[0] in base_urls and not self._locks[key].locked()]:
+            del self._locks[key]
+        
+        async def logout(base_url: str, token: str, location: str):
+            try:
+                await self.get_client(base_url).delete(location, headers={"X-Auth-Token": token}, timeout=5.0)
+            except Exception:
+                pass  # The session times out on the device anyway
+        
+        await asyncio.gather(*(
+            logout(base_url, token, location)
+            for (base_url, _), (token, location) in sessions.items() if location
+        ))
+        clients = [self._clients.pop(url) for url in base_urls if url in self._clients]
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+
+# Global Redfish session pool
+redfish_sessions = RedfishSessionPool()
+
+
+class HostLimiter:
+    """Caps in-flight requests to one R-SCM and spaces out their start times"""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.min_interval = max(0.0, min_interval)
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._next_start = 0.0
+
+    def configure(self, max_concurrent: int, min_interval: float):
+        """Change the limits; waiting requests pick them up immediately"""
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.min_interval = max(0.0, min_interval)
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.max_concurrent)
+            self._active += 1
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except BaseException:
+                await self._release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._release()
+
+    async def _release(self):
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+
+class HostLimiterRegistry:
+    """One HostLimiter per R-SCM, sized by the device model once it is known"""
+
+    def __init__(self):
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._models: Dict[str, str] = {}
+
+    @staticmethod
+    def _limits_for(model: Optional[str]) -> Tuple[int, float]:
+        limits = settings.redfish_model_limits.get(model, {}) if model else {}
+        max_concurrent = limits.get("max_concurrent", settings.redfish_max_concurrent_requests)
+        min_interval_ms = limits.get("min_interval_ms", settings.redfish_min_request_interval_ms)
+        return int(max_concurrent), min_interval_ms / 1000.0
+
+    def for_host(self, base_url: str) -> HostLimiter:
+        limiter = self._limiters.get(base_url)
+        if limiter is None:
+            limiter = HostLimiter(*self._limits_for(self._models.get(base_url)))
+            self._limiters[base_url] = limiter
+        return limiter
+
+    def hosts(self) -> Set[str]:
+        return set(self._limiters) | set(self._models)
+
+    def forget(self, base_url: str):
+        # Requests still in flight keep their reference to the old limiter
+        self._limiters.pop(base_url, None)
+        self._models.pop(base_url, None)
+
+    def set_model(self, base_url: str, model: Optional[str]):
+        """Apply the per-model limits after the device reported its model"""
+        if not model or self._models.get(base_url) == model:
+            return
+        self._models[base_url] = model
+        self.for_host(base_url).configure(*self._limits_for(model))
+
+
+# Global per-device request limits
+host_limits = HostLimiterRegistry()
+
+
+class CapabilityRegistry:
+    """Which Redfish resources each R-SCM actually exposes
+
+    A resource that answers 404 (or 405/501) is recorded as missing and not requested
+    again, so polls stop spending retries on endpoints a device does not have. A resource
+    the device has served before is only skipped after several misses in a row, since an
+    R-SCM that is rebooting briefly answers 404 for resources it does have. A device's
+    profile is rebuilt when its FirmwareVersion changes, its missing entries are cleared
+    when it reboots or drops our session, and they are re-probed after
+    REDFISH_CAPABILITY_TTL_SECONDS in case the device was misreporting.
+    """
+
+    MISSING_STATUS_CODES = (404, 405, 501)
+    # Needed to detect firmware changes and reboots, so never skipped
+    ALWAYS_PROBE = ("/redfish/v1", "/redfish/v1/Managers/RackManager")
+    # Consecutive misses before a resource the device has served is skipped
+    MISSES_BEFORE_SKIP = 3
+
+    def __init__(self):
+        # base_url -> firmware version the profile was built for
+        self._firmware: Dict[str, Optional[str]] = {}
+        # base_url -> seconds since boot at the last poll
+        self._uptime: Dict[str, float] = {}
+        # base_url -> endpoint -> monotonic time it was found missing
+        self._missing: Dict[str, Dict[str, float]] = {}
+        self._present: Dict[str, set] = {}
+        # base_url -> endpoint -> consecutive misses of a previously present resource
+        self._misses: Dict[str, Dict[str, int]] = {}
+
+    def is_missing(self, base_url: str, endpoint: str) -> bool:
+        missing_since = self._missing.get(base_url, {}).get(endpoint)
+        if missing_since is None:
+            return False
+        if time.monotonic() - missing_since > settings.redfish_capability_ttl_seconds:
+            del self._missing[base_url][endpoint]
+            return False
+        return True
+
+    def mark_missing(self, base_url: str, endpoint: str):
+        if endpoint in self.ALWAYS_PROBE:
+            return
+        if endpoint in self._present.get(base_url, set()):
+            misses = self._misses.setdefault(base_url, {})
+            misses[endpoint] = misses.get(endpoint, 0) + 1
+            if misses[endpoint] < self.MISSES_BEFORE_SKIP:
+                return
+            del misses[endpoint]
+            self._present[base_url].discard(endpoint)
+        self._missing.setdefault(base_url, {})[endpoint] = time.monotonic()
+        log.info("%s%s not supported by this device, skipping it on later polls", base_url, endpoint)
+
+    def mark_present(self, base_url: str, endpoint: str):
+        self._present.setdefault(base_url, set()).add(endpoint)
+        self._misses.get(base_url, {}).pop(endpoint, None)
+
+    def reset_missing(self, base_url: str):
+        """Probe every resource again (the device rebooted or dropped our session)"""
+        if self._missing.pop(base_url, None):
+            log.info("%s restarted, re-probing skipped endpoints", base_url)
+        self._misses.pop(base_url, None)
+
+    def observe_uptime(self, base_url: str, time_since_boot: Optional[str]):
+        """Detect a reboot from the manager's TimeSinceLastBoot going backwards"""
+        try:
+            uptime = float(time_since_boot)
+        except (TypeError, ValueError):
+            return
+        previous = self._uptime.get(base_url)
+        self._uptime[base_url] = uptime
+        if previous is not None and uptime < previous:
+            self.reset_missing(base_url)
+
+    def observe_firmware(self, base_url: str, firmware_version: Optional[str]):
+        """Start a fresh profile when the device is first seen or its firmware changed"""
+        if base_url in self._firmware and self._firmware[base_url] == firmware_version:
+            return
+        if base_url in self._firmware:
+            log.info("Firmware changed on %s (%s -> %s), re-probing endpoints", base_url, self._firmware[base_url], firmware_version)
+        self._firmware[base_url] = firmware_version
+        self._missing.pop(base_url, None)
+        self._present.pop(base_url, None)
+        self._misses.pop(base_url, None)
+
+    def hosts(self) -> Set[str]:
+        return set(self._firmware) | set(self._uptime) | set(self._missing) | set(self._present) | set(self._misses)
+
+    def forget(self, base_url: str):
+        for registry in (self._firmware, self._uptime, self._missing, self._present, self._misses):
+            registry.pop(base_url, None)
+
+    def profile(self, base_url: str) -> Dict[str, Any]:
+        """Known capabilities of one device"""
+        return {
+            "firmware_version": self._firmware.get(base_url),
+            "present": sorted(self._present.get(base_url, set())),
+            "missing": sorted(self._missing.get(base_url, {}))
+        }
+
+
+# Global capability registry
+capabilities = CapabilityRegistry()
+
+
+class ResponseCache:
+    """Last ETag and parsed body per Redfish URL, for conditional GETs
+
+    Requests for a cached URL carry If-None-Match; a 304 reuses the parsed body
+    without downloading or parsing it again.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Any]] = {}
+
+    def etag(self, url: str) -> Optional[str]:
+        entry = self._entries.get(url)
+        return entry[0] if entry else None
+
+    def get(self, url: str) -> Any:
+        entry = self._entries.get(url)
+        return entry[1] if entry else None
+
+    def hosts(self) -> Set[str]:
+        return {url.split("/redfish/", 1)[0] for url in self._entries}
+
+    def forget(self, base_url: str):
+        prefix = f"{base_url}/"
+        for url in [url for url in self._entries if url.startswith(prefix)]:
+            del self._entries[url]
+
+    def store(self, url: str, etag: Optional[str], data: Any):
+        if etag:
+            self._entries[url] = (etag, data)
+        else:
+            self._entries.pop(url, None)
+
+
+# Global conditional GET cache
+response_cache = ResponseCache()
+
+
+def redfish_base_url(ip_address: str) -> str:
+    """Base URL of an R-SCM from its stored address
+
+    "host" uses REDFISH_PORT (8080 on production R-SCMs); "host:port" overrides it so
+    simulated devices can be told apart by port on one address.
+    """
+    if ip_address and ip_address.count(":") == 1:
+        return f"{settings.redfish_scheme}://{ip_address}"
+    return f"{settings.redfish_scheme}://{ip_address}:{settings.redfish_port}"
+
+
 class RedfishClient:
     def __init__(self, ip_address: str, username: str = None, password: str = None):
-        self.base_url = f"https://{ip_address}:8080"
+        self.base_url = redfish_base_url(ip_address)
         self.username = username
         self.password = password
         self.verify_ssl = settings.redfish_verify_ssl
+        # Successful requests made by this client, how many of them were 304 Not Modified,
+        # and requests that failed after every retry
+        self.requests = 0
+        self.not_modified = 0
+        self.failed = 0
+    
+    @property
+    def unchanged(self) -> bool:
+        """True if every resource fetched by this client was unchanged since the last poll"""
+        return self.requests > 0 and self.failed == 0 and self.not_modified == self.requests
+    
+    async def _send(self, method: str, url: str, headers: Dict[str, str] = None, json: Any = None) -> httpx.Response:
+        """Send a request with the pooled session token, logging in again once if it was rejected"""
+        client = redfish_sessions.get_client(self.base_url)
+        headers = headers or {}
+        token = await redfish_sessions.get_token(self.base_url, self.username, self.password)
+        if token is None:
+            return await client.request(method, url, headers=headers, json=json, auth=(self.username, self.password), timeout=10.0)
+        
+        response = await client.request(method, url, headers={**headers, "X-Auth-Token": token}, json=json, timeout=10.0)
+        if response.status_code == 401:
+            redfish_sessions.invalidate(self.base_url, self.username, token)
+            # Sessions are lost when the R-SCM restarts
+            capabilities.reset_missing(self.base_url)
+            token = await redfish_sessions.get_token(self.base_url, self.username, self.password)
+            if token is None:
+                return await client.request(method, url, headers=headers, json=json, auth=(self.username, self.password), timeout=10.0)
+            response = await client.request(method, url, headers={**headers, "X-Auth-Token": token}, json=json, timeout=10.0)
+        return response
         
     async def _make_request(self, endpoint: str, retries: int = 3) -> Optional[Dict[Any, Any]]:
         """Make an async HTTP request to the Redfish API with retry logic"""
-        import asyncio
+        if capabilities.is_missing(self.base_url, endpoint):
+            return None
         
+        label = endpoint_label(endpoint)
         for attempt in range(retries):
             try:
                 url = f"{self.base_url}{endpoint}"
                 if attempt == 0:
-                    print(f"DEBUG: Making request to {url} with username={self.username}")
+                    log.debug("GET %s", url)
                 else:
-                    print(f"DEBUG: Retry {attempt}/{retries-1} for {endpoint}")
+                    log.debug("Retry %d/%d for %s", attempt, retries - 1, url)
+                    redfish_retries.inc(endpoint=label)
                     
-                async with httpx.AsyncClient(verify=self.verify_ssl) as client:
-                    response = await client.get(
-                        url,
-                        auth=(self.username, self.password),
-                        timeout=10.0
-                    )
-                    response.raise_for_status()
-                    return response.json()
+                headers = {}
+                etag = response_cache.etag(url) if settings.redfish_conditional_get else None
+                if etag:
+                    headers["If-None-Match"] = etag
+                
+                waiting = time.perf_counter()
+                async with host_limits.for_host(self.base_url):
+                    start = time.perf_counter()
+                    redfish_limiter_wait_seconds.observe(start - waiting)
+                    try:
+                        response = await self._send("GET", url, headers)
+                    finally:
+                        redfish_request_seconds.observe(time.perf_counter() - start, endpoint=label)
+                if response.status_code in CapabilityRegistry.MISSING_STATUS_CODES:
+                    # Not a transient error, retrying will not help
+                    capabilities.mark_missing(self.base_url, endpoint)
+                    return None
+                
+                if response.status_code == 304 and etag:
+                    cached = response_cache.get(url)
+                    if cached is not None:
+                        capabilities.mark_present(self.base_url, endpoint)
+                        self.requests += 1
+                        self.not_modified += 1
+                        return cached
+                    # Cache entry dropped since the request was sent: fetch the body again
+                    response = await self._fetch_unconditional(url, label)
+                
+                response.raise_for_status()
+                data = response.json()
+                capabilities.mark_present(self.base_url, endpoint)
+                self.requests += 1
+                if settings.redfish_conditional_get:
+                    response_cache.store(url, response.headers.get("ETag"), data)
+                return data
             except Exception as e:
+                redfish_errors.inc(endpoint=label, reason=failure_reason(e))
                 if attempt == retries - 1:
                     # Last attempt failed
-                    print(f"Error making Redfish request to {endpoint} after {retries} attempts: {e}")
+                    self.failed += 1
+                    log.warning("Redfish request to %s%s failed after %d attempts: %s", self.base_url, endpoint, retries, e)
                     return None
                 # Wait before retrying (exponential backoff)
                 wait_time = 0.5 * (2 ** attempt)
@@ -65,6 +514,54 @@ class RedfishClient:
         
         return None
     
+    async def _fetch_unconditional(self, url: str, label: str) -> httpx.Response:
+        """GET without If-None-Match"""
+        async with host_limits.for_host(self.base_url):
+            start = time.perf_counter()
+            try:
+                return await self._send("GET", url)
+            finally:
+                redfish_request_seconds.observe(time.perf_counter() - start, endpoint=label)
+    
+    async def create_event_subscription(self, destination: str, context: str) -> Optional[str]:
+        """Subscribe to the device's EventService. Returns the subscription URL."""
+        try:
+            async with host_limits.for_host(self.base_url):
+                response = await self._send("POST", f"{self.base_url}{EVENT_SUBSCRIPTIONS_ENDPOINT}", json={
+                    "Destination": destination,
+                    "Protocol": "Redfish",
+                    "Context": context,
+                    "EventFormatType": "Event",
+                    "EventTypes": ["Alert", "MetricReport"]
+                })
+            response.raise_for_status()
+        except Exception as e:
+            log.error("Error creating Redfish event subscription on %s: %s", self.base_url, e)
+            return None
+        
+        location = response.headers.get("Location") or response.json().get("@odata.id")
+        if location and not location.startswith("http"):
+            location = f"{self.base_url}{location}"
+        return location
+    
+    async def subscription_exists(self, location: str) -> bool:
+        """Whether an event subscription is still registered (devices may drop them on reboot)"""
+        try:
+            async with host_limits.for_host(self.base_url):
+                response = await self._send("GET", location)
+            return response.status_code == 200
+        except Exception:
+            # Unreachable: keep the subscription and check again next time
+            return True
+    
+    async def delete_event_subscription(self, location: str):
+        """Remove an event subscription"""
+        try:
+            async with host_limits.for_host(self.base_url):
+                await self._send("DELETE", location)
+        except Exception as e:
+            log.error("Error deleting Redfish event subscription %s: %s", location, e)
+    
     async def test_connection(self) -> bool:
         """Test connection to Redfish API"""
         try:
@@ -100,7 +597,7 @@ class RedfishClient:
                 "raw_data": data
             }
         except Exception as e:
-            print(f"Error getting thermal data: {e}")
+            log.error("Error getting thermal data from %s: %s", self.base_url, e)
             return None
     
     async def get_power_data(self) -> float:
@@ -115,7 +612,7 @@ class RedfishClient:
                 return round(power_control[0].get("PowerConsumedWatts", 0.0), 1)
             return 0.0
         except Exception as e:
-            print(f"Error getting power data: {e}")
+            log.error("Error getting power data from %s: %s", self.base_url, e)
             return 0.0
     
     async def get_all_sensor_data(self) -> Optional[Dict[str, Any]]:
@@ -134,7 +631,7 @@ class RedfishClient:
                 "raw_data": thermal_data.get("raw_data")
             }
         except Exception as e:
-            print(f"Error getting all sensor data: {e}")
+            log.error("Error getting all sensor data from %s: %s", self.base_url, e)
             return None
     
     async def get_manager_info(self) -> Optional[Dict[str, Any]]:
@@ -155,10 +652,13 @@ class RedfishClient:
                 "unique_id": data.get("Oem", {}).get("Microsoft", {}).get("UniqueId"),
                 "time_since_boot": data.get("Oem", {}).get("Microsoft", {}).get("TimeSinceLastBoot")
             }
+            host_limits.set_model(self.base_url, manager_info["model"])
+            capabilities.observe_firmware(self.base_url, manager_info["firmware_version"])
+            capabilities.observe_uptime(self.base_url, manager_info["time_since_boot"])
             
             return manager_info
         except Exception as e:
-            print(f"Error getting manager info: {e}")
+            log.error("Error getting manager info from %s: %s", self.base_url, e)
             return None
     
     async def get_cdu_status(self) -> Optional[Dict[str, Any]]:
@@ -183,7 +683,7 @@ class RedfishClient:
             
             return cdu_info
         except Exception as e:
-            print(f"Error getting CDU status: {e}")
+            log.error("Error getting CDU status from %s: %s", self.base_url, e)
             return None
     
     async def get_fan_status(self) -> Optional[list]:
@@ -210,7 +710,6 @@ class RedfishClient:
                 return None
             
             # Fetch all fans concurrently
-            import asyncio
             fan_tasks = [fetch_fan_data(fan_ref) for fan_ref in fans]
             fan_details = await asyncio.gather(*fan_tasks, return_exceptions=True)
             
@@ -219,7 +718,7 @@ class RedfishClient:
             
             return fan_details
         except Exception as e:
-            print(f"Error getting fan status: {e}")
+            log.error("Error getting fan status from %s: %s", self.base_url, e)
             return None
     
     async def get_pump_status(self) -> Optional[list]:
@@ -254,7 +753,6 @@ class RedfishClient:
                 return None
             
             # Fetch all pumps concurrently
-            import asyncio
             pump_tasks = [fetch_pump_data(pump_ref) for pump_ref in pumps]
             pump_details = await asyncio.gather(*pump_tasks, return_exceptions=True)
             
@@ -263,5 +761,5 @@ class RedfishClient:
             
             return pump_details
         except Exception as e:
-            print(f"Error getting pump status: {e}")
+            log.error("Error getting pump status from %s: %s", self.base_url, e)
             return None
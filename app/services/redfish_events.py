@@ -0,0 +1,176 @@
+"""Push mode: receive Redfish EventService events instead of waiting for the next poll
+
+With ``REDFISH_EVENT_PUSH=true`` the poller subscribes every heat exchanger it owns to
+its R-SCM's EventService, pointing the subscription at ``/api/redfish-events/{id}`` on
+this server. When an Alert or MetricReport event arrives, the device is refreshed right
+away through the normal poll path (same alarm engine, database writes and WebSocket
+updates). Subscribed devices are then only polled on the slow reconcile interval; devices
+without a subscription (no EventService, or subscribing failed) keep the normal interval.
+"""
+import asyncio
+import secrets
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.heat_exchanger import HeatExchanger
+from app.services.redfish_client import RedfishClient, get_redfish_credentials
+from app.services.monitoring_service import monitoring_service, poller_coordinator
+from app.services.websocket_manager import manager, heat_exchanger_topic
+from app.logging_config import get_logger
+
+log = get_logger("events")
+
+
+class RedfishEventReceiver:
+    def __init__(self):
+        # Events can arrive at any web worker; the refresh runs in the process that polls the device
+        manager.on_control("redfish_refresh", lambda data: self.request_refresh(data.get("heat_exchanger_id")))
+        # heat exchanger id -> (rscm_ip, subscription URL)
+        self.subscriptions: Dict[int, Tuple[str, str]] = {}
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        self._refresh_pending: Set[int] = set()
+        # heat exchanger id -> monotonic time of its last reconcile poll
+        self._last_reconciled: Dict[int, float] = {}
+
+    def destination(self, heat_exchanger_id: int) -> str:
+        return f"{settings.redfish_event_destination_url.rstrip('/')}/api/redfish-events/{heat_exchanger_id}"
+
+    def verify_context(self, context: Optional[str]) -> bool:
+        """Events echo the Context we registered, which carries the shared secret"""
+        if not settings.redfish_event_context:
+            return False
+        return isinstance(context, str) and secrets.compare_digest(context, settings.redfish_event_context)
+
+    def due_for_poll(self, heat_exchanger_id: int) -> bool:
+        """Whether the regular poll job should poll a device in this cycle
+
+        Devices without a subscription are polled every cycle; subscribed ones only once
+        per ``REDFISH_EVENT_RECONCILE_SECONDS``, since their alarms arrive as events.
+        """
+        if heat_exchanger_id not in self.subscriptions:
+            return True
+        now = time.monotonic()
+        last = self._last_reconciled.get(heat_exchanger_id)
+        if last is not None and now - last < settings.redfish_event_reconcile_seconds:
+            return False
+        self._last_reconciled[heat_exchanger_id] = now
+        return True
+
+    async def reconcile_subscriptions(self):
+        """Subscribe the heat exchangers this process polls and drop stale subscriptions"""
+        if not settings.redfish_event_push or not poller_coordinator.is_active:
+            return
+        if not settings.redfish_event_destination_url or not settings.redfish_event_context:
+            log.warning("REDFISH_EVENT_PUSH needs REDFISH_EVENT_DESTINATION_URL and REDFISH_EVENT_CONTEXT")
+            return
+
+        from app.database import async_session_maker as session_maker
+        async with session_maker() as db:
+            result = await db.execute(select(HeatExchanger).where(HeatExchanger.is_active == True))
+            wanted = {
+                he.id: he.rscm_ip
+                for he in result.scalars().all()
+                if poller_coordinator.owns(he.id)
+            }
+
+        username, password = await get_redfish_credentials()
+
+        async def reconcile(heat_exchanger_id: int):
+            rscm_ip = wanted.get(heat_exchanger_id)
+            current = self.subscriptions.get(heat_exchanger_id)
+
+            if current is not None:
+                client = RedfishClient(current[0], username, password)
+                if rscm_ip != current[0]:
+                    # Deleted, moved to another poller, or its R-SCM address changed
+                    await client.delete_event_subscription(current[1])
+                    del self.subscriptions[heat_exchanger_id]
+                    self._last_reconciled.pop(heat_exchanger_id, None)
+                elif await client.subscription_exists(current[1]):
+                    return
+                else:
+                    del self.subscriptions[heat_exchanger_id]
+                    self._last_reconciled.pop(heat_exchanger_id, None)
+
+            if rscm_ip is None:
+                return
+            client = RedfishClient(rscm_ip, username, password)
+            location = await client.create_event_subscription(
+                self.destination(heat_exchanger_id),
+                settings.redfish_event_context
+            )
+            if location:
+                self.subscriptions[heat_exchanger_id] = (rscm_ip, location)
+                log.info("Subscribed to Redfish events from heat exchanger %s", heat_exchanger_id)
+
+        await asyncio.gather(*(
+            reconcile(heat_exchanger_id)
+            for heat_exchanger_id in set(wanted) | set(self.subscriptions)
+        ), return_exceptions=True)
+
+    async def handle_event(self, heat_exchanger_id: int, payload: Dict[str, Any]):
+        """Forward an event to live clients and refresh the device through the poll path"""
+        events = payload.get("Events") or []
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            await manager.broadcast({
+                "type": "redfish_event",
+                "heat_exchanger_id": heat_exchanger_id,
+                "event_type": event.get("EventType"),
+                "message_id": event.get("MessageId"),
+                "message": event.get("Message"),
+                "severity": event.get("MessageSeverity") or event.get("Severity"),
+                "origin": (event.get("OriginOfCondition") or {}).get("@odata.id")
+            }, topics=[heat_exchanger_topic(heat_exchanger_id)])
+
+        if poller_coordinator.owns(heat_exchanger_id):
+            self.request_refresh(heat_exchanger_id)
+        else:
+            # Web workers (EMBEDDED_POLLER=false, no lease, or another shard) hand it to the owner
+            await manager.publish_control("redfish_refresh", {"heat_exchanger_id": heat_exchanger_id})
+
+    def request_refresh(self, heat_exchanger_id: int):
+        """Refresh a device soon if this process polls it; bursts of events for one device are coalesced"""
+        if not isinstance(heat_exchanger_id, int) or not poller_coordinator.owns(heat_exchanger_id):
+            return
+        if heat_exchanger_id in self._refreshing:
+            self._refresh_pending.add(heat_exchanger_id)
+            return
+        self._refreshing[heat_exchanger_id] = asyncio.create_task(self._refresh(heat_exchanger_id))
+
+    async def _refresh(self, heat_exchanger_id: int):
+        try:
+            while True:
+                self._refresh_pending.discard(heat_exchanger_id)
+                from app.database import async_session_maker as session_maker
+                async with session_maker() as db:
+                    heat_exchanger = await db.get(HeatExchanger, heat_exchanger_id)
+                if heat_exchanger is None or not heat_exchanger.is_active:
+                    return
+                await monitoring_service.poll_heat_exchanger(heat_exchanger.id, heat_exchanger.rscm_ip)
+                # Events that arrived during the refresh need one more pass
+                if heat_exchanger_id not in self._refresh_pending:
+                    return
+        except Exception as e:
+            log.error("Error refreshing heat exchanger %s after event: %s", heat_exchanger_id, e)
+        finally:
+            self._refreshing.pop(heat_exchanger_id, None)
+
+    async def close(self):
+        """Remove our subscriptions from the devices (call on shutdown)"""
+        if not self.subscriptions:
+            return
+        username, password = await get_redfish_credentials()
+        subscriptions, self.subscriptions = self.subscriptions, {}
+        self._last_reconciled.clear()
+        await asyncio.gather(*(
+            RedfishClient(rscm_ip, username, password).delete_event_subscription(location)
+            for rscm_ip, location in subscriptions.values()
+        ), return_exceptions=True)
+
+
+# Global event receiver instance
+redfish_event_receiver = RedfishEventReceiver()
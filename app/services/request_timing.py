@@ -0,0 +1,117 @@
+"""Per-request latency and database time for the HTTP API
+
+``RequestTimingMiddleware`` times every HTTP request by route template (for example
+``/api/monitoring/{heat_exchanger_id}``), feeds per-route histograms into the metrics
+endpoint and adds a ``Server-Timing`` header, which browser dev tools show next to the
+request. Database time and the number of queries are collected per request through
+SQLAlchemy cursor events, so N+1 query patterns show up as a high query count.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.routing import Mount
+
+from app.config import settings
+from app.services.metrics import metrics
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+http_request_seconds = metrics.histogram(
+    "cooling_http_request_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+http_db_seconds = metrics.histogram(
+    "cooling_http_db_seconds", "Database time per HTTP request by route", ["method", "route"]
+)
+http_db_queries = metrics.histogram(
+    "cooling_http_db_queries", "Database queries per HTTP request by route", ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS
+)
+
+
+class RequestStats:
+    """Database work done while serving one request"""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine):
+    """Attribute statement time on this engine to the request being served"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_request.get() is not None:
+            conn.info.setdefault("request_timing_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_request.get()
+        starts = conn.info.get("request_timing_start")
+        if stats is None or not starts:
+            return
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, so /api/alerts/12 and /api/alerts/13 share a series"""
+    route = scope.get("route")
+    if route is None:
+        # Mounted apps (static files) don't set a route; report their mount path
+        endpoint = scope.get("endpoint")
+        route = next(
+            (r for r in getattr(scope.get("app"), "routes", ()) if isinstance(r, Mount) and r.app is endpoint),
+            None
+        ) if endpoint is not None else None
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    return path or "/"
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing:
+                    # The handler has finished for regular responses; streaming bodies are not included
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    header = (
+                        f'app;dur={elapsed_ms:.1f}, '
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            method = scope.get("method", "")
+            route = route_template(scope)
+            http_request_seconds.observe(time.perf_counter() - start, method=method, route=route, status=str(status_code))
+            http_db_seconds.observe(stats.db_seconds, method=method, route=route)
+            http_db_queries.observe(stats.queries, method=method, route=route)
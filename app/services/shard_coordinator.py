@@ -0,0 +1,186 @@
+"""Sharded polling across several poller processes or nodes
+
+With ``POLLER_SHARDING=true`` every poller heartbeats a ``member:<node id>`` row in
+the ``poller_leases`` table. The live members (unexpired heartbeats) form a
+consistent-hash ring and each poller only polls the heat exchangers whose id hashes
+to it. When a poller joins or its heartbeat expires, the ring is rebuilt on the next
+heartbeat and only that member's share of devices moves.
+
+Each poller decides ownership from its own view of the ring, refreshed once per
+heartbeat, so right after a membership change a device can briefly be polled by two
+pollers or by none. A member row is held by one process: a second process configured
+with the same node id stands by until the first one's heartbeat expires.
+"""
+import bisect
+import hashlib
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.poller_lease import PollerLease
+from app.logging_config import get_logger
+
+log = get_logger("coordination")
+
+
+MEMBER_PREFIX = "member:"
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, members: List[str], replicas: int = 64):
+        self.members = sorted(members)
+        self._ring = sorted(
+            (self._hash(f"{member}#{i}"), member)
+            for member in self.members
+            for i in range(replicas)
+        )
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def owner(self, key: str) -> Optional[str]:
+        """Member responsible for the given key"""
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._ring[index][1]
+
+
+class ShardCoordinator:
+    def __init__(self, node_id: str = ""):
+        # Identifies this process; the member row's holder, so two processes configured
+        # with the same POLLER_NODE_ID cannot both heartbeat it
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # A stable POLLER_NODE_ID keeps a node's shard across restarts
+        self.node_id = node_id or self.holder_id
+        self.ring = HashRing([])
+        self.heartbeat_expires_at: datetime | None = None
+        self._duplicate_logged = False
+
+    @property
+    def member_name(self) -> str:
+        return f"{MEMBER_PREFIX}{self.node_id}"
+
+    @property
+    def ttl_seconds(self) -> int:
+        return settings.poller_lease_seconds
+
+    @property
+    def renew_interval_seconds(self) -> float:
+        return max(1.0, self.ttl_seconds / 3)
+
+    @property
+    def is_active(self) -> bool:
+        """True while our heartbeat is current"""
+        return self.heartbeat_expires_at is not None and datetime.utcnow() < self.heartbeat_expires_at
+
+    def owns(self, heat_exchanger_id: int) -> bool:
+        """Whether this poller is responsible for a heat exchanger"""
+        return self.is_active and self.ring.owner(str(heat_exchanger_id)) == self.node_id
+
+    async def renew(self) -> bool:
+        """Heartbeat our membership and rebuild the ring from the live members"""
+        from app.database import async_session_maker as session_maker
+        if session_maker is None:
+            return False
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+
+        try:
+            async with session_maker() as db:
+                result = await db.execute(
+                    update(PollerLease)
+                    .where(
+                        PollerLease.name == self.member_name,
+                        or_(PollerLease.holder == self.holder_id, PollerLease.expires_at < now)
+                    )
+                    .values(holder=self.holder_id, renewed_at=now, expires_at=expires_at)
+                )
+                if result.rowcount == 0:
+                    existing = await db.get(PollerLease, self.member_name)
+                    if existing is not None:
+                        # Another live process uses our node id (e.g. uvicorn --workers with a
+                        # shared POLLER_NODE_ID): stand by instead of polling the same shard
+                        if not self._duplicate_logged:
+                            log.error(
+                                "Poller node id %s is already in use by %s; this process (%s) will not poll "
+                                "until that member expires. Give each poller process its own POLLER_NODE_ID.",
+                                self.node_id, existing.holder, self.holder_id
+                            )
+                            self._duplicate_logged = True
+                        self.heartbeat_expires_at = None
+                        return False
+                    db.add(PollerLease(
+                        name=self.member_name,
+                        holder=self.holder_id,
+                        renewed_at=now,
+                        expires_at=expires_at
+                    ))
+
+                # Forget members that have been gone for a while
+                await db.execute(
+                    delete(PollerLease).where(
+                        PollerLease.name.startswith(MEMBER_PREFIX),
+                        PollerLease.expires_at < now - timedelta(seconds=self.ttl_seconds * 10)
+                    )
+                )
+                await db.commit()
+
+                result = await db.execute(
+                    select(PollerLease.name).where(
+                        PollerLease.name.startswith(MEMBER_PREFIX),
+                        PollerLease.expires_at > now
+                    )
+                )
+                members = {name[len(MEMBER_PREFIX):] for name in result.scalars().all()}
+        except IntegrityError:
+            # Another process created our member row first; the next heartbeat reports it
+            self.heartbeat_expires_at = None
+            return False
+        except Exception as e:
+            log.warning("Failed to heartbeat poller shard membership: %s", e)
+            self.heartbeat_expires_at = None
+            return False
+
+        self._duplicate_logged = False
+        members.add(self.node_id)
+        if sorted(members) != self.ring.members:
+            self.ring = HashRing(list(members))
+            log.info("Poller members changed: %d active (%s)", len(members), ", ".join(self.ring.members))
+
+        self.heartbeat_expires_at = expires_at
+        return True
+
+    async def release(self):
+        """Leave the ring on shutdown so the other pollers pick up our share immediately"""
+        from app.database import async_session_maker as session_maker
+        if session_maker is None:
+            return
+
+        try:
+            async with session_maker() as db:
+                result = await db.execute(
+                    delete(PollerLease)
+                    .where(PollerLease.name == self.member_name, PollerLease.holder == self.holder_id)
+                )
+                await db.commit()
+            if result.rowcount:
+                log.info("Left poller shard ring (%s)", self.node_id)
+        except Exception as e:
+            log.warning("Failed to leave poller shard ring: %s", e)
+        finally:
+            self.heartbeat_expires_at = None
+
+
+# Global shard coordinator instance
+shard_coordinator = ShardCoordinator(settings.poller_node_id)
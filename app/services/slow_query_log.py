@@ -0,0 +1,208 @@
+"""Opt-in slow-query log with query plans
+
+With ``SLOW_QUERY_LOG=true`` every statement slower than ``SLOW_QUERY_THRESHOLD_MS`` is
+logged with its parameter types (values with ``SLOW_QUERY_LOG_PARAMETERS=true``) and
+aggregated per statement. The first time a statement
+shows up, its plan is captured (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` elsewhere)
+on a separate connection and full table scans are flagged. ``GET /api/diagnostics/slow-queries``
+ranks the statements by total time so indexes can be added where the plans show scans.
+"""
+import asyncio
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.logging_config import get_logger
+
+log = get_logger("db")
+
+# Statements worth explaining; EXPLAIN on INSERT/DDL says nothing useful
+EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+# SQLite: "SCAN alerts" is a full table scan, "SCAN t USING [COVERING] INDEX ix" walks a whole index
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+# Subqueries and CTEs SQLite builds itself; scanning those is expected
+SQLITE_TEMPORARY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+# PostgreSQL
+SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+# Tables holding credentials (Redfish password, webhook URL, password hashes); their values are never shown
+SENSITIVE_TABLES = re.compile(r"\b(system_settings|users)\b", re.IGNORECASE)
+
+MAX_PARAMETER_LENGTH = 300
+
+
+def _parameter_types(row: Any) -> str:
+    values = row.values() if isinstance(row, dict) else row
+    return "(" + ", ".join(type(value).__name__ for value in values) + ")"
+
+
+def _format_parameters(statement: str, parameters: Any) -> str:
+    """Short printable form of a statement's parameters (first row of an executemany)
+
+    Values are only shown with SLOW_QUERY_LOG_PARAMETERS=true, and never for statements
+    on credential tables; otherwise just their types.
+    """
+    many = isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, list, dict))
+    row = parameters[0] if many else parameters
+    if not settings.slow_query_log_parameters or SENSITIVE_TABLES.search(statement):
+        text = _parameter_types(row or ())
+    else:
+        text = repr(row)
+    if many:
+        text += f" (+{len(parameters) - 1} more)"
+    if len(text) > MAX_PARAMETER_LENGTH:
+        text = text[:MAX_PARAMETER_LENGTH] + "..."
+    return text
+
+
+class SlowStatement:
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_parameters = ""
+        self.first_seen = datetime.utcnow()
+        self.last_seen = self.first_seen
+        self.plan: Optional[List[str]] = None
+        self.full_scans: List[str] = []
+        self.index_scans: List[str] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "mean_ms": round(self.total_seconds / self.count * 1000, 1) if self.count else 0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "last_parameters": self.last_parameters,
+            "plan": self.plan,
+            "full_table_scans": self.full_scans,
+            "full_index_scans": self.index_scans,
+            "first_seen": self.first_seen.isoformat(),
+            "last_seen": self.last_seen.isoformat()
+        }
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self.statements: Dict[str, SlowStatement] = {}
+        self.engine = None
+        self._explain_tasks: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.engine is not None
+
+    def instrument(self, engine):
+        """Start recording slow statements on this engine"""
+        self.engine = engine
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("slow_query_start")
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            if elapsed * 1000 >= settings.slow_query_threshold_ms and not statement.lstrip().upper().startswith("EXPLAIN"):
+                self.record(statement, parameters, elapsed)
+
+    def record(self, statement: str, parameters: Any, elapsed: float):
+        entry = self.statements.get(statement)
+        if entry is None:
+            if len(self.statements) >= settings.slow_query_max_statements:
+                # Make room by dropping the statement that has cost the least so far
+                cheapest = min(self.statements.values(), key=lambda s: s.total_seconds)
+                del self.statements[cheapest.statement]
+            entry = self.statements[statement] = SlowStatement(statement)
+            self._schedule_explain(entry, parameters)
+        entry.count += 1
+        entry.total_seconds += elapsed
+        entry.max_seconds = max(entry.max_seconds, elapsed)
+        entry.last_parameters = _format_parameters(statement, parameters)
+        entry.last_seen = datetime.utcnow()
+        log.warning(
+            "Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:300],
+            extra={"duration_ms": round(elapsed * 1000, 1), "params": entry.last_parameters}
+        )
+
+    def _schedule_explain(self, entry: SlowStatement, parameters: Any):
+        if not EXPLAINABLE.match(entry.statement):
+            return
+        if isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, list, dict)):
+            parameters = parameters[0]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Explain on another connection, outside the transaction that ran the statement
+        task = loop.create_task(self._explain(entry, parameters))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, entry: SlowStatement, parameters: Any):
+        dialect = self.engine.dialect.name
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.exec_driver_sql(prefix + entry.statement, parameters or ())
+                rows = result.fetchall()
+        except Exception as e:
+            # First line only: SQLAlchemy appends the SQL and its parameters
+            entry.plan = [f"EXPLAIN failed: {str(e).splitlines()[0] if str(e) else type(e).__name__}"]
+            return
+
+        if dialect == "sqlite":
+            # (id, parent, notused, detail)
+            entry.plan = [str(row[-1]) for row in rows]
+            temporary = {match.group(1) for match in map(SQLITE_TEMPORARY.match, entry.plan) if match}
+            for line in entry.plan:
+                match = SQLITE_SCAN.match(line)
+                if not match or match.group(1) in temporary:
+                    continue
+                if "INDEX" in match.group(2):
+                    entry.index_scans.append(match.group(1))
+                else:
+                    entry.full_scans.append(match.group(1))
+        else:
+            entry.plan = [str(row[0]) for row in rows]
+            for line in entry.plan:
+                entry.full_scans.extend(SEQ_SCAN.findall(line))
+
+        if entry.full_scans or entry.index_scans:
+            scanned = ", ".join(entry.full_scans + [f"{table} (index)" for table in entry.index_scans])
+            log.warning("Full scan of %s: %s", scanned, " ".join(entry.statement.split())[:300])
+
+    def report(self, sort: str = "total", limit: int = 50) -> Dict[str, Any]:
+        """Recorded statements, slowest first"""
+        keys = {
+            "total": lambda s: s.total_seconds,
+            "max": lambda s: s.max_seconds,
+            "mean": lambda s: s.total_seconds / s.count if s.count else 0,
+            "count": lambda s: s.count
+        }
+        ranked = sorted(self.statements.values(), key=keys.get(sort, keys["total"]), reverse=True)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": settings.slow_query_threshold_ms,
+            "statements": len(self.statements),
+            "full_table_scans": sum(1 for s in self.statements.values() if s.full_scans),
+            "full_index_scans": sum(1 for s in self.statements.values() if s.index_scans),
+            "queries": [s.to_dict() for s in ranked[:limit]]
+        }
+
+    def reset(self):
+        self.statements.clear()
+
+
+# Global slow-query log instance
+slow_query_log = SlowQueryLog()
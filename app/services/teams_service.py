@@ -1,85 +1,271 @@
 """Microsoft Teams notification service"""
+import asyncio
+import time
 import httpx
 from datetime import datetime
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.config import settings as app_settings
 from app.models.settings import SystemSettings
+from app.logging_config import get_logger
+
+log = get_logger("notifications")
+
+
+# Teams accepts at most this many facts per card before it starts truncating
+MAX_ALARMS_PER_CARD = 25
+# Alarms kept per webhook while Teams keeps throttling; the oldest are dropped beyond this
+MAX_PENDING_ALARMS = 1000
+
+
+class TokenBucket:
+    """Async token bucket used to keep webhook posts within the Teams quota"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a token is available (and any Retry-After pause has passed)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds (HTTP 429 Retry-After)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
 
 
 class TeamsService:
-    @staticmethod
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket = TokenBucket(
+            rate=app_settings.teams_rate_limit_per_second,
+            capacity=app_settings.teams_rate_limit_burst
+        )
+        # Alarms waiting to be coalesced, keyed by webhook URL
+        self._pending: Dict[str, List[dict]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # True while the flush task is posting (as opposed to waiting for the window)
+        self._flushing = False
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
     async def send_urgent_alarm_teams(
+        self,
         db: AsyncSession,
         heat_exchanger_name: str,
         pump_id: str,
         flow_rate: float
     ):
-        """Send urgent alarm notification to Microsoft Teams"""
+        """Queue an urgent alarm notification for Microsoft Teams
+
+        Alarms raised within the coalescing window are posted together as a single card.
+        """
         # Get Teams settings from database
         result = await db.execute(select(SystemSettings).limit(1))
         settings = result.scalars().first()
-        
+
         if not settings or not settings.teams_enabled or not settings.teams_webhook_url:
-            print(f"⚠️ URGENT ALARM: {heat_exchanger_name} - Pump {pump_id} flow rate critically low: {flow_rate} L/min (Teams disabled)")
+            log.warning("URGENT ALARM: %s - Pump %s flow rate critically low: %s L/min (Teams disabled)", heat_exchanger_name, pump_id, flow_rate)
             return
-        
-        try:
-            threshold = settings.pump_flow_critical_threshold or 10.0
-            
-            # Create adaptive card message for Teams
-            card = {
-                "@type": "MessageCard",
-                "@context": "https://schema.org/extensions",
-                "themeColor": "FF0000",  # Red
-                "summary": f"🚨 URGENT: Low Flow Rate Alert - {heat_exchanger_name}",
-                "sections": [
+
+        self._pending.setdefault(settings.teams_webhook_url, []).append({
+            "heat_exchanger_name": heat_exchanger_name,
+            "pump_id": pump_id,
+            "flow_rate": flow_rate,
+            "threshold": settings.pump_flow_critical_threshold or 10.0,
+            "timestamp": datetime.utcnow()
+        })
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        """Wait for the coalescing window to close, then post everything queued
+
+        Alarms queued while a flush is still posting (rate limiter, Retry-After) are
+        picked up by another round instead of waiting for the next alarm.
+        """
+        while True:
+            await asyncio.sleep(app_settings.teams_coalesce_window_seconds)
+            self._flushing = True
+            try:
+                await self.flush()
+            finally:
+                self._flushing = False
+            if not self._pending:
+                return
+
+    async def flush(self):
+        """Post all queued alarms, one card per webhook (chunked for very large storms)
+
+        If Teams is still throttling after the last retry, the unsent alarms for that
+        webhook are queued again for the next flush.
+        """
+        pending, self._pending = self._pending, {}
+
+        for webhook_url, alarms in pending.items():
+            for i in range(0, len(alarms), MAX_ALARMS_PER_CARD):
+                chunk = alarms[i:i + MAX_ALARMS_PER_CARD]
+                try:
+                    await self._post_card(webhook_url, self._build_card(chunk))
+                    names = ", ".join(f"{a['heat_exchanger_name']} - Pump {a['pump_id']}" for a in chunk)
+                    log.info("Urgent alarm Teams message sent for %s", names)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 429:
+                        log.error("Failed to send Teams notification: %s", e)
+                        continue
+                    self._requeue(webhook_url, alarms[i:])
+                    break
+                except Exception as e:
+                    log.error("Failed to send Teams notification: %s", e)
+
+    def _requeue(self, webhook_url: str, alarms: List[dict]):
+        """Put throttled alarms back in front of anything queued since the flush started"""
+        queued = alarms + self._pending.get(webhook_url, [])
+        if len(queued) > MAX_PENDING_ALARMS:
+            log.error("Teams webhook still throttled, dropping %d oldest alarm(s)", len(queued) - MAX_PENDING_ALARMS)
+            queued = queued[-MAX_PENDING_ALARMS:]
+        self._pending[webhook_url] = queued
+        log.warning("Teams webhook still throttled, %d alarm(s) queued for the next flush", len(alarms))
+
+    async def _post_card(self, webhook_url: str, card: dict, retries: int = 3):
+        """Post a card through the rate limiter, honoring Retry-After on HTTP 429"""
+        client = self._get_client()
+
+        for attempt in range(retries):
+            await self._bucket.acquire()
+            response = await client.post(webhook_url, json=card)
+
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                try:
+                    wait_time = float(retry_after)
+                except (TypeError, ValueError):
+                    wait_time = 2.0 * (2 ** attempt)
+                # Also after the last attempt, so the next flush waits too
+                self._bucket.pause(wait_time)
+                if attempt < retries - 1:
+                    log.warning("Teams webhook throttled, retrying in %.1fs", wait_time)
+                    continue
+
+            response.raise_for_status()
+            return
+
+    @staticmethod
+    def _build_card(alarms: List[dict]) -> dict:
+        """Build a MessageCard for one or more low-flow alarms"""
+        thresholds = {a["threshold"] for a in alarms}
+        timestamp = alarms[-1]["timestamp"].strftime('%Y-%m-%d %H:%M:%S UTC')
+
+        if len(alarms) == 1:
+            alarm = alarms[0]
+            summary = f"🚨 URGENT: Low Flow Rate Alert - {alarm['heat_exchanger_name']}"
+            facts = [
+                {
+                    "name": "Heat Exchanger:",
+                    "value": alarm["heat_exchanger_name"]
+                },
+                {
+                    "name": "Pump ID:",
+                    "value": alarm["pump_id"]
+                },
+                {
+                    "name": "Current Flow Rate:",
+                    "value": f"⚠️ {alarm['flow_rate']} L/min"
+                },
+                {
+                    "name": "Critical Threshold:",
+                    "value": f"{alarm['threshold']} L/min"
+                },
+                {
+                    "name": "Status:",
+                    "value": "🔴 **CRITICALLY LOW**"
+                }
+            ]
+        else:
+            exchangers = {a["heat_exchanger_name"] for a in alarms}
+            summary = f"🚨 URGENT: {len(alarms)} Low Flow Rate Alerts across {len(exchangers)} heat exchanger(s)"
+            if len(thresholds) == 1:
+                facts = [
                     {
-                        "activityTitle": "🚨 URGENT ALARM - IMMEDIATE ATTENTION REQUIRED",
-                        "activitySubtitle": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC'),
-                        "activityImage": "https://raw.githubusercontent.com/microsoft/fluentui-emoji/main/assets/Warning/3D/warning_3d.png",
-                        "facts": [
-                            {
-                                "name": "Heat Exchanger:",
-                                "value": heat_exchanger_name
-                            },
-                            {
-                                "name": "Pump ID:",
-                                "value": pump_id
-                            },
-                            {
-                                "name": "Current Flow Rate:",
-                                "value": f"⚠️ {flow_rate} L/min"
-                            },
-                            {
-                                "name": "Critical Threshold:",
-                                "value": f"{threshold} L/min"
-                            },
-                            {
-                                "name": "Status:",
-                                "value": "🔴 **CRITICALLY LOW**"
-                            }
-                        ],
-                        "markdown": True
-                    },
+                        "name": f"{a['heat_exchanger_name']} - {a['pump_id']}:",
+                        "value": f"⚠️ {a['flow_rate']} L/min"
+                    }
+                    for a in alarms
+                ]
+                facts.append({
+                    "name": "Critical Threshold:",
+                    "value": f"{alarms[0]['threshold']} L/min"
+                })
+            else:
+                # Threshold changed during the window: show the one each alarm was raised against
+                facts = [
                     {
-                        "text": "**Action Required:** Please investigate immediately to prevent equipment damage."
+                        "name": f"{a['heat_exchanger_name']} - {a['pump_id']}:",
+                        "value": f"⚠️ {a['flow_rate']} L/min (threshold {a['threshold']} L/min)"
                     }
+                    for a in alarms
                 ]
-            }
-            
-            # Send to Teams webhook
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    settings.teams_webhook_url,
-                    json=card
-                )
-                response.raise_for_status()
-            
-            print(f"✅ Urgent alarm Teams message sent for {heat_exchanger_name} - Pump {pump_id}")
-            
-        except Exception as e:
-            print(f"❌ Failed to send Teams notification: {e}")
+
+        # Create adaptive card message for Teams
+        return {
+            "@type": "MessageCard",
+            "@context": "https://schema.org/extensions",
+            "themeColor": "FF0000",  # Red
+            "summary": summary,
+            "sections": [
+                {
+                    "activityTitle": "🚨 URGENT ALARM - IMMEDIATE ATTENTION REQUIRED",
+                    "activitySubtitle": timestamp,
+                    "activityImage": "https://raw.githubusercontent.com/microsoft/fluentui-emoji/main/assets/Warning/3D/warning_3d.png",
+                    "facts": facts,
+                    "markdown": True
+                },
+                {
+                    "text": "**Action Required:** Please investigate immediately to prevent equipment damage."
+                }
+            ]
+        }
+
+    async def close(self):
+        """Flush queued alarms and close the pooled HTTP client"""
+        if self._flush_task and not self._flush_task.done():
+            if self._flushing:
+                # Let the in-flight flush finish posting the alarms it already took
+                await asyncio.gather(self._flush_task, return_exceptions=True)
+            else:
+                self._flush_task.cancel()
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 teams_service = TeamsService()
@@ -1,35 +1,302 @@
 from fastapi import WebSocket
-from typing import List, Dict
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Set, Tuple
+import asyncio
 import json
+import re
+import uuid
+
+import orjson
+
+from app.config import settings
+from app.services.broadcast_backplane import create_backplane
+from app.logging_config import get_logger
+
+log = get_logger("websocket")
+
+
+# Topics a client may subscribe to: all alerts, fleet-wide dashboard updates, or one heat exchanger
+TOPIC_PATTERN = re.compile(r"^(alerts|fleet|he:\d+)$")
+MAX_TOPICS_PER_CLIENT = 200
+
+
+def heat_exchanger_topic(heat_exchanger_id: int) -> str:
+    """Topic name for events about a single heat exchanger"""
+    return f"he:{heat_exchanger_id}"
+
+
+def encode_message(message: Dict) -> str:
+    """Encode a message to a JSON text frame
+
+    Values orjson can't serialize natively (Decimal, ...) are sent as strings and
+    non-string keys are converted, so any event the poller builds can be encoded.
+    """
+    return orjson.dumps(message, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+class ClientConnection:
+    """A connected WebSocket client with its own bounded send queue
+
+    Messages are drained by a dedicated task so a slow client only delays itself.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.websocket_send_queue_size)
+        self.dropped = 0
+        self.topics: Set[str] = set()
+        self.sender_task = asyncio.create_task(self._sender())
+
+    def enqueue(self, frame: str) -> bool:
+        """Queue a message without blocking. Returns False if the client should be dropped."""
+        if self.queue.full():
+            if settings.websocket_slow_client_policy == "disconnect":
+                return False
+            # drop_oldest: discard the stalest message to make room for the new one
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+        return True
+
+    async def _sender(self):
+        """Drain the send queue to the socket"""
+        try:
+            while True:
+                frame = await self.queue.get()
+                await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Error sending to client: %s", e)
+            self.manager.disconnect(self.websocket)
+
+    async def close(self):
+        """Stop the sender and close the socket (used for slow consumers)"""
+        self.sender_task.cancel()
+        try:
+            await self.websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
 
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # Topic -> subscribed clients, so publishing only touches interested connections
+        self.subscriptions: Dict[str, Set[ClientConnection]] = {}
+        # Every broadcast gets a sequence number; recent frames are kept for replay after reconnect.
+        # The epoch changes on restart so clients can tell a reset counter from a gap. With the
+        # unix backplane both come from the hub, so every worker numbers events the same way and
+        # a client can resume on another worker; events delivered without the hub (hub down,
+        # oversized) are numbered under this process's own epoch.
+        self._local_epoch = uuid.uuid4().hex[:12]
+        self._local_sequence = 0
+        self.epoch = self._local_epoch
+        self.sequence = 0
+        self.history: Deque[Tuple[int, Optional[frozenset], str]] = deque(maxlen=settings.websocket_replay_buffer_size)
+        # Carries broadcasts to every worker process (in-process unless configured otherwise)
+        self.backplane = create_backplane()
+        self._backplane_started = False
+        # Control messages travel over the backplane between processes and never reach clients
+        self.control_handlers: Dict[str, Callable[[Dict], None]] = {}
+
+    async def start(self):
+        """Start the broadcast backplane (call from the app lifespan)"""
+        await self.backplane.start(self._deliver)
+        self._backplane_started = True
 
-    async def connect(self, websocket: WebSocket):
+    async def stop(self):
+        await self.backplane.stop()
+        self._backplane_started = False
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str] = (),
+        resume_from: Optional[int] = None,
+        epoch: Optional[str] = None
+    ) -> bool:
+        """Register a client. Returns True if missed events since ``resume_from`` were replayed."""
         await websocket.accept()
-        self.active_connections.append(websocket)
-        print(f"WebSocket client connected. Total: {len(self.active_connections)}")
+        client = ClientConnection(websocket, self)
+        self.active_connections[websocket] = client
+        self.subscribe(websocket, topics)
+        log.info("WebSocket client connected. Total: %d", len(self.active_connections))
+
+        self.send(websocket, {"type": "hello", "epoch": self.epoch, "seq": self.sequence})
+        if resume_from is None:
+            return False
+        return self._replay(client, resume_from, epoch)
+
+    def _replay(self, client: ClientConnection, resume_from: int, epoch: Optional[str]) -> bool:
+        """Queue buffered events newer than ``resume_from`` for the client's topics
+
+        Returns False when the gap cannot be filled from the buffer (server restarted,
+        events already evicted, or more than the client's queue can hold).
+        """
+        if epoch != self.epoch or resume_from > self.sequence:
+            return False
+        if resume_from < self.sequence and (not self.history or self.history[0][0] > resume_from + 1):
+            return False
+
+        frames = [
+            frame for seq, topics, frame in self.history
+            if seq > resume_from and (topics is None or topics & client.topics)
+        ]
+        if len(frames) >= client.queue.maxsize - 1:
+            return False
+
+        for frame in frames:
+            client.enqueue(frame)
+        return True
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        print(f"WebSocket client disconnected. Total: {len(self.active_connections)}")
-
-    async def broadcast(self, message: Dict):
-        """Broadcast message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                disconnected.append(connection)
-        
-        # Remove disconnected clients
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
+        client = self._remove(websocket)
+        if client is None:
+            return
+        client.sender_task.cancel()
+        log.info("WebSocket client disconnected. Total: %d", len(self.active_connections))
+
+    def _remove(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        """Drop a connection and its topic index entries"""
+        client = self.active_connections.pop(websocket, None)
+        if client is not None:
+            self.unsubscribe(websocket, list(client.topics), client=client)
+        return client
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Set[str]:
+        """Subscribe a connection to topics, ignoring invalid names. Returns the client's topics."""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return set()
+        for topic in topics:
+            if not isinstance(topic, str) or not TOPIC_PATTERN.match(topic):
+                continue
+            if len(client.topics) >= MAX_TOPICS_PER_CLIENT:
+                break
+            client.topics.add(topic)
+            self.subscriptions.setdefault(topic, set()).add(client)
+        return client.topics
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str], client: ClientConnection = None) -> Set[str]:
+        """Unsubscribe a connection from topics. Returns the client's remaining topics."""
+        client = client or self.active_connections.get(websocket)
+        if client is None:
+            return set()
+        for topic in topics:
+            client.topics.discard(topic)
+            subscribers = self.subscriptions.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.subscriptions[topic]
+        return client.topics
+
+    async def handle_client_message(self, websocket: WebSocket, data: str) -> Set[str]:
+        """Handle a control message sent by a client. Returns the newly subscribed topics.
+
+        Supported: {"action": "subscribe" | "unsubscribe", "topics": ["he:1", "alerts", "fleet"]}
+        """
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return set()
+        if not isinstance(message, dict):
+            return set()
+
+        action = message.get("action")
+        topics = message.get("topics") or []
+        if isinstance(topics, str):
+            topics = [topics]
+
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return set()
+        before = set(client.topics)
+
+        if action == "subscribe":
+            current = self.subscribe(websocket, topics)
+        elif action == "unsubscribe":
+            current = self.unsubscribe(websocket, topics)
+        else:
+            return set()
+
+        self.send(websocket, {"type": "subscriptions", "topics": sorted(current)})
+        return current - before
+
+    def send(self, websocket: WebSocket, message: Dict):
+        """Queue a message for a single client"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.enqueue(encode_message(message))
+
+    async def broadcast(self, message: Dict, topics: Iterable[str] = None):
+        """Publish a message to clients on every worker and return immediately
+
+        With no topics the message goes to every connected client; otherwise it goes
+        to each client subscribed to at least one of the topics (once per client).
+        """
+        topics = list(topics) if topics is not None else None
+        if not self._backplane_started:
+            # Backplane not running (e.g. scripts or tests): deliver to this process only
+            self._deliver(message, topics, None)
+            return
+        await self.backplane.publish(message, topics)
+
+    def on_control(self, kind: str, handler: Callable[[Dict], None]):
+        """Handle control messages of one kind published by any process"""
+        self.control_handlers[kind] = handler
+
+    async def publish_control(self, kind: str, data: Dict):
+        """Send a control message to every process (including this one), not to clients"""
+        await self.broadcast({"type": "control", "kind": kind, "data": data}, topics=[])
+
+    def _deliver(self, message: Dict, topics: Optional[Iterable[str]], stamp: Optional[Tuple[str, int]] = None):
+        """Fan a message out to this process's clients
+
+        The message is stamped with its sequence number (the hub's ``stamp``, or the next
+        local one), encoded once, and the same text frame is shared by all clients and kept
+        in the replay buffer.
+        """
+        if message.get("type") == "control":
+            handler = self.control_handlers.get(message.get("kind"))
+            if handler is not None:
+                handler(message.get("data") or {})
+            return
+
+        if topics is None:
+            recipients = self.active_connections.values()
+        else:
+            topics = frozenset(topics)
+            recipients = set()
+            for topic in topics:
+                recipients.update(self.subscriptions.get(topic, ()))
+
+        if stamp is None:
+            self._local_sequence += 1
+            stamp = (self._local_epoch, self._local_sequence)
+        epoch, self.sequence = stamp
+        if epoch != self.epoch:
+            # Numbering restarted (new hub, or delivering without one): old frames can't be resumed
+            self.epoch = epoch
+            self.history.clear()
+        frame = encode_message({**message, "seq": self.sequence})
+        self.history.append((self.sequence, topics, frame))
+
+        if not recipients:
+            return
+
+        slow_clients = []
+        for client in recipients:
+            if not client.enqueue(frame):
+                slow_clients.append(client)
+
+        # Disconnect clients that could not keep up
+        for client in slow_clients:
+            log.warning("Disconnecting slow WebSocket client (%d messages queued)", client.queue.qsize())
+            self._remove(client.websocket)
+            asyncio.create_task(client.close())
 
 
 manager = ConnectionManager()
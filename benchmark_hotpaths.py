@@ -0,0 +1,343 @@
+"""Microbenchmarks for the polling hot paths
+
+Times the per-device work of a polling cycle on synthetic fleets of 10/100/1000
+devices, using the payloads the R-SCM simulator serves (with ~10% of devices in
+alarm), and compares the results with a stored baseline:
+
+    python benchmark_hotpaths.py                    # compare with benchmark_baseline.json
+    python benchmark_hotpaths.py --save-baseline    # record a new baseline
+    python benchmark_hotpaths.py --only alarms --sizes 100 --threshold 0.5
+
+Exits with status 1 when a benchmark's median is more than --threshold (default 25%)
+slower than its baseline. Baselines depend on the machine, so they are not committed:
+record one with --save-baseline on the machine that runs the comparison.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Add app directory to path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+# Quiet SQL echo for the alarm benchmark's in-memory database, and alarm log lines
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from rscm_simulator import SimulatedDevice
+from app.database import Base
+from app.models.heat_exchanger import HeatExchanger, HeatExchangerResponse
+from app.services.monitoring_service import monitoring_service
+from app.services.redfish_client import RedfishClient
+from app.services.websocket_manager import encode_message
+
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmark_baseline.json")
+FLEET_SIZES = (10, 100, 1000)
+ALARM_FRACTION = 0.1
+
+
+class Fleet:
+    """Recorded Redfish payloads and the parsed values derived from them for N devices"""
+
+    def __init__(self, size: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.devices: List[SimulatedDevice] = []
+        for index in range(size):
+            device = SimulatedDevice(index, f"127.0.1.{index}", random.Random(rng.random()), fans=6, pumps=3, has_pumps=True)
+            if rng.random() < ALARM_FRACTION:
+                device.active_scenarios = [
+                    {"type": "leak", "sensor": "LeakSensor1"},
+                    {"type": "fan_alarm", "fan": 2},
+                    {"type": "pump_alarm", "pump": 1},
+                    {"type": "sensor_alarm", "sensor": "SupplyTemperatureHigh"}
+                ]
+            self.devices.append(device)
+
+        # Redfish resources per device, as RedfishClient._make_request would return them
+        self.resources: List[Dict[str, dict]] = []
+        for device in self.devices:
+            resources = {
+                "/redfish/v1/Chassis/CDU": device.cdu(),
+                "/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans": device.fan_collection(),
+                "/redfish/v1/ThermalEquipment/CDUs/1/Pumps": device.pump_collection()
+            }
+            for n in range(1, device.fans + 1):
+                resources[f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}"] = device.fan(n)
+            for n in range(1, device.pumps + 1):
+                resources[f"/redfish/v1/ThermalEquipment/CDUs/1/Pumps/{n}/Oem/Microsoft/DeviceStatus"] = device.pump_status(n)
+            self.resources.append(resources)
+
+        self.clients = [self._client(resources) for resources in self.resources]
+        self.samples: List[dict] = []
+
+    @staticmethod
+    def _client(resources: Dict[str, dict]) -> RedfishClient:
+        client = RedfishClient("127.0.0.1")
+
+        async def make_request(endpoint: str, retries: int = 3):
+            return resources.get(endpoint)
+
+        client._make_request = make_request
+        return client
+
+    async def parse(self):
+        """Parse every device's payloads once so later benchmarks have real samples"""
+        self.samples = []
+        for client in self.clients:
+            self.samples.append({
+                "cdu_status": await client.get_cdu_status(),
+                "fan_status": await client.get_fan_status(),
+                "pump_status": await client.get_pump_status()
+            })
+
+    def heat_exchangers(self) -> List[HeatExchanger]:
+        """ORM objects with every status column filled in, as after a poll"""
+        now = datetime.utcnow()
+        rows = []
+        for index, sample in enumerate(self.samples):
+            cdu_status = sample["cdu_status"]
+            rows.append(HeatExchanger(
+                id=index + 1,
+                type="HX",
+                name=f"bench-{index:05d}",
+                rscm_ip=self.devices[index].address,
+                city="Benchmark",
+                building="B1",
+                room=f"R{index // 100}",
+                tile=f"T{index % 100}",
+                is_active=True,
+                program_id=None,
+                created_at=now,
+                updated_at=now,
+                manager_type="RackManager",
+                model="R-SCM Simulator",
+                firmware_version="1.2.3",
+                status_state="Enabled",
+                status_health="OK",
+                hostname=f"sim-rscm-{index:05d}",
+                unique_id=f"SIM{index:08d}",
+                time_since_boot="3600",
+                cdu_chassis_status=json.dumps(cdu_status["chassis_status"]),
+                cdu_controller_status=json.dumps(cdu_status["controller_status"]),
+                cdu_alarms=json.dumps({
+                    "fan_alarms": cdu_status["fan_alarms"],
+                    "pump_alarms": cdu_status["pump_alarms"],
+                    "sensor_alarms": cdu_status["sensor_alarms"],
+                    "leak_alarms": cdu_status["leak_alarms"]
+                }),
+                fan_status=json.dumps(sample["fan_status"]),
+                pump_status=json.dumps(sample["pump_status"]),
+                urgent_alarms=None
+            ))
+        return rows
+
+
+# Benchmarks: each returns an async callable that processes the whole fleet once
+
+async def bench_parse_cdu(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    async def run():
+        for client in fleet.clients:
+            await client.get_cdu_status()
+    return run
+
+
+async def bench_parse_pumps(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    async def run():
+        for client in fleet.clients:
+            await client.get_pump_status()
+    return run
+
+
+async def bench_orm_response(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    rows = fleet.heat_exchangers()
+    for row in rows:
+        row.program = None
+
+    async def run():
+        for row in rows:
+            HeatExchangerResponse.from_orm_model(row)
+    return run
+
+
+async def bench_raw_data(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    now = datetime.utcnow()
+
+    async def run():
+        for index, sample in enumerate(fleet.samples):
+            monitoring_service.build_monitoring_record(
+                index + 1, now, "Enabled", sample["cdu_status"], sample["fan_status"], sample["pump_status"]
+            )
+    return run
+
+
+async def bench_ws_encode(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    now = datetime.utcnow()
+    messages = []
+    for index, sample in enumerate(fleet.samples):
+        record = monitoring_service.build_monitoring_record(
+            index + 1, now, "Enabled", sample["cdu_status"], sample["fan_status"], sample["pump_status"]
+        )
+        record["timestamp"] = now.isoformat()
+        messages.append({"type": "monitoring_update", "heat_exchanger_id": index + 1, "data": record})
+
+    async def run():
+        for message in messages:
+            encode_message(message)
+    return run
+
+
+async def bench_alarms(fleet: Fleet) -> Callable[[], Awaitable[None]]:
+    """_process_alarms against an in-memory SQLite database; alarms are created once, then deduplicated"""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    # Register every model with Base before create_all
+    from app.models import alert, monitoring_data, poller_lease, program, settings, user  # noqa: F401
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_maker() as db:
+        db.add_all(fleet.heat_exchangers())
+        await db.commit()
+
+    async def run():
+        async with session_maker() as db:
+            for index, sample in enumerate(fleet.samples):
+                await monitoring_service._process_alarms(db, index + 1, None, sample["cdu_status"])
+            await db.commit()
+
+    # First pass creates the alerts; timed passes measure the steady state of re-checking them
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run()
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[Fleet], Awaitable[Callable[[], Awaitable[None]]]]] = {
+    "parse_cdu": bench_parse_cdu,
+    "parse_pumps": bench_parse_pumps,
+    "orm_response": bench_orm_response,
+    "raw_data_json": bench_raw_data,
+    "ws_encode": bench_ws_encode,
+    "alarms": bench_alarms
+}
+
+
+async def time_benchmark(run: Callable[[], Awaitable[None]], min_rounds: int, min_seconds: float) -> List[float]:
+    """Round times in seconds; runs at least min_rounds and at least min_seconds in total"""
+    await run()  # warm-up
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_rounds or time.perf_counter() - started < min_seconds:
+        start = time.perf_counter()
+        await run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+async def run_benchmarks(names: List[str], sizes: List[int], min_rounds: int, min_seconds: float) -> Dict[str, dict]:
+    results = {}
+    for size in sizes:
+        fleet = Fleet(size)
+        await fleet.parse()
+        for name in names:
+            times = await time_benchmark(await BENCHMARKS[name](fleet), min_rounds, min_seconds)
+            median = statistics.median(times)
+            results[f"{name}[{size}]"] = {
+                "median_ms": round(median * 1000, 4),
+                "min_ms": round(min(times) * 1000, 4),
+                "per_device_us": round(median / size * 1e6, 3),
+                "rounds": len(times)
+            }
+            print(f"{name}[{size}]".ljust(24) + f"{median * 1000:10.3f} ms  {median / size * 1e6:9.2f} us/device", file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Names of benchmarks whose median regressed by more than threshold"""
+    regressions = []
+    print("\nComparison with baseline:", file=sys.stderr)
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"  {name.ljust(24)} (no baseline)", file=sys.stderr)
+            continue
+        change = result["median_ms"] / previous["median_ms"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"  {name.ljust(24)} {change * 100:+7.1f}%  {flag}", file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the polling hot paths")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only this benchmark (repeatable)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(FLEET_SIZES), help="fleet sizes")
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="minimum timed seconds per benchmark")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    results = asyncio.run(run_benchmarks(names, args.sizes, args.min_rounds, args.min_seconds))
+    report = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        # Keep entries for benchmarks that were not part of this run
+        baseline: Dict[str, dict] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        report["results"] = baseline
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\n[OK] Baseline saved to {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n[WARNING] No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+        return
+
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    if stored.get("machine") != platform.node():
+        print(
+            f"\n[WARNING] Baseline was recorded on {stored.get('machine')!r}, not {platform.node()!r}; "
+            "differences may come from the machine rather than the code",
+            file=sys.stderr
+        )
+    baseline_results = stored.get("results", {})
+    regressions = compare(results, baseline_results, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n✅ No regressions over {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""End-to-end poll-cycle benchmark
+
+Seeds N heat exchangers pointed at the R-SCM simulator, runs M full polling cycles
+(Redfish requests, alarm processing, database writes, live updates) and prints a JSON
+report so runs can be compared over time:
+
+    python benchmark_poll.py --devices 500 --cycles 5 --latency-ms 40 --output results/poll-500.json
+
+The simulator runs in its own process so its CPU time does not count against the
+poller. Pass --simulator-port to use one that is already running instead.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add app directory to path
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+
+def percentiles(values: List[float], scale: float = 1.0) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max/mean of a sample (nearest-rank)"""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {
+        "p50": round(rank(50) * scale, 3),
+        "p95": round(rank(95) * scale, 3),
+        "p99": round(rank(99) * scale, 3),
+        "max": round(ordered[-1] * scale, 3),
+        "mean": round(sum(ordered) / len(ordered) * scale, 3)
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps for a fixed interval"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+
+class DbTimer:
+    """Statement time from SQLAlchemy cursor events, commit time from AsyncSession.commit"""
+
+    def __init__(self):
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.commit_seconds: List[float] = []
+
+    def attach(self, engine):
+        from sqlalchemy import event
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("benchmark_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            self.statements += 1
+            self.statement_seconds += time.perf_counter() - conn.info["benchmark_start"].pop()
+
+        commit = AsyncSession.commit
+
+        async def timed_commit(session):
+            start = time.perf_counter()
+            try:
+                return await commit(session)
+            finally:
+                self.commit_seconds.append(time.perf_counter() - start)
+
+        AsyncSession.commit = timed_commit
+
+
+class RequestCounter:
+    """Counts Redfish HTTP requests sent by the poller"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def attach(self):
+        import httpx
+        send = httpx.AsyncClient.send
+
+        async def counted_send(client, request, **kwargs):
+            self.requests += 1
+            return await send(client, request, **kwargs)
+
+        httpx.AsyncClient.send = counted_send
+
+
+def wait_for_port(host: str, port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Simulator did not start listening on {host}:{port}")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode("utf-8").strip()
+    except Exception:
+        return None
+
+
+async def seed(devices: List[str]):
+    """Create the heat exchangers and settings the poller needs"""
+    from app.database import async_session_maker as session_maker
+    from app.models.heat_exchanger import HeatExchanger
+    from app.models.settings import SystemSettings
+
+    async with session_maker() as db:
+        db.add(SystemSettings(monitoring_enabled=True))
+        for index, address in enumerate(devices):
+            db.add(HeatExchanger(
+                name=f"bench-{index:05d}",
+                rscm_ip=address,
+                city="Benchmark",
+                building="B1",
+                room=f"R{index // 100}",
+                tile=f"T{index % 100}",
+                is_active=True
+            ))
+        await db.commit()
+
+
+async def count_rows() -> int:
+    from sqlalchemy import select, func
+    from app.database import async_session_maker as session_maker
+    from app.models.monitoring_data import MonitoringData
+    from app.models.alert import Alert
+
+    async with session_maker() as db:
+        monitoring = (await db.execute(select(func.count()).select_from(MonitoringData))).scalar()
+        alerts = (await db.execute(select(func.count()).select_from(Alert))).scalar()
+    return monitoring + alerts
+
+
+async def create_database():
+    """Create the engine and tables the poller uses, without init_db's default admin user
+
+    Any failure here ends the benchmark: numbers from a half-created database are meaningless.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app import database
+    from app.config import settings
+    # Register every model with Base before create_all
+    from app.models import alert, heat_exchanger, monitoring_data, poller_lease, program, settings as system_settings, user  # noqa: F401
+
+    database.engine = create_async_engine(settings.database_url, future=True)
+    database.async_session_maker = async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    import rscm_simulator
+    from app import database
+    from app.services.monitoring_service import monitoring_service
+    from app.services.redfish_client import redfish_sessions
+
+    await create_database()
+
+    db_timer = DbTimer()
+    db_timer.attach(database.engine)
+    counter = RequestCounter()
+    counter.attach()
+
+    devices = rscm_simulator.device_addresses(args.devices, args.host_base, args.port_mode, args.base_port)
+    await seed(devices)
+
+    lag = LoopLagMonitor()
+    lag.start()
+    rows_before = await count_rows()
+    cycle_seconds = []
+
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    started = time.perf_counter()
+    for cycle in range(args.cycles):
+        cycle_start = time.perf_counter()
+        with quiet:
+            await monitoring_service.poll_all_heat_exchangers()
+        cycle_seconds.append(time.perf_counter() - cycle_start)
+        print(f"Cycle {cycle + 1}/{args.cycles}: {cycle_seconds[-1]:.2f}s", file=sys.stderr)
+    elapsed = time.perf_counter() - started
+
+    lag.stop()
+    rows_written = await count_rows() - rows_before
+    await redfish_sessions.close()
+    await database.close_db()
+
+    return {
+        "benchmark": "poll_cycle",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "devices": args.devices,
+            "cycles": args.cycles,
+            "latency_ms": args.latency_ms,
+            "latency_dist": args.latency_dist,
+            "error_rate": args.error_rate,
+            "timeout_rate": args.timeout_rate
+        },
+        "cycle_seconds": percentiles(cycle_seconds),
+        "cycles": [round(seconds, 3) for seconds in cycle_seconds],
+        "requests": counter.requests,
+        "requests_per_second": round(counter.requests / elapsed, 1) if elapsed else None,
+        "db": {
+            "statements": db_timer.statements,
+            "statement_seconds_total": round(db_timer.statement_seconds, 3),
+            "commits": len(db_timer.commit_seconds),
+            "commit_ms": percentiles(db_timer.commit_seconds, 1000),
+            "commit_seconds_total": round(sum(db_timer.commit_seconds), 3)
+        },
+        "rows_written": rows_written,
+        "rows_per_second": round(rows_written / elapsed, 1) if elapsed else None,
+        "loop_lag_ms": percentiles(lag.samples, 1000),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark full polling cycles against the R-SCM simulator")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-dist", default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--host-base", default="127.0.1.1")
+    parser.add_argument("--port-mode", action="store_true")
+    parser.add_argument("--base-port", type=int, default=9000)
+    parser.add_argument("--simulator-port", type=int, default=None,
+                        help="use a simulator already listening on this port instead of starting one")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="write the JSON report to this file as well")
+    parser.add_argument("--verbose", action="store_true", help="show poller output")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    port = args.simulator_port or 18080
+    workdir = tempfile.mkdtemp(prefix="cooling-bench-")
+
+    # Configure the app before it is imported
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ["DEBUG"] = "false"
+    os.environ["REDFISH_SCHEME"] = "http"
+    os.environ["REDFISH_PORT"] = str(port)
+    os.environ["REDFISH_EVENT_PUSH"] = "false"
+    # Per-device log lines would skew the timings; --verbose shows them on stderr
+    os.environ["LOG_LEVEL"] = "INFO" if args.verbose else "ERROR"
+
+    simulator = None
+    if args.simulator_port is None:
+        command = [
+            sys.executable, os.path.join(BASE_DIR, "rscm_simulator.py"),
+            "--devices", str(args.devices),
+            "--port", str(port),
+            "--latency-ms", str(args.latency_ms),
+            "--latency-dist", args.latency_dist,
+            "--error-rate", str(args.error_rate),
+            "--timeout-rate", str(args.timeout_rate),
+            "--host-base", args.host_base,
+            "--base-port", str(args.base_port),
+            "--seed", "1"
+        ]
+        if args.port_mode:
+            command.append("--port-mode")
+        simulator = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        probe = ("127.0.0.1", args.base_port) if args.port_mode else ("127.0.0.1", port)
+        wait_for_port(*probe)
+
+    try:
+        # Only the JSON report goes to stdout; app startup/shutdown messages go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            report = asyncio.run(run_benchmark(args))
+    finally:
+        if simulator is not None:
+            simulator.terminate()
+            simulator.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""Synthetic history generator for API load testing
+
+Bulk-loads a database with a fleet of heat exchangers and realistic monitoring, pump
+and alert history, so the read endpoints can be load-tested at production scale
+(see load_test_api.py):
+
+    python generate_history.py --database-url sqlite+aiosqlite:///./loadtest.db --username loadtest --devices 1000 --days 30
+
+Each monitoring row carries the same raw_data JSON (CDU, fan and pump status) the poller
+stores. Rows go in through executemany inserts of --batch-size rows, and each day of
+history is committed separately. Also creates an active admin user for the load driver
+with --username and the password from --password, LOAD_TEST_PASSWORD or a prompt.
+
+The target database must be a separate one: the app's configured DATABASE_URL is refused.
+Generated heat exchangers are inactive and use 198.18.0.0/15 (reserved for benchmarking)
+addresses, so a poller pointed at the database never contacts them.
+"""
+import argparse
+import asyncio
+import getpass
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic monitoring and alert history")
+    parser.add_argument("--database-url", required=True, help="load-test database (not the app's DATABASE_URL)")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval-seconds", type=int, default=30, help="sample interval per device")
+    parser.add_argument("--alerts-per-device-per-day", type=float, default=2.0)
+    parser.add_argument("--open-alert-fraction", type=float, default=0.05, help="share of alerts left unresolved")
+    parser.add_argument("--pumps", type=int, default=3)
+    parser.add_argument("--fans", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--username", required=True, help="admin user to create for load_test_api.py")
+    parser.add_argument("--password", default=os.environ.get("LOAD_TEST_PASSWORD"),
+                        help="defaults to LOAD_TEST_PASSWORD, otherwise prompted for")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+ALERT_TYPES = (
+    # type, severity, title, description
+    ("CRITICAL_LOW_FLOW", "critical", "Critical Low Flow - Pump {pump}", "Pump {pump} flow rate {flow:.1f} L/min is below the critical threshold"),
+    ("LEAK_ALARM", "warning", "Leak Detection - LeakSensor{sensor}", "Leak sensor alarm detected: LeakSensor{sensor}"),
+    ("FAN_ALARM", "warning", "Fan Alarm - Fan{fan}Failure", "Fan system alarm detected: Fan{fan}Failure"),
+    ("PUMP_ALARM", "warning", "Pump Alarm - Pump{pump}Failure", "Pump system alarm detected: Pump{pump}Failure"),
+    ("SENSOR_ALARM", "warning", "Sensor Alarm - SupplyTemperatureHigh", "Sensor alarm detected: SupplyTemperatureHigh"),
+)
+
+
+class HistoryGenerator:
+    # Distinct fan/pump readings to draw from; rendering fresh JSON for every row would
+    # make the generator, not the database, the bottleneck
+    FRAGMENT_POOL_SIZE = 512
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.fragments = [self._status_fragment() for _ in range(self.FRAGMENT_POOL_SIZE)]
+
+    def _status_fragment(self) -> str:
+        rng = self.rng
+        return json.dumps({
+            "fan_status": [
+                {"id": str(n), "name": f"Fan {n}", "state": "Enabled", "health": "OK",
+                 "speed_percent": round(60 + rng.gauss(0, 3), 1)}
+                for n in range(1, self.args.fans + 1)
+            ],
+            "pump_status": [
+                {"id": str(n), "name": f"Pump {n}", "status": "Running",
+                 "speed": round(70 + rng.gauss(0, 2), 1), "requested_speed": 70,
+                 "flow_liquid": round(45 + rng.gauss(0, 1.5), 2),
+                 "pressure_supply": round(2.1 + rng.gauss(0, 0.05), 2),
+                 "pressure_return": round(1.4 + rng.gauss(0, 0.05), 2),
+                 "pressure_diff": 0.7, "error_code": 0, "liquid_ph": 7.2}
+                for n in range(1, self.args.pumps + 1)
+            ]
+        }, separators=(",", ":"))[1:-1]
+
+    def raw_data(self, temperature: float, humidity: float) -> str:
+        """raw_data JSON in the shape MonitoringService.build_monitoring_record stores"""
+        return (
+            '{"cdu_status":{"chassis_status":{"state":"Enabled","health":"OK"},'
+            f'"controller_status":{{"AmbientTemperature":{temperature},"AmbientHumidity":{humidity},"State":"Running"}},'
+            '"fan_alarms":{"Alarms":{}},"pump_alarms":{"Alarms":{}},"sensor_alarms":{"Alarms":[]},"leak_alarms":{"Alarms":[]}},'
+            + self.fragments[self.rng.randrange(self.FRAGMENT_POOL_SIZE)] + "}"
+        )
+
+    def monitoring_rows(self, heat_exchanger_ids: List[int], day_start: datetime, day_end: datetime):
+        """Rows for one day, interleaved across devices like a live poller writes them"""
+        interval = timedelta(seconds=self.args.interval_seconds)
+        rng = self.rng
+        # Per-device baseline so devices differ but drift slowly
+        baselines = {hid: (24 + rng.gauss(0, 2), 40 + rng.gauss(0, 5)) for hid in heat_exchanger_ids}
+        timestamp = day_start
+        while timestamp < day_end:
+            for hid in heat_exchanger_ids:
+                base_temp, base_humidity = baselines[hid]
+                temperature = round(base_temp + rng.gauss(0, 0.5), 1)
+                humidity = round(base_humidity + rng.gauss(0, 1.0), 1)
+                yield {
+                    "heat_exchanger_id": hid,
+                    # Spread devices across the interval instead of one burst per tick
+                    "timestamp": timestamp + timedelta(seconds=rng.random() * self.args.interval_seconds),
+                    "temperature": temperature,
+                    "fan_speed": 0,
+                    "power_consumption": 0.0,
+                    "humidity": humidity,
+                    "status": "Enabled",
+                    "ambient_temperature": temperature,
+                    "ambient_humidity": humidity,
+                    "raw_data": self.raw_data(temperature, humidity)
+                }
+            timestamp += interval
+
+    def alert_rows(self, heat_exchanger_ids: List[int], start: datetime, end: datetime) -> List[Dict]:
+        rng = self.rng
+        span = (end - start).total_seconds()
+        count = int(len(heat_exchanger_ids) * self.args.alerts_per_device_per_day * span / 86400)
+        rows = []
+        for _ in range(count):
+            kind, severity, title, description = rng.choice(ALERT_TYPES)
+            values = {"pump": rng.randint(1, self.args.pumps), "fan": rng.randint(1, self.args.fans),
+                      "sensor": rng.randint(1, 4), "flow": rng.uniform(1, 9)}
+            created_at = start + timedelta(seconds=rng.random() * span)
+            resolved = rng.random() >= self.args.open_alert_fraction
+            acknowledged = resolved or rng.random() < 0.5
+            rows.append({
+                "heat_exchanger_id": rng.choice(heat_exchanger_ids),
+                "type": kind,
+                "severity": severity,
+                "title": title.format(**values),
+                "description": description.format(**values),
+                "pump_id": str(values["pump"]) if kind in ("CRITICAL_LOW_FLOW", "PUMP_ALARM") else None,
+                "pump_name": f"Pump {values['pump']}" if kind in ("CRITICAL_LOW_FLOW", "PUMP_ALARM") else None,
+                "flow_rate": round(values["flow"], 1) if kind == "CRITICAL_LOW_FLOW" else None,
+                "threshold": 10.0 if kind == "CRITICAL_LOW_FLOW" else None,
+                "acknowledged": acknowledged,
+                "resolved": resolved,
+                "acknowledged_by": self.args.username if acknowledged else None,
+                "resolved_by": self.args.username if resolved else None,
+                "comments": None,
+                "created_at": created_at,
+                "acknowledged_at": created_at + timedelta(minutes=rng.uniform(1, 60)) if acknowledged else None,
+                "resolved_at": created_at + timedelta(hours=rng.uniform(0.5, 12)) if resolved else None
+            })
+        return rows
+
+
+def same_database(url: str, other: str) -> bool:
+    """Whether two database URLs point at the same database (SQLite paths are resolved)"""
+    from sqlalchemy.engine import make_url
+    first, second = make_url(url), make_url(other)
+    if first.get_backend_name() == "sqlite" and second.get_backend_name() == "sqlite":
+        return os.path.realpath(first.database or "") == os.path.realpath(second.database or "")
+    return first.set(drivername=first.get_backend_name()) == second.set(drivername=second.get_backend_name())
+
+
+async def create_database(database_url: str):
+    """Engine for the load-test database with every table created; any failure ends the run"""
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.database import Base
+    # Register every model with Base before create_all
+    from app.models import alert, heat_exchanger, monitoring_data, poller_lease, program, settings, user  # noqa: F401
+
+    engine = create_async_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def bulk_load_pragmas(dbapi_connection, connection_record):
+            # Per-connection bulk-load settings: nothing is changed in the database file itself,
+            # so the app's own connections keep their normal journal and durability
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def generate(args: argparse.Namespace):
+    from sqlalchemy import insert, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+    from app.models.heat_exchanger import HeatExchanger
+    from app.models.monitoring_data import MonitoringData
+    from app.models.alert import Alert
+    from app.models.settings import SystemSettings
+    from app.models.user import User
+
+    engine = await create_database(args.database_url)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    generator = HistoryGenerator(args)
+
+    async with session_maker() as db:
+        if (await db.execute(select(SystemSettings).limit(1))).scalar_one_or_none() is None:
+            db.add(SystemSettings())
+        if (await db.execute(select(User).where(User.username == args.username))).scalar_one_or_none() is None:
+            db.add(User(
+                username=args.username,
+                email=f"{args.username}@example.com",
+                hashed_password=User.hash_password(args.password),
+                first_name="Load",
+                last_name="Test",
+                is_admin=1,
+                is_active=1
+            ))
+        existing = (await db.execute(
+            select(HeatExchanger.id).where(HeatExchanger.name.like("loadtest-%")).order_by(HeatExchanger.id)
+        )).scalars().all()
+        for index in range(len(existing), args.devices):
+            db.add(HeatExchanger(
+                name=f"loadtest-{index:05d}",
+                rscm_ip=f"198.{18 + index // 65536 % 2}.{index // 256 % 256}.{index % 256}",
+                city=generator.rng.choice(("Seattle", "Dublin", "Singapore", "Amsterdam")),
+                building=f"B{index // 500 + 1}",
+                room=f"R{index // 50 % 10 + 1}",
+                tile=f"T{index % 50 + 1}",
+                is_active=False
+            ))
+        await db.commit()
+        heat_exchanger_ids = (await db.execute(
+            select(HeatExchanger.id).where(HeatExchanger.name.like("loadtest-%")).order_by(HeatExchanger.id)
+        )).scalars().all()[:args.devices]
+
+    end = datetime.utcnow()
+    start = end - timedelta(days=args.days)
+    total_days = max(1, int(args.days + 0.999))
+    rows_per_day = len(heat_exchanger_ids) * 86400 // args.interval_seconds
+    print(f"Generating ~{int(rows_per_day * args.days):,} monitoring rows for {len(heat_exchanger_ids)} heat exchangers "
+          f"over {args.days} days ({args.interval_seconds}s interval)")
+
+    started = time.perf_counter()
+    monitoring_total = 0
+    alert_total = 0
+    for day in range(total_days):
+        day_start = start + timedelta(days=day)
+        day_end = min(day_start + timedelta(days=1), end)
+        batch = []
+        async with engine.begin() as conn:
+            for row in generator.monitoring_rows(heat_exchanger_ids, day_start, day_end):
+                batch.append(row)
+                if len(batch) >= args.batch_size:
+                    await conn.execute(insert(MonitoringData), batch)
+                    monitoring_total += len(batch)
+                    batch = []
+            if batch:
+                await conn.execute(insert(MonitoringData), batch)
+                monitoring_total += len(batch)
+            alerts = generator.alert_rows(heat_exchanger_ids, day_start, day_end)
+            for i in range(0, len(alerts), args.batch_size):
+                await conn.execute(insert(Alert), alerts[i:i + args.batch_size])
+            alert_total += len(alerts)
+        elapsed = time.perf_counter() - started
+        print(f"  day {day + 1}/{total_days}: {monitoring_total:,} monitoring rows, {alert_total:,} alerts "
+              f"({monitoring_total / elapsed:,.0f} rows/s)")
+
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("ANALYZE")
+
+    await engine.dispose()
+    print(f"✅ Inserted {monitoring_total:,} monitoring rows and {alert_total:,} alerts in {time.perf_counter() - started:.1f}s")
+    print(f"   Load driver login: {args.username}")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    from app.config import settings
+    if same_database(args.database_url, settings.database_url):
+        print(f"❌ {args.database_url} is the app's DATABASE_URL; generate into a separate load-test database")
+        sys.exit(1)
+    if not args.password:
+        args.password = getpass.getpass(f"Password for {args.username}: ")
+    try:
+        asyncio.run(generate(args))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Generation cancelled; committed days are kept")
+        sys.exit(1)
@@ -0,0 +1,190 @@
+"""Read-endpoint load driver
+
+Hammers the dashboard's read endpoints on a running server and reports latency
+percentiles per endpoint, to catch slow queries and query-plan regressions on a
+large database before deploy (load one with generate_history.py first):
+
+    python load_test_api.py http://localhost:8000 --username loadtest --duration 30 --concurrency 20
+    python load_test_api.py http://localhost:8000 --username loadtest --only latest --only alert_count --output results/api.json
+
+Logs in with --username (the user created by generate_history.py) and the password from
+--password, LOAD_TEST_PASSWORD or a prompt, because the alert endpoints require a session.
+"""
+import argparse
+import asyncio
+import getpass
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max/mean in milliseconds (nearest-rank)"""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+    return {
+        "p50": round(rank(50) * 1000, 2),
+        "p95": round(rank(95) * 1000, 2),
+        "p99": round(rank(99) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2)
+    }
+
+
+def endpoints(heat_exchanger_ids: List[int]) -> Dict[str, Callable[[], str]]:
+    """Endpoint name -> function returning the next URL path to request"""
+    def pick() -> int:
+        return random.choice(heat_exchanger_ids)
+
+    return {
+        "heat_exchangers": lambda: "/api/heat-exchangers/",
+        "latest": lambda: "/api/monitoring/latest",
+        "history": lambda: f"/api/monitoring/{pick()}?limit=100",
+        "statistics": lambda: f"/api/monitoring/{pick()}/statistics?hours={random.choice((1, 24, 168))}",
+        "alerts": lambda: "/api/alerts/?limit=100",
+        "alerts_open": lambda: "/api/alerts/?resolved=false&limit=100",
+        "alerts_device": lambda: f"/api/alerts/?heat_exchanger_id={pick()}&limit=100",
+        "alert_count": lambda: "/api/alerts/count",
+        "alert_count_open": lambda: "/api/alerts/count?resolved=false"
+    }
+
+
+class EndpointResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_codes: Dict[int, int] = {}
+        self.bytes = 0
+
+
+async def run_endpoint(client: httpx.AsyncClient, next_path: Callable[[], str], duration: float,
+                       concurrency: int, max_requests: Optional[int]) -> EndpointResult:
+    """Closed-loop load: `concurrency` workers each send one request at a time"""
+    result = EndpointResult()
+    deadline = time.perf_counter() + duration
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(next_path())
+                elapsed = time.perf_counter() - start
+                result.status_codes[response.status_code] = result.status_codes.get(response.status_code, 0) + 1
+                if response.status_code >= 400:
+                    result.errors += 1
+                else:
+                    result.latencies.append(elapsed)
+                    result.bytes += len(response.content)
+            except httpx.HTTPError:
+                result.errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result
+
+
+async def load_test(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=args.timeout, limits=limits, verify=False) as client:
+        response = await client.post("/api/auth/login", json={"username": args.username, "password": args.password})
+        if response.status_code != 200:
+            raise SystemExit(f"❌ Login failed ({response.status_code}): {response.text}")
+
+        response = await client.get("/api/heat-exchangers/")
+        response.raise_for_status()
+        heat_exchanger_ids = [he["id"] for he in response.json()]
+        if not heat_exchanger_ids:
+            raise SystemExit("❌ No heat exchangers on the server; run generate_history.py first")
+
+        targets = endpoints(heat_exchanger_ids)
+        names = args.only or list(targets)
+        results = {}
+        for name in names:
+            # One warm-up request so connection setup and cold caches are not measured
+            await client.get(targets[name]())
+            started = time.perf_counter()
+            result = await run_endpoint(client, targets[name], args.duration, args.concurrency, args.requests)
+            elapsed = time.perf_counter() - started
+            completed = len(result.latencies)
+            results[name] = {
+                "requests": completed + result.errors,
+                "errors": result.errors,
+                "status_codes": {str(code): count for code, count in sorted(result.status_codes.items())},
+                "requests_per_second": round(completed / elapsed, 1) if elapsed else None,
+                "latency_ms": percentiles(result.latencies),
+                "avg_response_kb": round(result.bytes / completed / 1024, 1) if completed else None
+            }
+            latency = results[name]["latency_ms"]
+            print(f"{name.ljust(18)} {results[name]['requests_per_second'] or 0:8.1f} req/s  "
+                  f"p50 {latency['p50'] or 0:8.1f} ms  p95 {latency['p95'] or 0:8.1f} ms  "
+                  f"p99 {latency['p99'] or 0:8.1f} ms  errors {result.errors}", file=sys.stderr)
+
+    return {
+        "benchmark": "read_endpoints",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_revision": git_revision(),
+        "url": args.url,
+        "heat_exchangers": len(heat_exchanger_ids),
+        "config": {"duration": args.duration, "concurrency": args.concurrency, "requests": args.requests},
+        "endpoints": results
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode("utf-8").strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure read-endpoint latency percentiles on a running server")
+    parser.add_argument("url", nargs="?", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", default=os.environ.get("LOAD_TEST_PASSWORD"),
+                        help="defaults to LOAD_TEST_PASSWORD, otherwise prompted for")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--requests", type=int, default=None, help="stop an endpoint after this many requests")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--only", action="append", choices=sorted(endpoints([0])), help="endpoint to test (repeatable)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report to this file as well")
+    args = parser.parse_args()
+    if not args.password:
+        args.password = getpass.getpass(f"Password for {args.username}: ")
+    random.seed(args.seed)
+
+    try:
+        report = asyncio.run(load_test(args))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Load test cancelled by user")
+        sys.exit(1)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == '__main__':
+    main()
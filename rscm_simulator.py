@@ -0,0 +1,436 @@
+"""Simulated R-SCM fleet for load and scale testing
+
+Serves the Redfish resources the poller reads (RackManager, Chassis/CDU, the Fans and
+Pumps collections, pump DeviceStatus) plus SessionService and EventService for any
+number of fake devices from one process.
+
+Devices are addressed either by IP (default: one listener on 0.0.0.0:<port>, each
+device on its own loopback address 127.0.1.1, 127.0.1.2, ... which Linux routes
+without any setup) or by port (--port-mode: 127.0.0.1:9000, 127.0.0.1:9001, ...).
+
+    python rscm_simulator.py --devices 1000 --latency-ms 40 --latency-dist lognormal --error-rate 0.01
+    python rscm_simulator.py --devices 50 --port-mode --base-port 9000 --scenario scenarios.json
+
+Point the poller at it with REDFISH_SCHEME=http (or pass --certfile/--keyfile) and use
+the printed addresses as the heat exchangers' R-SCM IPs.
+
+Scenario file (times in seconds since start, "device" is an index or "*"):
+
+    {"events": [
+        {"device": 3, "start": 30, "duration": 60, "type": "low_flow", "pump": 1},
+        {"device": "*", "start": 120, "duration": 10, "type": "offline"}
+    ]}
+
+Event types: low_flow, leak, fan_alarm, pump_alarm, sensor_alarm, offline.
+"""
+import argparse
+import asyncio
+import hashlib
+import ipaddress
+import json
+import math
+import random
+import ssl
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+
+SCENARIO_TYPES = ("low_flow", "leak", "fan_alarm", "pump_alarm", "sensor_alarm", "offline")
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+           401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+class SimulatedDevice:
+    """State of one fake R-SCM"""
+
+    def __init__(self, index: int, address: str, rng: random.Random, fans: int, pumps: int, has_pumps: bool):
+        self.index = index
+        self.address = address
+        self.rng = rng
+        self.fans = fans
+        self.pumps = pumps
+        self.has_pumps = has_pumps
+        self.booted_at = time.time()
+        self.firmware_version = "1.2.3"
+        self.sessions: Dict[str, str] = {}
+        self.subscriptions: Dict[str, dict] = {}
+        self.active_scenarios: List[dict] = []
+
+    def _active(self, kind: str) -> List[dict]:
+        return [scenario for scenario in self.active_scenarios if scenario["type"] == kind]
+
+    @property
+    def offline(self) -> bool:
+        return bool(self._active("offline"))
+
+    def manager(self) -> dict:
+        return {
+            "@odata.id": "/redfish/v1/Managers/RackManager",
+            "Id": "RackManager",
+            "ManagerType": "RackManager",
+            "Model": "R-SCM Simulator",
+            "FirmwareVersion": self.firmware_version,
+            "Status": {"State": "Enabled", "Health": "OK"},
+            "Oem": {"Microsoft": {
+                "HostName": f"sim-rscm-{self.index:05d}",
+                "UniqueId": f"SIM{self.index:08d}",
+                "TimeSinceLastBoot": str(int(time.time() - self.booted_at))
+            }}
+        }
+
+    def cdu(self) -> dict:
+        leak = self._active("leak")
+        sensor = self._active("sensor_alarm")
+        fan = self._active("fan_alarm")
+        pump = self._active("pump_alarm")
+        return {
+            "@odata.id": "/redfish/v1/Chassis/CDU",
+            "Id": "CDU",
+            "Status": {"State": "Enabled", "Health": "Critical" if leak else "OK"},
+            "Oem": {"Microsoft": {
+                "ControllerStatus": [{
+                    "AmbientTemperature": round(24 + self.rng.gauss(0, 0.5), 1),
+                    "AmbientHumidity": round(40 + self.rng.gauss(0, 1.0), 1),
+                    "State": "Running"
+                }],
+                "FanAlarms": {"Alarms": {f"Fan{s.get('fan', 1)}Failure": True for s in fan}},
+                "PumpAlarms": {"Alarms": {f"Pump{s.get('pump', 1)}Failure": True for s in pump}},
+                "SensorAlarms": {"Alarms": [s.get("sensor", "SupplyTemperatureHigh") for s in sensor]},
+                "LeakAlarms": {"Alarms": [s.get("sensor", "LeakSensor1") for s in leak]}
+            }}
+        }
+
+    def fan_collection(self) -> dict:
+        return {
+            "@odata.id": "/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans",
+            "Members": [{"@odata.id": f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}"} for n in range(1, self.fans + 1)]
+        }
+
+    def fan(self, n: int) -> dict:
+        failed = any(s.get("fan", 1) == n for s in self._active("fan_alarm"))
+        return {
+            "@odata.id": f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}",
+            "Id": str(n),
+            "Name": f"Fan {n}",
+            "Status": {"State": "Enabled", "Health": "Critical" if failed else "OK"},
+            "SpeedPercent": {"Reading": 0 if failed else round(60 + self.rng.gauss(0, 3), 1)}
+        }
+
+    def pump_collection(self) -> dict:
+        return {
+            "@odata.id": "/redfish/v1/ThermalEquipment/CDUs/1/Pumps",
+            "Members": [{"@odata.id": f"/redfish/v1/ThermalEquipment/CDUs/1/Pumps/{n}"} for n in range(1, self.pumps + 1)]
+        }
+
+    def pump_status(self, n: int) -> dict:
+        low_flow = [s for s in self._active("low_flow") if s.get("pump", 1) == n]
+        flow = low_flow[0].get("flow", 4.0) if low_flow else 45 + self.rng.gauss(0, 1.5)
+        return {
+            "PumpStatus": "Running",
+            "Speed": round(70 + self.rng.gauss(0, 2), 1),
+            "RequestedPumpSpeed": 70,
+            "FlowLiquid": round(flow, 2),
+            "PressureLiquidSupply": round(2.1 + self.rng.gauss(0, 0.05), 2),
+            "PressureLiquidReturn": round(1.4 + self.rng.gauss(0, 0.05), 2),
+            "PressureDiffLiquidSupplyReturn": 0.7,
+            "ErrorCode": 0,
+            "LiquidPHValue": 7.2
+        }
+
+
+class Simulator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.devices: Dict[str, SimulatedDevice] = {}
+        self.scenarios: List[dict] = []
+        self.started_at = time.monotonic()
+        self.servers: List[asyncio.AbstractServer] = []
+        self.requests = 0
+        self.event_client: Optional[httpx.AsyncClient] = None
+
+        for index, address in enumerate(device_addresses(args.devices, args.host_base, args.port_mode, args.base_port)):
+            self.devices[address] = SimulatedDevice(
+                index,
+                address,
+                random.Random(self.rng.random()),
+                fans=args.fans,
+                pumps=args.pumps,
+                has_pumps=self.rng.random() >= args.missing_pumps_fraction
+            )
+        if args.scenario:
+            with open(args.scenario) as f:
+                self.scenarios = json.load(f).get("events", [])
+
+    # Request handling
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering, from the configured distribution"""
+        mean = self.args.latency_ms / 1000.0
+        if mean <= 0:
+            return 0.0
+        dist = self.args.latency_dist
+        if dist == "uniform":
+            return self.rng.uniform(0, 2 * mean)
+        if dist == "exponential":
+            return self.rng.expovariate(1 / mean)
+        if dist == "lognormal":
+            sigma = 0.6
+            return self.rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+    def route(self, device: SimulatedDevice, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Optional[dict], Dict[str, str]]:
+        """Status, JSON body and extra headers for one Redfish request"""
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+
+        if path == "/redfish/v1/SessionService/Sessions" and method == "POST":
+            token = uuid.uuid4().hex
+            session_id = str(len(device.sessions) + 1)
+            device.sessions[session_id] = token
+            return 201, {"Id": session_id}, {
+                "X-Auth-Token": token,
+                "Location": f"/redfish/v1/SessionService/Sessions/{session_id}"
+            }
+        if path.startswith("/redfish/v1/SessionService/Sessions/") and method == "DELETE":
+            device.sessions.pop(path.rsplit("/", 1)[-1], None)
+            return 204, None, {}
+
+        # Auth: a valid session token or any Basic credentials
+        token = headers.get("x-auth-token")
+        if token is not None and token not in device.sessions.values():
+            return 401, {"error": "invalid session"}, {}
+        if token is None and "authorization" not in headers:
+            return 401, {"error": "authentication required"}, {}
+
+        if path == "/redfish/v1/EventService/Subscriptions":
+            if method == "POST":
+                subscription_id = str(len(device.subscriptions) + 1)
+                device.subscriptions[subscription_id] = json.loads(body or b"{}")
+                return 201, {"Id": subscription_id}, {"Location": f"{path}/{subscription_id}"}
+            return 200, {"Members": [{"@odata.id": f"{path}/{i}"} for i in device.subscriptions]}, {}
+        if path.startswith("/redfish/v1/EventService/Subscriptions/"):
+            subscription_id = path.rsplit("/", 1)[-1]
+            if method == "DELETE":
+                device.subscriptions.pop(subscription_id, None)
+                return 204, None, {}
+            subscription = device.subscriptions.get(subscription_id)
+            return (200, {"Id": subscription_id, **subscription}, {}) if subscription else (404, None, {})
+
+        if method != "GET":
+            return 405, None, {}
+
+        parts = path.split("/")
+        if path == "/redfish/v1":
+            return 200, {"@odata.id": "/redfish/v1", "RedfishVersion": "1.15.0", "Name": "R-SCM Simulator"}, {}
+        if path == "/redfish/v1/Managers/RackManager":
+            return 200, device.manager(), {}
+        if path == "/redfish/v1/Chassis/CDU":
+            return 200, device.cdu(), {}
+        if path == "/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans":
+            return 200, device.fan_collection(), {}
+        if path.startswith("/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/") and parts[-1].isdigit():
+            n = int(parts[-1])
+            return (200, device.fan(n), {}) if 1 <= n <= device.fans else (404, None, {})
+        if path.startswith("/redfish/v1/ThermalEquipment/CDUs/1/Pumps") and not device.has_pumps:
+            return 404, None, {}
+        if path == "/redfish/v1/ThermalEquipment/CDUs/1/Pumps":
+            return 200, device.pump_collection(), {}
+        if path.startswith("/redfish/v1/ThermalEquipment/CDUs/1/Pumps/") and path.endswith("/Oem/Microsoft/DeviceStatus"):
+            n = parts[-4]
+            if n.isdigit() and 1 <= int(n) <= device.pumps:
+                return 200, device.pump_status(int(n)), {}
+        return 404, None, {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal HTTP/1.1 server with keep-alive"""
+        sockname = writer.get_extra_info("sockname")
+        key = f"127.0.0.1:{sockname[1]}" if self.args.port_mode else sockname[0]
+        device = self.devices.get(key)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                self.requests += 1
+
+                if device is None or device.offline:
+                    break
+
+                # Injected failures
+                if self.rng.random() < self.args.timeout_rate:
+                    await asyncio.sleep(self.args.timeout_seconds)
+                    break
+                await asyncio.sleep(self.sample_latency())
+                if self.rng.random() < self.args.error_rate:
+                    status, payload, extra = 503, {"error": "simulated failure"}, {}
+                else:
+                    status, payload, extra = self.route(device, method, target, headers, body)
+
+                data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                if status == 200 and method == "GET" and self.args.etags:
+                    # Same content gives the same ETag, so unchanged resources can answer 304
+                    etag = '"' + hashlib.md5(data).hexdigest()[:16] + '"'
+                    extra["ETag"] = etag
+                    if headers.get("if-none-match") == etag:
+                        status, data = 304, b""
+
+                lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}", f"Content-Length: {len(data)}"]
+                if data:
+                    lines.append("Content-Type: application/json")
+                lines += [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # Scenarios and events
+
+    async def run_scenarios(self):
+        """Start and end scripted alarm scenarios, pushing events to subscribers"""
+        pending = sorted(self.scenarios, key=lambda s: s.get("start", 0))
+        active: List[Tuple[float, dict, List[SimulatedDevice]]] = []
+        devices = list(self.devices.values())
+        while pending or active:
+            now = time.monotonic() - self.started_at
+            while pending and pending[0].get("start", 0) <= now:
+                scenario = pending.pop(0)
+                if scenario.get("type") not in SCENARIO_TYPES:
+                    print(f"[WARNING] Unknown scenario type {scenario.get('type')}")
+                    continue
+                targets = devices if scenario.get("device") == "*" else [devices[int(scenario["device"])]]
+                for device in targets:
+                    device.active_scenarios.append(scenario)
+                    await self.push_event(device, scenario, "started")
+                active.append((scenario.get("start", 0) + scenario.get("duration", 60), scenario, targets))
+                print(f"[SCENARIO] {scenario['type']} started on {len(targets)} device(s)")
+            for entry in [entry for entry in active if entry[0] <= now]:
+                active.remove(entry)
+                _, scenario, targets = entry
+                for device in targets:
+                    device.active_scenarios.remove(scenario)
+                    await self.push_event(device, scenario, "cleared")
+                print(f"[SCENARIO] {scenario['type']} cleared on {len(targets)} device(s)")
+            await asyncio.sleep(0.2)
+
+    async def push_event(self, device: SimulatedDevice, scenario: dict, phase: str):
+        """Deliver a Redfish Alert event to every subscription on the device"""
+        if not device.subscriptions or scenario["type"] == "offline":
+            return
+        for subscription in list(device.subscriptions.values()):
+            payload = {
+                "@odata.type": "#Event.v1_7_0.Event",
+                "Id": uuid.uuid4().hex,
+                "Name": "R-SCM Simulator Event",
+                "Context": subscription.get("Context"),
+                "Events": [{
+                    "EventType": "Alert",
+                    "EventId": uuid.uuid4().hex,
+                    "EventTimestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "MessageId": f"CDU.1.0.{scenario['type']}.{phase}",
+                    "MessageSeverity": "Critical" if phase == "started" else "OK",
+                    "Message": f"Simulated {scenario['type']} {phase}",
+                    "OriginOfCondition": {"@odata.id": "/redfish/v1/Chassis/CDU"}
+                }]
+            }
+            try:
+                await self.event_client.post(subscription.get("Destination"), json=payload)
+            except Exception as e:
+                print(f"[WARNING] Event delivery to {subscription.get('Destination')} failed: {e}")
+
+    # Lifecycle
+
+    async def start(self):
+        ssl_context = None
+        if self.args.certfile:
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(self.args.certfile, self.args.keyfile)
+
+        if self.args.port_mode:
+            for port in range(self.args.base_port, self.args.base_port + self.args.devices):
+                self.servers.append(await asyncio.start_server(
+                    self.handle_connection, "127.0.0.1", port, ssl=ssl_context, backlog=1024
+                ))
+        else:
+            self.servers.append(await asyncio.start_server(
+                self.handle_connection, self.args.bind, self.args.port, ssl=ssl_context, backlog=4096
+            ))
+        self.event_client = httpx.AsyncClient(timeout=5.0, verify=False)
+        self.started_at = time.monotonic()
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+        if self.event_client is not None:
+            await self.event_client.aclose()
+
+
+def device_addresses(count: int, host_base: str = "127.0.1.1", port_mode: bool = False, base_port: int = 9000) -> List[str]:
+    """R-SCM addresses of the simulated devices, as they should be stored on heat exchangers"""
+    if port_mode:
+        return [f"127.0.0.1:{base_port + i}" for i in range(count)]
+    base = ipaddress.IPv4Address(host_base)
+    return [str(base + i) for i in range(count)]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulated R-SCM fleet for load testing")
+    parser.add_argument("--devices", type=int, default=100, help="number of simulated R-SCMs")
+    parser.add_argument("--host-base", default="127.0.1.1", help="first device IP (IP mode)")
+    parser.add_argument("--bind", default="0.0.0.0", help="listen address (IP mode)")
+    parser.add_argument("--port", type=int, default=8080, help="listen port (IP mode, same as REDFISH_PORT)")
+    parser.add_argument("--port-mode", action="store_true", help="one port per device on 127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=9000, help="first device port (port mode)")
+    parser.add_argument("--fans", type=int, default=6)
+    parser.add_argument("--pumps", type=int, default=3)
+    parser.add_argument("--missing-pumps-fraction", type=float, default=0.0, help="share of devices without the Pumps endpoint")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mean response latency")
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "exponential", "lognormal"), default="lognormal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests never answered")
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--no-etags", dest="etags", action="store_false", help="do not send ETags")
+    parser.add_argument("--scenario", help="JSON file with scripted alarm scenarios")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument("--certfile", help="serve HTTPS with this certificate")
+    parser.add_argument("--keyfile")
+    return parser
+
+
+async def run_simulator(args: argparse.Namespace):
+    simulator = Simulator(args)
+    await simulator.start()
+    addresses = list(simulator.devices)
+    scheme = "https" if args.certfile else "http"
+    print(f"[OK] Simulating {len(addresses)} R-SCMs over {scheme} ({addresses[0]} ... {addresses[-1]})")
+    scenario_task = asyncio.create_task(simulator.run_scenarios()) if simulator.scenarios else None
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"[STATS] {simulator.requests} requests served")
+    finally:
+        if scenario_task:
+            scenario_task.cancel()
+        await simulator.stop()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(run_simulator(build_parser().parse_args()))
+    except KeyboardInterrupt:
+        print("\n[STOP] Simulator stopped")
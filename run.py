@@ -3,11 +3,27 @@ Run the Cooling Monitor application.
 
 For local development: python run.py --local
 For production behind nginx at /cooling-monitor: python run.py --proxy
+For a standalone poller (no web server): python run.py --poller
+For an edge collector that forwards to a central server: python run.py --collector
 """
 import sys
 import uvicorn
 
 if __name__ == "__main__":
+    # Standalone poller: no web server, just the monitoring scheduler
+    if "--poller" in sys.argv:
+        from app.poller import main
+        print("[START] Starting Cooling Monitor in POLLER mode")
+        main()
+        sys.exit(0)
+    
+    # Edge collector: poll local R-SCMs and push batches to the central server
+    if "--collector" in sys.argv:
+        from app.collector import main
+        print("[START] Starting Cooling Monitor in COLLECTOR mode")
+        main()
+        sys.exit(0)
+    
     # Check if running behind proxy
     use_proxy = "--proxy" in sys.argv
     
@@ -7,6 +7,8 @@ let currentFilters = {
 
 // WebSocket connection
 let ws = null;
+let wsEpoch = null;
+let lastSeq = null;
 
 // Load alerts on page load
 document.addEventListener('DOMContentLoaded', () => {
@@ -60,13 +62,33 @@ async function checkUserRole() {
 
 function connectWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
+    let wsUrl = `${protocol}//${window.location.host}${pathPrefix}/ws?topics=alerts`;
+    
+    // After a reconnect, ask only for the events we missed
+    if (wsEpoch && lastSeq !== null) {
+        wsUrl += `&resume_from=${lastSeq}&epoch=${wsEpoch}`;
+    }
+    ws = new WebSocket(wsUrl);
     
     ws.onmessage = (event) => {
         const data = JSON.parse(event.data);
+        if (data.type === 'hello') {
+            if (data.epoch !== wsEpoch) {
+                lastSeq = data.seq;
+            }
+            wsEpoch = data.epoch;
+            return;
+        }
+        if (data.seq !== undefined) {
+            lastSeq = data.seq;
+        }
+        
         if (data.type === 'new_alert') {
             console.log('New alert received via WebSocket:', data);
             loadAlerts(); // Reload alerts
+        } else if (data.type === 'resync') {
+            // Missed events were no longer buffered on the server
+            loadAlerts();
         }
     };
     
@@ -3,6 +3,10 @@
 // WebSocket connection
 let ws = null;
 let reconnectInterval = null;
+let wsEverConnected = false;
+let wsEpoch = null;
+let lastSeq = null;
+let renderTimer = null;
 
 // Data storage
 let heatExchangers = [];
@@ -14,13 +18,10 @@ let isAdmin = false;
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     checkUserRole();
-    fetchHeatExchangers();
+    // Dashboard data arrives as a snapshot on WebSocket connect, then as live deltas
     connectWebSocket();
     updateAlertBadge();
     
-    // Refresh dashboard data every 10 seconds
-    setInterval(fetchHeatExchangers, 10000);
-    
     // Update alert badge every 30 seconds
     setInterval(updateAlertBadge, 30000);
     
@@ -364,12 +365,19 @@ async function createHeatExchangerCard(he, data) {
 // WebSocket connection
 function connectWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}${pathPrefix}/ws`;
+    // Only fleet-wide updates and alerts are needed on the dashboard
+    let wsUrl = `${protocol}//${window.location.host}${pathPrefix}/ws?topics=fleet,alerts`;
+    
+    // After a reconnect, ask only for the events we missed
+    if (wsEpoch && lastSeq !== null) {
+        wsUrl += `&resume_from=${lastSeq}&epoch=${wsEpoch}`;
+    }
     
     ws = new WebSocket(wsUrl);
     
     ws.onopen = () => {
         console.log('WebSocket connected');
+        wsEverConnected = true;
         updateWSStatus(true);
         if (reconnectInterval) {
             clearInterval(reconnectInterval);
@@ -379,6 +387,7 @@ function connectWebSocket() {
     
     ws.onmessage = (event) => {
         const message = JSON.parse(event.data);
+        trackSequence(message);
         handleWSMessage(message);
         
         // Update alert badge when new alert arrives
@@ -395,6 +404,11 @@ function connectWebSocket() {
         console.log('WebSocket disconnected');
         updateWSStatus(false);
         
+        // Fall back to a one-off REST load if the socket has never worked
+        if (!wsEverConnected && heatExchangers.length === 0) {
+            fetchHeatExchangers();
+        }
+        
         // Reconnect after 5 seconds
         if (!reconnectInterval) {
             reconnectInterval = setInterval(connectWebSocket, 5000);
@@ -402,15 +416,68 @@ function connectWebSocket() {
     };
 }
 
+// Remember the server epoch and last sequence number for resuming after reconnect
+function trackSequence(message) {
+    if (message.type === 'hello') {
+        if (message.epoch !== wsEpoch) {
+            lastSeq = message.seq;
+        }
+        wsEpoch = message.epoch;
+    } else if (message.seq !== undefined) {
+        lastSeq = message.seq;
+    }
+}
+
 // Handle WebSocket messages
 function handleWSMessage(message) {
-    if (message.type === 'monitoring_update' && message.heat_exchanger_id) {
-        latestData[message.heat_exchanger_id] = {
-            ...message.data,
-            heat_exchanger_id: message.heat_exchanger_id
-        };
-        renderHeatExchangers();
+    if (message.type === 'fleet_snapshot') {
+        heatExchangers = [];
+        latestData = {};
+        message.devices.forEach(device => applyDeviceChanges(device.id, device));
+        populateLocationFilter();
+        scheduleRender();
+    } else if (message.type === 'fleet_delta') {
+        const isNew = !heatExchangers.some(he => he.id === message.heat_exchanger_id);
+        if (isNew) {
+            // Newest heat exchangers are listed first, matching the REST ordering
+            heatExchangers.unshift({ id: message.heat_exchanger_id });
+        }
+        applyDeviceChanges(message.heat_exchanger_id, message.changes);
+        if (isNew || message.changes.location) {
+            populateLocationFilter();
+        }
+        scheduleRender();
+    } else if (message.type === 'fleet_remove') {
+        heatExchangers = heatExchangers.filter(he => he.id !== message.heat_exchanger_id);
+        delete latestData[message.heat_exchanger_id];
+        scheduleRender();
+    }
+}
+
+// Merge changed fields into the local copy of a heat exchanger
+function applyDeviceChanges(id, changes) {
+    const { latest, ...fields } = changes;
+    const he = heatExchangers.find(h => h.id === id);
+    if (he) {
+        Object.assign(he, fields);
+    } else {
+        heatExchangers.push({ id, ...fields });
     }
+    
+    if (latest) {
+        latestData[id] = latest;
+    } else if (latest === null) {
+        delete latestData[id];
+    }
+}
+
+// Coalesce bursts of deltas (one per device per poll) into a single render
+function scheduleRender() {
+    if (renderTimer) return;
+    renderTimer = setTimeout(() => {
+        renderTimer = null;
+        renderHeatExchangers();
+    }, 100);
 }
 
 // Update WebSocket status
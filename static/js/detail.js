@@ -777,12 +777,13 @@ function setupEventListeners() {
 // WebSocket for real-time updates
 function connectWebSocket() {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    const wsUrl = `${protocol}//${window.location.host}${pathPrefix}/ws`;
+    // Subscribe only to events for this heat exchanger
+    const wsUrl = `${protocol}//${window.location.host}${pathPrefix}/ws?topics=he:${HEAT_EXCHANGER_ID}`;
     const ws = new WebSocket(wsUrl);
     
     ws.onmessage = (event) => {
         const message = JSON.parse(event.data);
-        if (message.type === 'monitoring_update' && message.heat_exchanger_id === HEAT_EXCHANGER_ID) {
+        if (message.type === 'monitoring_update' && String(message.heat_exchanger_id) === HEAT_EXCHANGER_ID) {
             // Add new data point
             monitoringData.unshift({
                 ...message.data,
@@ -0,0 +1,187 @@
+"""Self-contained check of the Unix socket WebSocket backplane
+
+Starts several backplane "workers" in one process on a temporary socket (no uvicorn,
+database or Redfish devices needed) and checks that:
+
+- every worker receives every event, including its own
+- all workers see the same hub epoch and sequence number for each event
+- a worker that stops reading is dropped by the hub instead of growing its buffer
+- an event over the line limit does not break the other workers
+- the remaining workers elect a new hub and keep relaying after the hub worker stops
+- publishing does not block when the hub stops reading; excess events are dropped and counted
+
+    python test_backplane.py [workers]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import broadcast_backplane
+from app.services.broadcast_backplane import UnixSocketBackplane, MAX_LINE_BYTES
+
+
+class Worker:
+    """One backplane client collecting what it receives"""
+
+    def __init__(self, path: str, name: str):
+        self.name = name
+        self.backplane = UnixSocketBackplane(path)
+        self.received = []
+        self.stamps = {}
+
+    def deliver(self, message, topics, stamp):
+        self.received.append(message.get("n"))
+        self.stamps[message.get("n")] = stamp
+
+    async def start(self):
+        await self.backplane.start(self.deliver)
+
+
+async def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.02)
+    return condition()
+
+
+async def check_stalled_hub() -> bool:
+    import fcntl
+
+    broadcast_backplane.MAX_PENDING_EVENTS = 10
+    path = os.path.join(tempfile.mkdtemp(prefix="backplane-"), "hub.sock")
+    # Hold the hub lock so the worker connects to the stalled server instead of becoming the hub
+    lock_fd = os.open(f"{path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    connections = []
+    server = await asyncio.start_unix_server(lambda r, w: connections.append(w), path=path)
+
+    worker = Worker(path, "worker-stalled")
+    await worker.start()
+    payload = "z" * 64 * 1024
+    started = time.monotonic()
+    try:
+        for n in range(200):
+            await asyncio.wait_for(worker.backplane.publish({"n": n, "payload": payload}, None), timeout=1)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.monotonic() - started
+    dropped = worker.backplane.dropped
+
+    await worker.backplane.stop()
+    for writer in connections:
+        writer.close()
+    server.close()
+    os.close(lock_fd)
+
+    if elapsed > 1 or dropped == 0:
+        print(f"❌ Stalled hub: 200 publishes took {elapsed:.2f}s, {dropped} dropped")
+        return False
+    print(f"✓ Stalled hub did not block publishing ({elapsed * 1000:.0f} ms for 200 events, {dropped} dropped)")
+    return True
+
+
+async def run_checks(count: int) -> bool:
+    print("🔀 WebSocket Backplane Test")
+    print("=" * 50)
+    # Smaller hub buffer so the slow-worker check runs quickly
+    broadcast_backplane.MAX_PEER_BUFFER_BYTES = 1024 * 1024
+
+    path = os.path.join(tempfile.mkdtemp(prefix="backplane-"), "hub.sock")
+    workers = [Worker(path, f"worker-{i}") for i in range(count)]
+    for worker in workers:
+        await worker.start()
+    hub = next(w for w in workers if w.backplane._server is not None)
+    print(f"Hub: {hub.name}, socket {path}")
+
+    # 1. Fan-out to every worker, including the publisher
+    for n in range(10):
+        await workers[n % count].backplane.publish({"n": n}, None)
+    if not await wait_for(lambda: all(len(w.received) == 10 for w in workers)):
+        print(f"❌ Fan-out: received {[len(w.received) for w in workers]} of 10 events")
+        return False
+    print(f"✓ {count} workers each received all 10 events")
+    stamps = [[w.stamps[n] for n in range(10)] for w in workers]
+    if any(s != stamps[0] for s in stamps) or None in stamps[0] or len({seq for _, seq in stamps[0]}) != 10:
+        print(f"❌ Workers numbered events differently: {stamps}")
+        return False
+    print(f"✓ Every worker saw the same hub numbering (epoch {stamps[0][0][0]}, seq {min(stamps[0])[1]}-{max(stamps[0])[1]})")
+
+    # 2. A worker that connects but never reads is dropped by the hub
+    reader, writer = await asyncio.open_unix_connection(path)
+    payload = "x" * 64 * 1024
+    for n in range(40):
+        await workers[0].backplane.publish({"n": 100 + n, "payload": payload}, None)
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    slow_dropped = writer.transport.is_closing() or await wait_for(lambda: reader.at_eof(), timeout=2)
+    buffered = max((peer.transport.get_write_buffer_size() for peer in hub.backplane._peers), default=0)
+    if not slow_dropped and buffered > broadcast_backplane.MAX_PEER_BUFFER_BYTES + MAX_LINE_BYTES:
+        print(f"❌ Slow worker: hub buffers {buffered} bytes for it")
+        return False
+    writer.close()
+    if not await wait_for(lambda: all(len(w.received) == 50 for w in workers)):
+        print(f"❌ Slow worker held up the others: {[len(w.received) for w in workers]}")
+        return False
+    print(f"✓ Slow worker dropped, the others received every event (hub buffer {buffered} bytes)")
+
+    # 3. An oversized event is delivered locally only and does not break the relay
+    await workers[1].backplane.publish({"n": 999, "payload": "y" * MAX_LINE_BYTES}, None)
+    await workers[0].backplane.publish({"n": 1000}, None)
+    if not await wait_for(lambda: all(1000 in w.received for w in workers)):
+        print("❌ Oversized event broke the relay")
+        return False
+    print("✓ Oversized event kept local, relay still working")
+
+    # 4. Hub failover
+    await hub.backplane.stop()
+    survivors = [w for w in workers if w is not hub]
+    if not await wait_for(lambda: any(w.backplane._server is not None for w in survivors)):
+        print("❌ No worker took over the hub")
+        return False
+    new_hub = next(w for w in survivors if w.backplane._server is not None)
+    if not await wait_for(lambda: all(w.backplane._writer is not None for w in survivors)):
+        print("❌ Workers did not reconnect to the new hub")
+        return False
+    await survivors[-1].backplane.publish({"n": 2000}, None)
+    if not await wait_for(lambda: all(2000 in w.received for w in survivors)):
+        print("❌ Events not relayed after failover")
+        return False
+    print(f"✓ {new_hub.name} took over as hub, events relayed to all {len(survivors)} remaining workers")
+    if any(w.stamps[2000][0] == stamps[0][0][0] for w in survivors):
+        print("❌ New hub kept the old epoch")
+        return False
+    print("✓ New hub started a new epoch")
+
+    for worker in survivors:
+        await worker.backplane.stop()
+    # Let the hub's peer handlers see their connections close
+    await asyncio.sleep(0.1)
+
+    # 5. A stalled hub (accepts but never reads) does not block publish()
+    if not await check_stalled_hub():
+        return False
+
+    print("\n" + "=" * 50)
+    print("✅ Backplane checks passed")
+    print("=" * 50)
+    return True
+
+
+if __name__ == '__main__':
+    if sys.platform == "win32":
+        print("The Unix socket backplane is not available on Windows")
+        sys.exit(1)
+
+    try:
+        success = asyncio.run(run_checks(int(sys.argv[1]) if len(sys.argv) > 1 else 3))
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
@@ -0,0 +1,160 @@
+"""Self-contained check of the Redfish capability registry
+
+Requests resources through RedfishClient from a fake R-SCM served by an httpx
+MockTransport (no devices, server or database needed) and checks that:
+
+- a resource the device never had is skipped after its first 404
+- a resource the device has served is only skipped after MISSES_BEFORE_SKIP misses in a row
+- skipped resources are probed again after a reboot, a firmware change or the TTL
+- the root and manager resources are never skipped
+
+    python test_capabilities.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx
+
+from app.config import settings
+
+RSCM_IP = "198.18.0.1"
+PUMPS = "/redfish/v1/ThermalEquipment/CDUs/1/Pumps"
+FANS = "/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans"
+MANAGER = "/redfish/v1/Managers/RackManager"
+
+
+class FakeRSCM:
+    """Answers 200 for resources it has, 404 for the rest, and counts requests"""
+
+    def __init__(self):
+        self.available = {FANS, MANAGER}
+        self.hits = {}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        if path not in self.available:
+            return httpx.Response(404)
+        return httpx.Response(200, json={"@odata.id": path})
+
+
+async def run_checks() -> bool:
+    print("🧭 Capability Registry Test")
+    print("=" * 50)
+    settings.redfish_session_auth = False
+    settings.redfish_conditional_get = False
+    settings.redfish_capability_ttl_seconds = 3600
+
+    from app.services.redfish_client import CapabilityRegistry, RedfishClient, capabilities, redfish_base_url, redfish_sessions
+
+    rscm = FakeRSCM()
+    base_url = redfish_base_url(RSCM_IP)
+    redfish_sessions._clients[base_url] = httpx.AsyncClient(transport=httpx.MockTransport(rscm.handle))
+    client = RedfishClient(RSCM_IP, "admin", "password")
+
+    async def fetch(endpoint: str) -> int:
+        """Request an endpoint and return how many requests reached the device"""
+        before = rscm.hits.get(endpoint, 0)
+        await client._make_request(endpoint)
+        return rscm.hits.get(endpoint, 0) - before
+
+    success = True
+
+    # 1. Never-served resource: one 404, then skipped
+    first, second = await fetch(PUMPS), await fetch(PUMPS)
+    if first != 1 or second != 0:
+        print(f"❌ Unsupported resource requested {first} then {second} times, expected 1 then 0")
+        success = False
+    else:
+        print("✓ Resource without support skipped after its first 404")
+
+    # 2. Previously served resource: 404s during a reboot are tolerated until MISSES_BEFORE_SKIP
+    await fetch(FANS)
+    rscm.available.discard(FANS)
+    requested = [await fetch(FANS) for _ in range(CapabilityRegistry.MISSES_BEFORE_SKIP + 1)]
+    expected = [1] * CapabilityRegistry.MISSES_BEFORE_SKIP + [0]
+    if requested != expected:
+        print(f"❌ Served resource requested {requested} after it started answering 404, expected {expected}")
+        success = False
+    else:
+        print(f"✓ Served resource skipped only after {CapabilityRegistry.MISSES_BEFORE_SKIP} misses in a row")
+
+    # A success between misses starts the count over
+    rscm.available.add(FANS)
+    capabilities.reset_missing(base_url)
+    await fetch(FANS)
+    rscm.available.discard(FANS)
+    await fetch(FANS)
+    rscm.available.add(FANS)
+    await fetch(FANS)
+    rscm.available.discard(FANS)
+    requested = [await fetch(FANS) for _ in range(CapabilityRegistry.MISSES_BEFORE_SKIP)]
+    if requested != [1] * CapabilityRegistry.MISSES_BEFORE_SKIP:
+        print(f"❌ A successful response did not reset the miss count: requested {requested}")
+        success = False
+    else:
+        print("✓ A successful response resets the miss count")
+    rscm.available.add(FANS)
+
+    # 3. Re-probe after a reboot (TimeSinceLastBoot goes backwards)
+    capabilities.observe_uptime(base_url, "5000")
+    capabilities.observe_uptime(base_url, "30")
+    if await fetch(PUMPS) != 1:
+        print("❌ Skipped resource not probed again after a reboot")
+        success = False
+    else:
+        print("✓ Skipped resource probed again after a reboot")
+
+    # 4. Re-probe after a firmware change
+    capabilities.observe_firmware(base_url, "1.0")
+    await fetch(PUMPS)
+    capabilities.observe_firmware(base_url, "1.0")
+    unchanged = await fetch(PUMPS)
+    capabilities.observe_firmware(base_url, "1.1")
+    changed = await fetch(PUMPS)
+    if unchanged != 0 or changed != 1:
+        print(f"❌ Firmware check: same version re-probed {unchanged}, new version re-probed {changed} (expected 0, 1)")
+        success = False
+    else:
+        print("✓ Skipped resource probed again after a firmware change, not before")
+
+    # 5. Re-probe after the TTL
+    settings.redfish_capability_ttl_seconds = 60
+    capabilities._missing[base_url][PUMPS] = time.monotonic() - 61
+    if await fetch(PUMPS) != 1:
+        print("❌ Skipped resource not probed again after REDFISH_CAPABILITY_TTL_SECONDS")
+        success = False
+    else:
+        print("✓ Skipped resource probed again after the TTL")
+
+    # 6. Resources needed to detect reboots and firmware changes are never skipped
+    rscm.available.discard(MANAGER)
+    requested = [await fetch(MANAGER) for _ in range(CapabilityRegistry.MISSES_BEFORE_SKIP + 2)]
+    if requested != [1] * len(requested):
+        print(f"❌ Manager resource skipped: requested {requested}")
+        success = False
+    else:
+        print("✓ Manager resource never skipped")
+
+    await redfish_sessions.close()
+
+    print("\n" + "=" * 50)
+    print("✅ Capability registry checks passed" if success else "❌ Capability registry checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks())
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
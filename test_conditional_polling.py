@@ -0,0 +1,187 @@
+"""Self-contained check of conditional (ETag) polling
+
+Polls one heat exchanger through MonitoringService against a fake R-SCM served by an
+httpx MockTransport (no devices, server or simulator process needed), on a temporary
+SQLite database, and checks that:
+
+- a repeat poll answered entirely with 304 Not Modified is reported as unchanged
+- an alert resolved while the device is still in alarm is raised again on an unchanged poll
+- a poll where a request failed is not reported as unchanged
+- resources answered with 304 are marked present in the capability registry
+
+    python test_conditional_polling.py
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx
+
+from app.config import settings
+
+RSCM_IP = "198.18.0.1"
+LEAK_SENSOR = "LeakSensor1"
+
+
+class FakeRSCM:
+    """R-SCM with fixed resources, ETags and switchable failures"""
+
+    def __init__(self):
+        import random
+        from rscm_simulator import SimulatedDevice
+
+        device = SimulatedDevice(0, RSCM_IP, random.Random(1), fans=2, pumps=2, has_pumps=True)
+        device.active_scenarios = [{"type": "leak", "sensor": LEAK_SENSOR}]
+        # Rendered once so every poll sees identical bodies
+        self.resources = {
+            "/redfish/v1": {"RedfishVersion": "1.15.0"},
+            "/redfish/v1/Managers/RackManager": device.manager(),
+            "/redfish/v1/Chassis/CDU": device.cdu(),
+            "/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans": device.fan_collection(),
+            "/redfish/v1/ThermalEquipment/CDUs/1/Pumps": device.pump_collection()
+        }
+        for n in range(1, 3):
+            self.resources[f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}"] = device.fan(n)
+            self.resources[f"/redfish/v1/ThermalEquipment/CDUs/1/Pumps/{n}/Oem/Microsoft/DeviceStatus"] = device.pump_status(n)
+        self.failing = set()
+        self.not_modified = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path in self.failing:
+            return httpx.Response(503)
+        if path not in self.resources:
+            return httpx.Response(404)
+        body = json.dumps(self.resources[path]).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest()[:16] + '"'
+        if request.headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=body, headers={"ETag": etag, "Content-Type": "application/json"})
+
+
+async def create_database(path: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app import database
+    # Register every model with Base before create_all
+    from app.models import alert, heat_exchanger, monitoring_data, poller_lease, program, settings as system_settings, user  # noqa: F401
+
+    database.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    database.async_session_maker = async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+
+async def run_checks() -> bool:
+    print("🏷️  Conditional Polling Test")
+    print("=" * 50)
+    settings.redfish_session_auth = False
+    settings.redfish_conditional_get = True
+
+    from sqlalchemy import select, update
+    from app import database
+    from app.models.alert import Alert
+    from app.models.heat_exchanger import HeatExchanger
+    from app.models.settings import SystemSettings
+    from app.services.monitoring_service import MonitoringService
+    from app.services.redfish_client import RedfishClient, capabilities, redfish_base_url, redfish_sessions
+
+    await create_database(os.path.join(tempfile.mkdtemp(prefix="conditional-"), "test.db"))
+    async with database.async_session_maker() as db:
+        db.add(SystemSettings(monitoring_enabled=True))
+        heat_exchanger = HeatExchanger(name="hx-1", rscm_ip=RSCM_IP, city="c", building="b", room="r", tile="t")
+        db.add(heat_exchanger)
+        await db.commit()
+        heat_exchanger_id = heat_exchanger.id
+
+    rscm = FakeRSCM()
+    base_url = redfish_base_url(RSCM_IP)
+    redfish_sessions._clients[base_url] = httpx.AsyncClient(transport=httpx.MockTransport(rscm.handle))
+    service = MonitoringService()
+
+    async def poll() -> bool:
+        """One poll through the normal path; returns whether it was unchanged"""
+        client = RedfishClient(RSCM_IP, "admin", "password")
+        sample = await service.collect_sample(client)
+        await service.save_sample(heat_exchanger_id, **sample)
+        return sample["unchanged"]
+
+    async def open_leak_alerts() -> int:
+        async with database.async_session_maker() as db:
+            result = await db.execute(select(Alert).where(
+                Alert.heat_exchanger_id == heat_exchanger_id, Alert.type == "LEAK_ALARM", Alert.resolved == False
+            ))
+            return len(result.scalars().all())
+
+    success = True
+
+    # 1. First poll downloads everything and raises the leak alert
+    if await poll():
+        print("❌ First poll reported as unchanged")
+        success = False
+    if await open_leak_alerts() != 1:
+        print(f"❌ Expected 1 open leak alert after the first poll, found {await open_leak_alerts()}")
+        return False
+    print("✓ First poll raised the leak alert")
+
+    # 2. Repeat poll: all 304s, unchanged, no duplicate alert, capabilities marked present
+    capabilities._present.pop(base_url, None)
+    if not await poll():
+        print("❌ Repeat poll with identical resources was not reported as unchanged")
+        success = False
+    elif await open_leak_alerts() != 1:
+        print("❌ Unchanged poll duplicated the open leak alert")
+        success = False
+    else:
+        print(f"✓ Repeat poll unchanged ({rscm.not_modified} responses were 304), no duplicate alert")
+    if "/redfish/v1/Chassis/CDU" not in capabilities.profile(base_url)["present"]:
+        print("❌ Resources answered with 304 were not marked present")
+        success = False
+    else:
+        print("✓ Resources answered with 304 marked present")
+
+    # 3. Resolve the alert while the leak persists: the next unchanged poll raises it again
+    async with database.async_session_maker() as db:
+        await db.execute(update(Alert).where(Alert.heat_exchanger_id == heat_exchanger_id).values(resolved=True))
+        await db.commit()
+    unchanged = await poll()
+    if not unchanged or await open_leak_alerts() != 1:
+        print(f"❌ Resolved alert not raised again on an unchanged poll (unchanged={unchanged}, open={await open_leak_alerts()})")
+        success = False
+    else:
+        print("✓ Alert resolved during a persisting leak raised again on an unchanged poll")
+
+    # 4. A failed request makes the poll changed, even if everything else answered 304
+    rscm.failing.add("/redfish/v1/ThermalEquipment/CDUs/1/Pumps/2/Oem/Microsoft/DeviceStatus")
+    client = RedfishClient(RSCM_IP, "admin", "password")
+    sample = await service.collect_sample(client)
+    if sample["unchanged"] or client.failed != 1:
+        print(f"❌ Poll with a failed request reported unchanged={sample['unchanged']} (failed={client.failed})")
+        success = False
+    else:
+        print("✓ Poll with a failed request not reported as unchanged")
+
+    await redfish_sessions.close()
+    await database.engine.dispose()
+
+    print("\n" + "=" * 50)
+    print("✅ Conditional polling checks passed" if success else "❌ Conditional polling checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks())
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
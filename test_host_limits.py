@@ -0,0 +1,126 @@
+"""Self-contained check of the per-R-SCM request limits
+
+Exercises HostLimiter directly and through RedfishClient against a fake R-SCM served
+by an httpx MockTransport (no devices, server or database needed) and checks that:
+
+- no more than max_concurrent requests are in flight to one device
+- request start times are spaced by at least min_interval
+- a request cancelled while waiting for its start time gives its slot back
+- per-model limits are applied once the device reports its model
+
+    python test_host_limits.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx
+
+from app.config import settings
+
+RSCM_IP = "198.18.0.1"
+
+
+class FakeRSCM:
+    """Slow R-SCM that records how many requests it is serving at once"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.started = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.started.append(time.monotonic())
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return httpx.Response(200, json={"@odata.id": request.url.path})
+
+
+async def run_checks() -> bool:
+    print("🚦 Redfish Host Limits Test")
+    print("=" * 50)
+    settings.redfish_session_auth = False
+    settings.redfish_conditional_get = False
+    settings.redfish_max_concurrent_requests = 2
+    settings.redfish_min_request_interval_ms = 0
+    settings.redfish_model_limits = {"RM-SLOW": {"max_concurrent": 1, "min_interval_ms": 50}}
+
+    from app.services.redfish_client import HostLimiter, RedfishClient, host_limits, redfish_base_url, redfish_sessions
+
+    success = True
+    base_url = redfish_base_url(RSCM_IP)
+
+    # 1. Concurrency cap through the client
+    rscm = FakeRSCM(delay=0.05)
+    redfish_sessions._clients[base_url] = httpx.AsyncClient(transport=httpx.MockTransport(rscm.handle))
+    client = RedfishClient(RSCM_IP, "admin", "password")
+    await asyncio.gather(*(client._make_request(f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}") for n in range(8)))
+    if rscm.peak != 2:
+        print(f"❌ Peak of {rscm.peak} requests in flight, expected 2")
+        success = False
+    else:
+        print("✓ At most REDFISH_MAX_CONCURRENT_REQUESTS (2) requests in flight to one device")
+
+    # 2. Per-model limits: one at a time, starts 50 ms apart
+    host_limits.set_model(base_url, "RM-SLOW")
+    rscm = FakeRSCM(delay=0.0)
+    await redfish_sessions._clients[base_url].aclose()
+    redfish_sessions._clients[base_url] = httpx.AsyncClient(transport=httpx.MockTransport(rscm.handle))
+    await asyncio.gather(*(client._make_request(f"/redfish/v1/Chassis/CDU/ThermalSubsystem/Fans/{n}") for n in range(5)))
+    gaps = [b - a for a, b in zip(rscm.started, rscm.started[1:])]
+    if rscm.peak != 1 or min(gaps) < 0.045:
+        print(f"❌ RM-SLOW limits not applied: peak {rscm.peak}, smallest gap {min(gaps) * 1000:.0f} ms")
+        success = False
+    else:
+        print(f"✓ Model limits applied: one request at a time, starts at least {min(gaps) * 1000:.0f} ms apart")
+
+    host_limits.forget(base_url)
+    if host_limits.for_host(base_url).max_concurrent != 2:
+        print("❌ Forgotten device kept its model limits")
+        success = False
+    else:
+        print("✓ Forgotten device back on the default limits")
+
+    # 3. Cancelled while waiting for its start time: the slot is released
+    limiter = HostLimiter(max_concurrent=1, min_interval=1.0)
+    async with limiter:
+        pass
+    waiting = asyncio.create_task(limiter.__aenter__())
+    await asyncio.sleep(0.05)
+    waiting.cancel()
+    try:
+        await waiting
+    except asyncio.CancelledError:
+        pass
+    if limiter._active != 0:
+        print(f"❌ Cancelled request kept its slot ({limiter._active} active)")
+        success = False
+    else:
+        print("✓ Request cancelled while spacing out gave its slot back")
+
+    await redfish_sessions.close()
+
+    print("\n" + "=" * 50)
+    print("✅ Host limit checks passed" if success else "❌ Host limit checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks())
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
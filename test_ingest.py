@@ -0,0 +1,170 @@
+"""Self-contained check of the edge collector ingest API
+
+Posts collector batches to /api/ingest/batch in-process (httpx ASGITransport, temporary
+SQLite database, no server, collector or devices needed) and checks that:
+
+- a batch resent after a lost response does not raise its alarms or store its history twice,
+  including samples without CDU status (which store no history row)
+- buffered samples raise the alarms they carry
+- oversized bodies, compressed or after decompression, are rejected with 413
+
+    python test_ingest.py
+"""
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import httpx
+
+from app.config import settings
+
+API_KEY = "test-ingest-key"
+
+
+def sample(heat_exchanger_id: int, timestamp: datetime, cdu_status=None, pump_flow=None) -> dict:
+    """One collector sample; pump_flow adds a pump with that flow rate"""
+    return {
+        "heat_exchanger_id": heat_exchanger_id,
+        "sample_id": uuid.uuid4().hex,
+        "timestamp": timestamp.isoformat(),
+        "manager_info": {"status_state": "Enabled", "status_health": "OK"},
+        "cdu_status": cdu_status,
+        "fan_status": None,
+        "pump_status": [{"id": "1", "name": "Pump 1", "flow_liquid": pump_flow}] if pump_flow is not None else None
+    }
+
+
+def leak_cdu() -> dict:
+    return {
+        "chassis_status": {"state": "Enabled", "health": "Critical"},
+        "controller_status": {"AmbientTemperature": 24.0, "AmbientHumidity": 40.0},
+        "fan_alarms": {"Alarms": {}},
+        "pump_alarms": {"Alarms": {}},
+        "sensor_alarms": {"Alarms": []},
+        "leak_alarms": {"Alarms": ["LeakSensor1"]}
+    }
+
+
+async def create_database(path: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app import database
+    # Register every model with Base before create_all
+    from app.models import alert, heat_exchanger, ingest, monitoring_data, poller_lease, program, settings as system_settings, user  # noqa: F401
+
+    database.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    database.async_session_maker = async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+
+async def run_checks() -> bool:
+    print("📦 Ingest API Test")
+    print("=" * 50)
+    settings.ingest_api_key = API_KEY
+
+    from sqlalchemy import select, func
+    from app import database
+    from app.models.alert import Alert
+    from app.models.heat_exchanger import HeatExchanger
+    from app.models.monitoring_data import MonitoringData
+    from app.models.settings import SystemSettings
+    from app.routers import ingest
+    from app.main import app
+
+    await create_database(os.path.join(tempfile.mkdtemp(prefix="ingest-"), "test.db"))
+    async with database.async_session_maker() as db:
+        db.add(SystemSettings(monitoring_enabled=True, pump_flow_critical_threshold=10.0))
+        pump_device = HeatExchanger(name="hx-pump", rscm_ip="198.18.0.1", city="c", building="b", room="r", tile="t")
+        leak_device = HeatExchanger(name="hx-leak", rscm_ip="198.18.0.2", city="c", building="b", room="r", tile="t")
+        db.add_all([pump_device, leak_device])
+        await db.commit()
+
+    async def count(model, **filters) -> int:
+        async with database.async_session_maker() as db:
+            query = select(func.count()).select_from(model)
+            for column, value in filters.items():
+                query = query.where(getattr(model, column) == value)
+            return (await db.execute(query)).scalar()
+
+    headers = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json", "Content-Encoding": "gzip"}
+    success = True
+    start = datetime.utcnow() - timedelta(minutes=10)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+
+        async def post(samples) -> httpx.Response:
+            body = json.dumps({"collector_id": "test", "samples": samples}).encode("utf-8")
+            return await client.post("/api/ingest/batch", content=gzip.compress(body), headers=headers)
+
+        # 1. Samples without CDU status: the newest one has low pump flow
+        batch = [sample(pump_device.id, start + timedelta(minutes=i), pump_flow=45 if i < 2 else 4) for i in range(3)]
+        first = await post(batch)
+        resent = await post(batch)
+        alerts = await count(Alert, heat_exchanger_id=pump_device.id, type="CRITICAL_LOW_FLOW")
+        if first.status_code != 200 or resent.status_code != 200:
+            print(f"❌ Batch rejected: {first.status_code} {first.text} / {resent.status_code} {resent.text}")
+            return False
+        if alerts != 1:
+            print(f"❌ Resent batch without CDU status raised {alerts} low-flow alerts, expected 1")
+            success = False
+        else:
+            print("✓ Resent batch without CDU status did not raise its low-flow alarm again")
+
+        # 2. Buffered samples with a leak: history and the alert are stored once
+        batch = [sample(leak_device.id, start + timedelta(minutes=i), cdu_status=leak_cdu()) for i in range(4)]
+        await post(batch)
+        rows_before = await count(MonitoringData, heat_exchanger_id=leak_device.id)
+        response = await post(batch)
+        rows_after = await count(MonitoringData, heat_exchanger_id=leak_device.id)
+        leak_alerts = await count(Alert, heat_exchanger_id=leak_device.id, type="LEAK_ALARM")
+        if rows_before != 4 or rows_after != 4 or response.json()["history_rows"] != 0:
+            print(f"❌ History stored {rows_before} rows, {rows_after} after resending (expected 4)")
+            success = False
+        elif leak_alerts != 1:
+            print(f"❌ Leak batch raised {leak_alerts} alerts, expected 1")
+            success = False
+        else:
+            print("✓ Buffered leak samples stored and alerted once, resend skipped")
+
+        # 3. Size limits
+        big = b"x" * (ingest.MAX_BODY_BYTES + 1)
+        response = await client.post("/api/ingest/batch", content=big, headers={**headers, "Content-Encoding": "identity"})
+        if response.status_code != 413:
+            print(f"❌ Oversized body answered {response.status_code}, expected 413")
+            success = False
+        else:
+            print("✓ Body over MAX_BODY_BYTES rejected with 413")
+
+        padding = " " * (ingest.MAX_BATCH_BYTES + 1)
+        bomb = gzip.compress(('{"collector_id":"test","samples":[]' + padding + "}").encode("utf-8"))
+        response = await client.post("/api/ingest/batch", content=bomb, headers=headers)
+        if response.status_code != 413:
+            print(f"❌ Batch over MAX_BATCH_BYTES after decompression answered {response.status_code}, expected 413")
+            success = False
+        else:
+            print(f"✓ {len(bomb) // 1024} KiB gzip body inflating past MAX_BATCH_BYTES rejected with 413")
+
+    await database.engine.dispose()
+
+    print("\n" + "=" * 50)
+    print("✅ Ingest checks passed" if success else "❌ Ingest checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks())
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
@@ -0,0 +1,124 @@
+"""Self-contained check of the poller leader lease
+
+Runs several LeaderElection instances (standing in for poller processes) against a
+temporary SQLite database, without a server or devices, and checks that:
+
+- exactly one process wins when they all start at once
+- the others stay followers while the leader keeps renewing
+- when the leader stops renewing, another process takes over once the lease expires,
+  and the old leader steps down on its next renewal
+- releasing the lease on shutdown lets another process take over immediately
+
+    python test_leader_election.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from app.config import settings
+
+
+async def create_database(path: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app import database
+    from app.models import poller_lease  # noqa: F401
+
+    database.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    database.async_session_maker = async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+
+async def expire_lease(name: str = "poller"):
+    """Simulate a leader that died: its lease runs out without being released"""
+    from sqlalchemy import update
+    from app import database
+    from app.models.poller_lease import PollerLease
+
+    async with database.async_session_maker() as db:
+        await db.execute(
+            update(PollerLease).where(PollerLease.name == name)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+
+async def run_checks() -> bool:
+    print("👑 Poller Leader Election Test")
+    print("=" * 50)
+    settings.poller_lease_seconds = 30
+
+    from app import database
+    from app.services.leader_election import LeaderElection
+
+    await create_database(os.path.join(tempfile.mkdtemp(prefix="leader-"), "test.db"))
+    pollers = [LeaderElection() for _ in range(3)]
+    success = True
+
+    # 1. Simultaneous start: one leader
+    results = await asyncio.gather(*(p.renew() for p in pollers))
+    leaders = [p for p in pollers if p.is_leader]
+    if sum(results) != 1 or len(leaders) != 1:
+        print(f"❌ Simultaneous start produced {len(leaders)} leaders ({results})")
+        return False
+    leader = leaders[0]
+    print(f"✓ Simultaneous start elected one leader ({leader.holder_id})")
+
+    # 2. The leader renews, the others stay followers
+    for _ in range(3):
+        await asyncio.gather(*(p.renew() for p in pollers))
+    if not leader.is_leader or any(p.is_leader for p in pollers if p is not leader):
+        print(f"❌ Renewals changed leadership: {[p.is_leader for p in pollers]}")
+        success = False
+    else:
+        print("✓ Leader kept the lease across renewals, followers stayed followers")
+
+    # 3. Leader stops renewing: nobody takes over before expiry, somebody does after
+    followers = [p for p in pollers if p is not leader]
+    await asyncio.gather(*(p.renew() for p in followers))
+    if any(p.is_leader for p in followers):
+        print("❌ A follower took over an unexpired lease")
+        success = False
+    await expire_lease()
+    await asyncio.gather(*(p.renew() for p in followers))
+    new_leaders = [p for p in followers if p.is_leader]
+    if len(new_leaders) != 1:
+        print(f"❌ After expiry {len(new_leaders)} followers became leader")
+        return False
+    new_leader = new_leaders[0]
+    if await leader.renew() or leader.is_leader:
+        print("❌ Old leader still believes it holds the lease after it was taken over")
+        success = False
+    else:
+        print(f"✓ Expired lease taken over by {new_leader.holder_id}, old leader stepped down")
+
+    # 4. Release on shutdown: another process takes over without waiting for expiry
+    await new_leader.release()
+    if await leader.renew() and not new_leader.is_leader:
+        print("✓ Released lease taken over immediately")
+    else:
+        print(f"❌ Lease not taken over after release (old leader is_leader={leader.is_leader})")
+        success = False
+
+    await database.engine.dispose()
+
+    print("\n" + "=" * 50)
+    print("✅ Leader election checks passed" if success else "❌ Leader election checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks())
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+"""Fake Redfish event source for testing push mode
+
+Posts Redfish Alert and MetricReport events to the server's event receiver, the same way
+an R-SCM EventService subscription would. Run with REDFISH_EVENT_PUSH=true on the server:
+
+    python test_redfish_events.py <heat_exchanger_id> [server_url] [count]
+"""
+import asyncio
+import httpx
+import time
+import sys
+import os
+from datetime import datetime
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+
+
+def build_event(event_id: int, event_type: str) -> dict:
+    """Redfish Event payload as sent by an EventService subscription"""
+    event = {
+        "EventType": event_type,
+        "EventId": str(event_id),
+        "EventTimestamp": datetime.utcnow().isoformat() + "Z",
+        "OriginOfCondition": {"@odata.id": "/redfish/v1/ThermalEquipment/CDUs/1/Pumps/1"}
+    }
+    if event_type == "Alert":
+        event.update({
+            "MessageId": "CDU.1.0.PumpFlowLow",
+            "MessageSeverity": "Critical",
+            "Message": "Pump 1 flow rate is below the critical threshold"
+        })
+    else:
+        event.update({
+            "MessageId": "TelemetryService.1.0.MetricReport",
+            "MessageSeverity": "OK",
+            "Message": "Metric report generated"
+        })
+    return {
+        "@odata.type": "#Event.v1_7_0.Event",
+        "Id": str(event_id),
+        "Name": "Fake R-SCM Event",
+        "Context": settings.redfish_event_context,
+        "Events": [event]
+    }
+
+
+async def send_test_events(heat_exchanger_id: int, server_url: str, count: int):
+    """Send alternating Alert/MetricReport events and report the receiver latency"""
+    print("📡 Redfish Event Push Test")
+    print("=" * 50)
+
+    if not settings.redfish_event_context:
+        print("❌ REDFISH_EVENT_CONTEXT is not set. It must match the server's value.")
+        return False
+
+    url = f"{server_url.rstrip('/')}/api/redfish-events/{heat_exchanger_id}"
+    print(f"Target: {url}")
+
+    latencies = []
+    async with httpx.AsyncClient(timeout=10.0, verify=False) as client:
+        for i in range(count):
+            event_type = "Alert" if i % 2 == 0 else "MetricReport"
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=build_event(i + 1, event_type))
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                print(f"\n❌ HTTP error: {e.response.status_code}")
+                print(f"   Response: {e.response.text}")
+                print("\n   Possible fixes:")
+                print("   - Set REDFISH_EVENT_PUSH=true on the server")
+                print("   - Use the same REDFISH_EVENT_CONTEXT as the server")
+                return False
+            except Exception as e:
+                print(f"\n❌ Failed to send event: {e}")
+                return False
+            latencies.append((time.perf_counter() - start) * 1000)
+            print(f"✓ Sent {event_type} event {i + 1} ({latencies[-1]:.1f} ms)")
+
+    print("\n" + "=" * 50)
+    print(f"✅ {count} events accepted, avg {sum(latencies) / len(latencies):.1f} ms, max {max(latencies):.1f} ms")
+    print("   The heat exchanger is refreshed right away; watch its detail page for updates.")
+    print("=" * 50)
+    return True
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    try:
+        success = asyncio.run(send_test_events(
+            int(sys.argv[1]),
+            sys.argv[2] if len(sys.argv) > 2 else f"http://localhost:{settings.api_port}",
+            int(sys.argv[3]) if len(sys.argv) > 3 else 4
+        ))
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)
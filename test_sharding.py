@@ -0,0 +1,153 @@
+"""Self-contained check of sharded polling
+
+Runs several ShardCoordinator instances (standing in for poller processes) against a
+temporary SQLite database, without a server or devices, and checks that:
+
+- every heat exchanger is owned by exactly one live member, and shares are balanced
+- when a member's heartbeat expires only its share moves to the others
+- a joining member takes a share from the others without reshuffling the rest
+- a second process reusing a live node id stands by instead of polling the same shard
+- a member that leaves on shutdown hands its share over on the next heartbeat
+
+    python test_sharding.py [heat exchangers]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from app.config import settings
+
+
+async def create_database(path: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app import database
+    from app.models import poller_lease  # noqa: F401
+
+    database.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    database.async_session_maker = async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+
+async def expire_member(node_id: str):
+    """Simulate a poller that died: its heartbeat runs out without leaving the ring"""
+    from sqlalchemy import update
+    from app import database
+    from app.models.poller_lease import PollerLease
+    from app.services.shard_coordinator import MEMBER_PREFIX
+
+    async with database.async_session_maker() as db:
+        await db.execute(
+            update(PollerLease).where(PollerLease.name == f"{MEMBER_PREFIX}{node_id}")
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+
+
+async def heartbeat(members):
+    """Two rounds so every member sees the others' latest heartbeat"""
+    for _ in range(2):
+        for member in members:
+            await member.renew()
+
+
+def assignment(members, device_ids):
+    """heat exchanger id -> node ids of the members that would poll it"""
+    return {i: [m.node_id for m in members if m.owns(i)] for i in device_ids}
+
+
+async def run_checks(count: int) -> bool:
+    print("🧩 Sharded Polling Test")
+    print("=" * 50)
+    settings.poller_lease_seconds = 30
+
+    from app import database
+    from app.services.shard_coordinator import ShardCoordinator
+
+    await create_database(os.path.join(tempfile.mkdtemp(prefix="sharding-"), "test.db"))
+    device_ids = range(1, count + 1)
+    members = [ShardCoordinator(f"node-{n}") for n in range(1, 4)]
+    success = True
+
+    # 1. Every device has exactly one owner, shares roughly even
+    await heartbeat(members)
+    before = assignment(members, device_ids)
+    unowned = [i for i, owners in before.items() if len(owners) != 1]
+    shares = {m.node_id: sum(1 for owners in before.values() if owners == [m.node_id]) for m in members}
+    if unowned:
+        print(f"❌ {len(unowned)} heat exchangers without exactly one owner, e.g. {unowned[:5]}")
+        return False
+    if min(shares.values()) < count / len(members) / 2:
+        print(f"❌ Unbalanced shares: {shares}")
+        success = False
+    else:
+        print(f"✓ {count} heat exchangers split across 3 members: {shares}")
+
+    # 2. A member dies: only its share moves
+    dead, survivors = members[-1], members[:-1]
+    await expire_member(dead.node_id)
+    await heartbeat(survivors)
+    after = assignment(survivors, device_ids)
+    moved = [i for i in device_ids if before[i] != [dead.node_id] and after[i] != before[i]]
+    orphaned = [i for i, owners in after.items() if len(owners) != 1]
+    if orphaned or moved:
+        print(f"❌ After {dead.node_id} expired: {len(orphaned)} without one owner, {len(moved)} of the survivors' devices moved")
+        success = False
+    else:
+        print(f"✓ {dead.node_id} expired, its {shares[dead.node_id]} heat exchangers moved to the survivors and nothing else did")
+
+    # 3. A member joins: it takes a share, the rest stay put
+    joined = ShardCoordinator("node-4")
+    members = survivors + [joined]
+    await heartbeat(members)
+    rejoined = assignment(members, device_ids)
+    taken = sum(1 for owners in rejoined.values() if owners == [joined.node_id])
+    reshuffled = [i for i in device_ids if rejoined[i] != [joined.node_id] and rejoined[i] != after[i]]
+    if any(len(owners) != 1 for owners in rejoined.values()) or not taken or reshuffled:
+        print(f"❌ {joined.node_id} joined: took {taken}, {len(reshuffled)} other devices changed owner")
+        success = False
+    else:
+        print(f"✓ {joined.node_id} joined and took {taken} heat exchangers, nothing else moved")
+
+    # 4. A second process with a live member's node id stands by
+    duplicate = ShardCoordinator(members[0].node_id)
+    if await duplicate.renew() or any(duplicate.owns(i) for i in device_ids):
+        print(f"❌ Second process with node id {duplicate.node_id} joined the ring")
+        success = False
+    else:
+        print(f"✓ Second process with node id {duplicate.node_id} stood by")
+
+    # 5. Leaving on shutdown hands the share over without waiting for expiry
+    leaving = members[1]
+    await leaving.release()
+    remaining = [m for m in members if m is not leaving]
+    await heartbeat(remaining)
+    handed_over = assignment(remaining, device_ids)
+    if any(len(owners) != 1 for owners in handed_over.values()) or any(leaving.owns(i) for i in device_ids):
+        print(f"❌ {leaving.node_id} left but its share was not handed over")
+        success = False
+    else:
+        print(f"✓ {leaving.node_id} left, its share was picked up on the next heartbeat")
+
+    await database.engine.dispose()
+
+    print("\n" + "=" * 50)
+    print("✅ Sharding checks passed" if success else "❌ Sharding checks failed")
+    print("=" * 50)
+    return success
+
+
+if __name__ == '__main__':
+    try:
+        success = asyncio.run(run_checks(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
+        sys.exit(0 if success else 1)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Test cancelled by user")
+        sys.exit(1)